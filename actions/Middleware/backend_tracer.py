@@ -0,0 +1,275 @@
+"""
+Traçage des appels au backend par exécution d'action (détection des N+1).
+Chaque requête HTTP envoyée par BackendService est comptée, par endpoint,
+dans la trace de l'action en cours (contextvars : isolé par thread, par tâche
+asyncio et propagé aux appels parallèles du fan-out).
+Les données servies en mode dégradé (backend indisponible) y sont aussi notées
+pour que l'action prévienne l'utilisateur.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, Iterator, Optional, Text, Tuple
+import inspect
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BackendCallTrace:
+    """
+    Appels au backend d'une exécution d'action, groupés par endpoint.
+    """
+
+    def __init__(self, name: Text, sender_id: Optional[Text] = None,
+                 parent: Optional['BackendCallTrace'] = None):
+        """
+        Args:
+            name: Nom de l'action (ou du bloc tracé)
+            sender_id: Conversation à l'origine des appels (file d'attente équitable)
+            parent: Trace englobante, qui reçoit aussi les appels (budget d'un test
+                autour d'une action elle-même tracée)
+        """
+        self.name = name
+        self.sender_id = sender_id
+        self.parent = parent
+        self.started_at = time.perf_counter()
+        self.calls: Dict[Tuple[Text, Text], int] = {}
+        self.durations: Dict[Tuple[Text, Text], float] = {}
+        # Clé -> âge (secondes) des données servies depuis le cache en mode dégradé
+        self.stale: Dict[Text, float] = {}
+        # Les appels parallèles du fan-out écrivent dans la même trace
+        self._lock = threading.Lock()
+
+    def record(self, method: Text, route: Text, duration: float):
+        """
+        Enregistre un appel (route = modèle de route, ex: "Postes/{poste_id}").
+        """
+        key = (method, route)
+        with self._lock:
+            self.calls[key] = self.calls.get(key, 0) + 1
+            self.durations[key] = self.durations.get(key, 0.0) + duration
+        if self.parent is not None:
+            self.parent.record(method, route, duration)
+
+    def record_stale(self, key: Text, age: float):
+        """
+        Enregistre une donnée servie depuis le cache en mode dégradé.
+        """
+        with self._lock:
+            self.stale[key] = max(age, self.stale.get(key, 0.0))
+        if self.parent is not None:
+            self.parent.record_stale(key, age)
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def by_endpoint(self) -> Dict[Text, int]:
+        """
+        Nombre d'appels par endpoint ("GET Postes/{poste_id}": 12), du plus appelé au moins appelé.
+        """
+        ordered = sorted(self.calls.items(), key=lambda item: -item[1])
+        return {f"{method} {route}": count for (method, route), count in ordered}
+
+    def summary(self) -> Text:
+        """
+        Résumé lisible de la trace.
+        """
+        elapsed = (time.perf_counter() - self.started_at) * 1000
+        lines = [f"{self.name}: {self.total} appel(s) backend en {elapsed:.0f} ms"]
+        for (method, route), count in sorted(self.calls.items(), key=lambda item: -item[1]):
+            lines.append(
+                f"  • {method} {route} ×{count} ({self.durations[(method, route)] * 1000:.0f} ms)"
+            )
+        return "\n".join(lines)
+
+
+_current_trace: ContextVar[Optional[BackendCallTrace]] = ContextVar('backend_call_trace', default=None)
+# Trace de l'action Rasa en cours (posée par trace_backend_calls)
+_action_trace: ContextVar[Optional[BackendCallTrace]] = ContextVar('backend_action_trace', default=None)
+
+
+def record_backend_call(method: Text, route: Text, duration: float):
+    """
+    Appelé par BackendService pour chaque requête envoyée (sans effet hors trace).
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(method, route, duration)
+
+
+def record_stale_data(key: Text, age: float):
+    """
+    Appelé par BackendService quand il sert une donnée périmée (sans effet hors trace).
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record_stale(key, age)
+
+
+def stale_data_notice(trace: BackendCallTrace) -> Optional[Text]:
+    """
+    Avertissement pour l'utilisateur si la trace contient des données périmées (None sinon).
+    """
+    if not trace.stale:
+        return None
+    minutes = max(1, round(max(trace.stale.values()) / 60))
+    return (
+        "⚠️ Le serveur des demandes ne répond pas pour le moment : certaines informations "
+        f"proviennent du cache (jusqu'à {minutes} min) et peuvent ne pas être à jour."
+    )
+
+
+def notify_stale_data(dispatcher: Any, trace: BackendCallTrace):
+    """
+    Envoie l'avertissement de données périmées à l'utilisateur (une fois par action).
+    """
+    notice = stale_data_notice(trace)
+    if notice:
+        logger.warning(f"🕰️ {trace.name}: données périmées servies {sorted(trace.stale)}")
+        dispatcher.utter_message(text=notice)
+
+
+def current_trace() -> Optional[BackendCallTrace]:
+    """
+    Trace de l'exécution en cours (None hors d'une action tracée).
+    """
+    return _current_trace.get()
+
+
+def current_sender() -> Optional[Text]:
+    """
+    Conversation de l'action en cours (None hors d'une action tracée).
+
+    Clé de la file équitable du limiteur de concurrence : toute action qui
+    appelle le backend est décorée par trace_backend_calls. Les appels faits
+    hors action (tâches de fond, scripts) partagent la file None.
+    """
+    trace = _current_trace.get()
+    return trace.sender_id if trace is not None else None
+
+
+@contextmanager
+def backend_call_trace(name: Text, sender_id: Optional[Text] = None) -> Iterator[BackendCallTrace]:
+    """
+    Trace les appels au backend effectués dans le bloc.
+
+    Usage:
+        with backend_call_trace("liste_demandes") as trace:
+            action.run(dispatcher, tracker, domain)
+        print(trace.summary())
+    """
+    parent = _current_trace.get()
+    if sender_id is None and parent is not None:
+        sender_id = parent.sender_id
+    trace = BackendCallTrace(name, sender_id, parent)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def assert_backend_call_budget(max_calls: int, per_endpoint: Optional[int] = None,
+                               name: Text = "bloc") -> Iterator[BackendCallTrace]:
+    """
+    Helper de test : échoue si le bloc dépasse un budget d'appels au backend.
+
+    Args:
+        max_calls: Nombre maximum d'appels au total
+        per_endpoint: Nombre maximum d'appels à un même endpoint (détecte les N+1)
+        name: Nom affiché dans le message d'erreur
+
+    Raises:
+        AssertionError: Si le budget est dépassé (le message liste les endpoints)
+
+    Usage:
+        with assert_backend_call_budget(max_calls=5, per_endpoint=1):
+            ActionAfficherListeDemandes().run(dispatcher, tracker, domain)
+    """
+    with backend_call_trace(name) as trace:
+        yield trace
+
+    if trace.total > max_calls:
+        raise AssertionError(f"Budget d'appels backend dépassé ({trace.total} > {max_calls})\n{trace.summary()}")
+    if per_endpoint is not None:
+        over = {endpoint: count for endpoint, count in trace.by_endpoint().items() if count > per_endpoint}
+        if over:
+            raise AssertionError(
+                f"Endpoint(s) appelé(s) plus de {per_endpoint} fois (N+1 probable): {over}\n{trace.summary()}"
+            )
+
+
+# Au-delà de ce nombre d'appels par action, un avertissement est journalisé
+_call_budget = int(os.getenv('BACKEND_CALL_BUDGET', '20'))
+
+
+def trace_backend_calls(func):
+    """
+    Décorateur pour tracer les appels au backend d'une action Rasa.
+
+    Usage:
+        @trace_backend_calls
+        def run(self, dispatcher, tracker, domain):
+            ...
+
+    Fonctionne aussi sur un run asynchrone (async def) : la trace couvre
+    toute la coroutine, tâches lancées avec asyncio.gather comprises.
+
+    Le résumé est journalisé à la fin de l'action ; un avertissement est émis
+    au-delà de BACKEND_CALL_BUDGET appels (20 par défaut). Si des données ont
+    été servies en mode dégradé, l'utilisateur en est prévenu.
+
+    Une action exécutée par une autre action tracée (validateurs appelés par
+    ActionValidateSlots) compte dans la trace de l'action englobante, qui
+    seule fait le rapport.
+    """
+    def action_name(action: Any) -> Text:
+        return action.name() if hasattr(action, 'name') else func.__qualname__
+
+    def report(dispatcher: Any, trace: BackendCallTrace):
+        notify_stale_data(dispatcher, trace)
+
+        if trace.total > _call_budget:
+            logger.warning(f"🐢 Budget d'appels backend dépassé ({trace.total} > {_call_budget})\n{trace.summary()}")
+        elif trace.total:
+            logger.info(f"📊 {trace.summary()}")
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(self, dispatcher: Any, tracker: Any, domain: Dict[Text, Any]):
+            if _action_trace.get() is not None:
+                return await func(self, dispatcher, tracker, domain)
+            with backend_call_trace(action_name(self), getattr(tracker, 'sender_id', None)) as trace:
+                token = _action_trace.set(trace)
+                try:
+                    result = await func(self, dispatcher, tracker, domain)
+                finally:
+                    _action_trace.reset(token)
+            report(dispatcher, trace)
+            return result
+
+        async_wrapper.traces_backend_calls = True
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(self, dispatcher: Any, tracker: Any, domain: Dict[Text, Any]):
+        if _action_trace.get() is not None:
+            return func(self, dispatcher, tracker, domain)
+        with backend_call_trace(action_name(self), getattr(tracker, 'sender_id', None)) as trace:
+            token = _action_trace.set(trace)
+            try:
+                result = func(self, dispatcher, tracker, domain)
+            finally:
+                _action_trace.reset(token)
+        report(dispatcher, trace)
+        return result
+
+    wrapper.traces_backend_calls = True
+    return wrapper
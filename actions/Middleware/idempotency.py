@@ -0,0 +1,177 @@
+"""
+Suppression des soumissions en double (double clic, nouvelle tentative de Rasa).
+Chaque soumission est identifiée par une clé d'idempotence déterministe
+(sender_id + contenu canonique) : une soumission identique dans la fenêtre
+reçoit le résultat de la première, sans nouvel upload ni nouvel appel au backend.
+
+Le registre est en mémoire, donc propre à chaque processus : deux workers du
+serveur d'actions ne voient pas les soumissions l'un de l'autre. La même clé
+est envoyée au backend dans l'en-tête Idempotency-Key (POST Demandes) ; le
+backend doit l'honorer (rejouer la réponse de la première création pour une
+clé déjà vue) pour que la déduplication tienne avec plusieurs workers.
+"""
+
+from typing import Any, Dict, Optional, Text, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def make_idempotency_key(sender_id: Text, payload: Any) -> str:
+    """
+    Génère une clé d'idempotence déterministe.
+
+    Args:
+        sender_id: Identifiant de la conversation
+        payload: Contenu de la soumission (dict, liste... sérialisable en JSON)
+
+    Returns:
+        Hash SHA-256 de la conversation et du contenu canonique
+    """
+    canonical = json.dumps(
+        {'sender_id': sender_id, 'payload': payload},
+        sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class _Submission:
+    """État d'une soumission : en cours (event non levé) puis terminée"""
+
+    __slots__ = ('event', 'result', 'done', 'finished_at')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.done = False
+        self.finished_at = None
+
+
+class IdempotencyStore:
+    """
+    Résultats des soumissions récentes, par clé d'idempotence.
+    """
+
+    def __init__(self, window_seconds: float = 120, wait_timeout: float = 60):
+        """
+        Args:
+            window_seconds: Durée pendant laquelle une soumission terminée est rejouée
+            wait_timeout: Attente maximale d'une soumission identique en cours
+        """
+        self._window = window_seconds
+        self._wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._submissions: Dict[str, _Submission] = {}
+        self._uploads: Dict[str, Tuple[Text, float]] = {}
+
+    def _clean_expired(self):
+        """
+        Supprime les soumissions et uploads sortis de la fenêtre (appelé sous verrou).
+        """
+        now = time.monotonic()
+        for key in [k for k, s in self._submissions.items()
+                    if s.finished_at is not None and now - s.finished_at > self._window]:
+            del self._submissions[key]
+        for key in [k for k, (_, at) in self._uploads.items() if now - at > self._window]:
+            del self._uploads[key]
+
+    def begin(self, key: str) -> Tuple[bool, Optional[Any]]:
+        """
+        Réserve une clé avant d'exécuter la soumission.
+
+        Args:
+            key: Clé d'idempotence
+
+        Returns:
+            (True, None) si l'appelant doit exécuter la soumission puis appeler
+            complete() ou fail() ; (False, résultat) si une soumission identique
+            a déjà abouti (ou abouti pendant l'attente) ; (False, None) si elle
+            est toujours en cours après wait_timeout
+
+        Bloque jusqu'à wait_timeout pendant une soumission identique en cours :
+        à appeler hors de la boucle d'événements (ActionSubmitFormAddDdr passe
+        par le pool de l'AsyncBackendService). Si la soumission attendue échoue,
+        l'appelant la reprend à son compte.
+        """
+        deadline = time.monotonic() + self._wait_timeout
+        while True:
+            with self._lock:
+                self._clean_expired()
+                submission = self._submissions.get(key)
+                if submission is None:
+                    self._submissions[key] = _Submission()
+                    return True, None
+                if submission.done:
+                    logger.warning(f"🚫 Soumission en double ignorée (clé {key[:12]})")
+                    return False, submission.result
+
+            # Soumission identique en cours : attendre son résultat
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"⏳ Soumission identique toujours en cours (clé {key[:12]})")
+                return False, None
+            submission.event.wait(remaining)
+
+    def complete(self, key: str, result: Any):
+        """
+        Enregistre le résultat d'une soumission réussie.
+        """
+        with self._lock:
+            submission = self._submissions.setdefault(key, _Submission())
+            submission.result = result
+            submission.done = True
+            submission.finished_at = time.monotonic()
+        submission.event.set()
+
+    def fail(self, key: str):
+        """
+        Libère une clé après un échec : une nouvelle tentative sera exécutée.
+        """
+        with self._lock:
+            submission = self._submissions.get(key)
+            if submission is not None and not submission.done:
+                del self._submissions[key]
+        if submission is not None:
+            submission.event.set()
+
+    def get_upload(self, key: str) -> Optional[Text]:
+        """
+        Nom du fichier déjà uploadé pour cette pièce jointe (None sinon).
+        """
+        with self._lock:
+            upload = self._uploads.get(key)
+        return upload[0] if upload else None
+
+    def remember_upload(self, key: str, filename: Text):
+        """
+        Mémorise un upload réussi (réutilisé si la création échoue puis est relancée).
+        """
+        with self._lock:
+            self._uploads[key] = (filename, time.monotonic())
+
+    def clear(self):
+        """
+        Vide les soumissions terminées et les uploads mémorisés.
+        """
+        with self._lock:
+            for key in [k for k, s in self._submissions.items() if s.done]:
+                del self._submissions[key]
+            self._uploads.clear()
+
+
+# Instance globale (fenêtre configurable avec SUBMISSION_IDEMPOTENCY_WINDOW)
+_submission_store = IdempotencyStore(
+    window_seconds=float(os.getenv('SUBMISSION_IDEMPOTENCY_WINDOW', '120'))
+)
+
+
+def get_submission_store() -> IdempotencyStore:
+    """
+    Retourne l'instance globale des soumissions récentes.
+    """
+    return _submission_store
@@ -0,0 +1,70 @@
+"""
+Préchargement spéculatif d'une demande dès que le NLU extrait une entité id_demande.
+Les actions de vérification (validation, rejet, flux) chargent ensuite la demande
+avec ses détails : elles rejoignent les requêtes encore en cours ou reçoivent
+les réponses déjà arrivées, au lieu de tout redemander au backend.
+
+Les routes suivent le type de la demande (entité ou slot type_demande) : DDR ou
+DMOE. Type inconnu : rien n'est préchargé, plutôt que des routes d'un autre type.
+"""
+
+from typing import Optional, Text
+from rasa_sdk import Tracker
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def detected_demande_id(tracker: Tracker) -> Optional[int]:
+    """
+    Identifiant de demande extrait du dernier message (None si absent ou invalide).
+    """
+    for entity in tracker.latest_message.get('entities', []):
+        if entity.get('entity') != 'id_demande':
+            continue
+        try:
+            return int(entity.get('value'))
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def detected_type_demande(tracker: Tracker) -> Optional[Text]:
+    """
+    Type de la demande (entité du dernier message, sinon slot type_demande), en majuscules.
+    """
+    for entity in tracker.latest_message.get('entities', []):
+        if entity.get('entity') == 'type_demande' and entity.get('value'):
+            return str(entity.get('value')).upper()
+    type_demande = tracker.get_slot("type_demande")
+    return str(type_demande).upper() if type_demande else None
+
+
+def prefetch_detected_demande(tracker: Tracker) -> Optional[int]:
+    """
+    Lance en arrière-plan le chargement de la demande détectée (non bloquant).
+
+    Returns:
+        L'identifiant préchargé, None si aucune entité id_demande exploitable,
+        si le type de la demande n'est pas connu ou si rien n'a été lancé
+    """
+    demande_id = detected_demande_id(tracker)
+    if demande_id is None:
+        return None
+    type_demande = detected_type_demande(tracker)
+    if type_demande is None:
+        logger.debug(f"Type de la demande {demande_id} inconnu : pas de préchargement")
+        return None
+
+    # Import local : ddr_service dépend lui-même du package Middleware
+    from actions.services.ddr_service import get_backend_service
+
+    sender_id: Text = tracker.sender_id
+    try:
+        if get_backend_service().prefetch_demande(demande_id, type_demande, sender_id) is None:
+            return None
+    except Exception as e:
+        logger.warning(f"⚠️ Préchargement de la demande {demande_id} impossible: {e}")
+        return None
+    logger.info(f"🔮 Préchargement spéculatif de la demande {type_demande} {demande_id}")
+    return demande_id
@@ -5,4 +5,5 @@ from .principal import *
 from ..validation.dotation import *
 from .helper_handler import *
 from .flux_recrutement_handler import *
-from .consultation_demande import *
\ No newline at end of file
+from .consultation_demande import *
+from .session_handler import *
\ No newline at end of file
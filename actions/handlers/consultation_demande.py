@@ -7,6 +7,7 @@ import logging
 # Importer les services nécessaires
 from actions.services.Calculate.DDR_calcul import DemandeSearchService
 from actions.services.ddr_service import get_backend_service
+from actions.Middleware.backend_tracer import trace_backend_calls
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,7 @@ class ActionAfficherStatutDemande(Action):
     def name(self) -> Text:
         return "action_afficher_statut_demande"
     
+    @trace_backend_calls
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -311,6 +313,7 @@ class ActionAfficherListeDemandes(Action):
     def name(self) -> Text:
         return "action_afficher_liste_demandes"
     
+    @trace_backend_calls
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -382,6 +385,8 @@ class ActionAfficherListeDemandes(Action):
             # ========== 5. AFFICHAGE DES DDR ==========
             
             # Limiter à 10 demandes
+            # Postes des demandes affichées, récupérés en un seul appel
+            postes = backend.get_postes_by_ids([d.get('PosteId') for d in demandes_ddr[:10] if d.get('PosteId')])
             for demande in demandes_ddr[:10]:
                 id_ddr = demande.get('IdDdr')
                 statut_id = demande.get('StatutId')
@@ -391,7 +396,7 @@ class ActionAfficherListeDemandes(Action):
                 poste_id = demande.get('PosteId')
                 poste_nom = "N/A"
                 if poste_id:
-                    poste = backend.get_poste_by_id(poste_id)
+                    poste = postes.get(poste_id)
                     if poste:
                         poste_nom = poste.get('NomPoste', 'N/A')
                 
@@ -436,6 +441,7 @@ class ActionAfficherDemandesATraiter(Action):
     def name(self) -> Text:
         return "action_afficher_demandes_a_traiter"
     
+    @trace_backend_calls
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -525,6 +531,8 @@ class ActionAfficherDemandesATraiter(Action):
             # ========== 5. AFFICHAGE DES DEMANDES À TRAITER ==========
             
             # Limiter à 10 demandes
+            # Postes des demandes affichées, récupérés en un seul appel
+            postes = backend.get_postes_by_ids([d.get('PosteId') for d in demandes_a_traiter[:10] if d.get('PosteId')])
             for demande in demandes_a_traiter[:10]:
                 demande_id = demande.get('IdDdr')
                 statut_id = demande.get('StatutId')
@@ -536,7 +544,7 @@ class ActionAfficherDemandesATraiter(Action):
                 poste_id = demande.get('PosteId')
                 poste_nom = "N/A"
                 if poste_id:
-                    poste = backend.get_poste_by_id(poste_id)
+                    poste = postes.get(poste_id)
                     if poste:
                         poste_nom = poste.get('NomPoste', 'N/A')
                 
@@ -10,19 +10,54 @@ logger = logging.getLogger(__name__)
 
     
 from actions.services.ddr_service import get_backend_service
+from actions.Middleware.backend_tracer import trace_backend_calls
+from actions.Middleware.idempotency import get_submission_store, make_idempotency_key
+from actions.services.async_ddr_service import get_backend_service as get_async_backend_service
 class ActionSubmitFormAddDdr(Action):
     """Action de soumission du formulaire DDR avec upload des fichiers"""
     
     def name(self) -> Text:
         return "action_submit_form_add_ddr"
-    def run(
+    
+    @staticmethod
+    def submission_key(tracker: Tracker, submitted_slots: Dict[Text, Any], username: Text,
+                       attachments: List[Dict[Text, Any]]) -> str:
+        """
+        Clé d'idempotence : même conversation + même contenu = même soumission
+        (double clic, nouvelle tentative de Rasa) -> pas de nouvel upload ni de POST.
+        Le registre est propre au processus ; entre workers, c'est le backend qui
+        déduplique grâce à l'en-tête Idempotency-Key envoyé avec la création.
+        """
+        return make_idempotency_key(tracker.sender_id, {
+            'slots': submitted_slots,
+            'duree_contrat': tracker.get_slot("duree_contrat"),
+            'poste_encadreur': tracker.get_slot("poste_encadreur"),
+            'username': username,
+            'attachments': attachments,
+        })
+    
+    @trace_backend_calls
+    async def run(
         self,
         dispatcher: CollectingDispatcher,
         tracker: Tracker,
         domain: Dict[Text, Any],
     ) -> List[Dict[Text, Any]]:
         """Soumettre le formulaire DDR et créer la demande via l'API"""
-        
+        # Uploads, création et attente d'une soumission identique en cours :
+        # hors de la boucle d'événements (les autres conversations continuent)
+        backend = await get_async_backend_service()
+        return await backend.run_sync(self._submit, dispatcher, tracker, domain)
+    
+    def _submit(
+        self,
+        dispatcher: CollectingDispatcher,
+        tracker: Tracker,
+        domain: Dict[Text, Any],
+    ) -> List[Dict[Text, Any]]:
+        submissions = get_submission_store()
+        idempotency_key = None
+        submission_done = False
         try:
             # ============================================
             # 1. RÉCUPÉRATION DES SLOTS
@@ -77,11 +112,13 @@ class ActionSubmitFormAddDdr(Action):
                 'piece_jointe': 'Pièce jointe'
             }
             
+            # Valeurs soumises, lues depuis les slots (même contenu pour la clé d'idempotence)
+            submitted_slots = {field_name: tracker.get_slot(field_name) for field_name in required_fields}
+            
             # Vérifier quels champs sont manquants
             missing_fields = []
             for field_name, field_label in required_fields.items():
-                field_value = locals().get(field_name)
-                if not field_value:
+                if not submitted_slots[field_name]:
                     missing_fields.append(field_label)
             
             # Si des champs sont manquants, afficher le message d'erreur détaillé
@@ -116,6 +153,21 @@ class ActionSubmitFormAddDdr(Action):
             all_metadata = {**session_metadata, **latest_metadata}
             attachments = all_metadata.get("attachments", [])
             
+            # Soumission identique en cours : attend son résultat (thread du pool, pas la boucle)
+            idempotency_key = self.submission_key(tracker, submitted_slots, username, attachments)
+            is_first, previous = submissions.begin(idempotency_key)
+            if not is_first:
+                idempotency_key = None
+                if previous is None:
+                    dispatcher.utter_message(text="⏳ Cette demande est déjà en cours de création, veuillez patienter.")
+                    return []
+                dispatcher.utter_message(
+                    text=f"ℹ️ Cette demande a déjà été créée (numéro #{previous['demande_id']}), "
+                         f"elle n'a pas été soumise une seconde fois."
+                )
+                logger.info(f"⏭️ Soumission DDR en double ignorée - ID: {previous['demande_id']}")
+                return previous['events']
+            
             logger.info(f"📎 Traitement de {len(attachments)} fichier(s) à uploader")
             
             if attachments:
@@ -125,7 +177,15 @@ class ActionSubmitFormAddDdr(Action):
                     filename = attachment.get('name', 'unknown')
                     logger.info(f"📤 Upload {i}/{len(attachments)}: {filename}")
                     
-                    uploaded_filename = backend.upload_file_from_metadata(attachment)
+                    # Fichier déjà uploadé par une tentative précédente (création échouée)
+                    upload_key = make_idempotency_key(tracker.sender_id, attachment)
+                    uploaded_filename = submissions.get_upload(upload_key)
+                    if uploaded_filename:
+                        logger.info(f"♻️ Fichier {i}/{len(attachments)} déjà uploadé: {uploaded_filename}")
+                    else:
+                        uploaded_filename = backend.upload_file_from_metadata(attachment)
+                        if uploaded_filename:
+                            submissions.remember_upload(upload_key, uploaded_filename)
                     
                     if uploaded_filename:
                         uploaded_files.append(uploaded_filename)
@@ -291,7 +351,7 @@ class ActionSubmitFormAddDdr(Action):
             
             dispatcher.utter_message(text="⏳ Création de la demande en cours...")
             print("------------------------------------------------------------------------------------------------Data envoyé a la base : ", demande_data)
-            response = backend.create_demande(demande_data)
+            response = backend.create_demande(demande_data, idempotency_key=idempotency_key)
             print("------------------------------------------------------------------------------------------------Response de la base : ", response)
             demande_id = 'N/A'
 
@@ -358,7 +418,7 @@ class ActionSubmitFormAddDdr(Action):
                 # 10. RÉINITIALISATION DES SLOTS + NETTOYAGE DES MÉTADONNÉES
                 # ============================================
                 
-                return [
+                events = [
                     SlotSet("id_demande", demande_id),
                     SlotSet("add_ddr_is_complet", False),
                     SlotSet("nature_contrat", None),
@@ -384,6 +444,9 @@ class ActionSubmitFormAddDdr(Action):
                     # 🧹 NETTOYAGE DES MÉTADONNÉES CONTENANT LES FICHIERS
                     SlotSet("session_started_metadata", None)
                 ]
+                submissions.complete(idempotency_key, {'demande_id': demande_id, 'events': events})
+                submission_done = True
+                return events
             
             else:
                 # ============================================
@@ -421,6 +484,11 @@ Veuillez réessayer ou contacter le support technique."""
             logger.error(f"❌ Exception dans action_submit_form_add_ddr: {e}", exc_info=True)
             
             return []
+        
+        finally:
+            # Échec : la clé est libérée pour permettre une nouvelle tentative
+            if idempotency_key and not submission_done:
+                submissions.fail(idempotency_key)
 class ActionVerifyIfAllInformationIsCompletAddDdr(Action):
     """Vérifie si toutes les informations DDR sont complètes et guide l'utilisateur"""
                         
@@ -432,6 +500,7 @@ class ActionVerifyIfAllInformationIsCompletAddDdr(Action):
         from actions.services.ddr_service import get_backend_service
         self.backend = get_backend_service()
     
+    @trace_backend_calls
     def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
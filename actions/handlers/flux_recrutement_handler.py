@@ -12,9 +12,11 @@ import logging
 from actions.services.Calculate.DDR_calcul import DemandeSearchService
 from actions.services.Calculate.Flux_calcul import FluxSearchService
 from actions.services.Calculate.RechercheNom import UserSearchService
-from actions.services.ddr_service import BackendService
+from actions.services.ddr_service import get_backend_service
 
 from actions.Middleware.message_deduplicator import deduplicate_messages
+from actions.Middleware.backend_tracer import trace_backend_calls
+from actions.Middleware.speculative_prefetch import prefetch_detected_demande
 
 logger = logging.getLogger(__name__)
 def extract_and_validate_validateurs(
@@ -351,6 +353,7 @@ class ActionVerifyIfAllInformationFluxIsComplet(Action):
         return None
 
     @deduplicate_messages
+    @trace_backend_calls
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -365,6 +368,10 @@ class ActionVerifyIfAllInformationFluxIsComplet(Action):
         logger.info(f"Message utilisateur: '{user_message}'")
         logger.info(f"Entités détectées: {entities}")
         
+        # Demande citée : ses détails se chargent pendant la recherche des validateurs
+        if not tracker.get_slot("id_demande"):
+            prefetch_detected_demande(tracker)
+        
         # ========== TRAITER LES VALIDATEURS AVEC LA FONCTION RÉUTILISABLE ==========
         current_validateurs = tracker.get_slot("nom_validateur_list") or []
         validateurs_mis_a_jour, validateur_slots = extract_and_validate_validateurs(
@@ -743,6 +750,7 @@ class ActionSoumettreFluxRecrutement(Action):
         return "action_soumettre_flux_recrutement"
 
     @deduplicate_messages
+    @trace_backend_calls
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -783,7 +791,7 @@ class ActionSoumettreFluxRecrutement(Action):
             demande_id_int = int(id_demande)
             flux_id_int = int(nom_flux_id)
             
-            backend_service = BackendService()
+            backend_service = get_backend_service()
             searcher = DemandeSearchService()
             demande_data = searcher.search_with_details(demande_id_int)
             
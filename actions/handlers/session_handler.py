@@ -0,0 +1,43 @@
+from typing import Any, Text, Dict, List
+from rasa_sdk import Action, Tracker
+from rasa_sdk.executor import CollectingDispatcher
+from rasa_sdk.events import SlotSet, SessionStarted, ActionExecuted
+import logging
+
+from actions.services.ddr_service import get_backend_service
+from actions.Middleware.backend_tracer import trace_backend_calls
+
+logger = logging.getLogger(__name__)
+
+
+class ActionSessionStart(Action):
+    """
+    Début de session : comportement par défaut de Rasa + préchargement
+    en arrière-plan des données de l'utilisateur (détails, demandes et
+    tâches à valider, tables de référence) pour que le premier tour soit
+    servi depuis la mémoire.
+    """
+
+    def name(self) -> Text:
+        return "action_session_start"
+
+    @trace_backend_calls
+    def run(self, dispatcher: CollectingDispatcher,
+            tracker: Tracker,
+            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        metadata = tracker.get_slot("session_started_metadata") or {}
+
+        # Même résolution que les actions : username des métadonnées, sinon sender_id
+        username = metadata.get("username") or tracker.sender_id
+
+        # ========== PRÉCHARGEMENT (NON BLOQUANT) ==========
+        try:
+            get_backend_service().prefetch_session(username, tracker.sender_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Préchargement de session impossible pour {username}: {e}")
+
+        events: List[Dict[Text, Any]] = [SessionStarted()]
+        if metadata:
+            events.append(SlotSet("session_started_metadata", metadata))
+        events.append(ActionExecuted("action_listen"))
+        return events
@@ -6,7 +6,8 @@ import logging
 from actions.services.Calculate.DDR_calcul import DemandeSearchService
 from actions.services.Calculate.Flux_calcul import FluxSearchService
 from actions.services.Calculate.RechercheNom import UserSearchService
-from actions.services.ddr_service import BackendService
+from actions.services.ddr_service import get_backend_service
+from actions.Middleware.backend_tracer import trace_backend_calls
 
 from actions.Middleware.message_deduplicator import deduplicate_messages
 
@@ -24,6 +25,7 @@ class ActionVerifyIfAllInformationValidationIsComplet(Action):
         return "action_verify_if_all_information_validation_is_complet"
         
     @deduplicate_messages
+    @trace_backend_calls
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -306,6 +308,7 @@ class ActionVerifyIfAllInformationIsRejectionComplet(Action):
         return "action_verify_if_all_information_rejection_is_complet"
 
     @deduplicate_messages
+    @trace_backend_calls
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -724,6 +727,7 @@ class ActionSoumettreValidationRecrutement(Action):
         return "action_soumettre_validation_recrutement"
         
     @deduplicate_messages
+    @trace_backend_calls
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -758,7 +762,7 @@ class ActionSoumettreValidationRecrutement(Action):
         
         try:
             # Initialiser le service backend
-            backend_service = BackendService()
+            backend_service = get_backend_service()
             
             # Convertir l'ID en entier
             demande_id_int = int(id_demande)
@@ -874,6 +878,7 @@ class ActionSoumettreRejetRecrutement(Action):
         return "action_soumettre_rejet_recrutement"
         
     @deduplicate_messages
+    @trace_backend_calls
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -901,7 +906,7 @@ class ActionSoumettreRejetRecrutement(Action):
         
         try:
             # Initialiser le service backend
-            backend_service = BackendService()
+            backend_service = get_backend_service()
             
             # Convertir l'ID en entier
             demande_id_int = int(id_demande)
@@ -33,6 +33,12 @@ class FluxSearchService:
         self.default_threshold = default_threshold
         self.default_limit = default_limit
         self._flux_cache = None
+        self.backend_service.add_invalidation_listener(self._on_backend_invalidation)
+    
+    def _on_backend_invalidation(self, keys: List[str]) -> None:
+        """Vide le cache local quand une écriture touche les flux"""
+        if self.backend_service.affects(keys, 'FluxMouvements/with-user-details'):
+            self.refresh_cache()
     
     @staticmethod
     def normalize_text(text: str) -> str:
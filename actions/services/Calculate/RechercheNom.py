@@ -1,7 +1,6 @@
 import sys
 from pathlib import Path
 from typing import Optional, List, Dict
-import unicodedata
 import re
 
 # Ajouter le répertoire racine du projet au PYTHONPATH
@@ -10,6 +9,7 @@ project_root = current_file.parent.parent.parent.parent  # Remonte à Rasa4/
 sys.path.insert(0, str(project_root))
 
 from actions.services.ddr_service import get_backend_service
+from actions.services.user_directory import normalize_text
 
 
 class UserSearchService:
@@ -25,6 +25,12 @@ class UserSearchService:
         """Initialise le service de recherche avec l'instance du backend"""
         self.service = get_backend_service()
         self._users_cache: Optional[List[Dict]] = None
+        self.service.add_invalidation_listener(self._on_backend_invalidation)
+    
+    def _on_backend_invalidation(self, keys: List[str]) -> None:
+        """Vide le cache local quand la liste des utilisateurs est invalidée"""
+        if self.service.affects(keys, 'Login/getAllUsers'):
+            self._users_cache = None
     
     @staticmethod
     def normalize_text(text: str) -> str:
@@ -41,17 +47,7 @@ class UserSearchService:
             >>> UserSearchService.normalize_text("Éléonore")
             'eleonore'
         """
-        if not text:
-            return ""
-        
-        # Supprimer les accents
-        text = ''.join(
-            c for c in unicodedata.normalize('NFD', text)
-            if unicodedata.category(c) != 'Mn'
-        )
-        
-        # Convertir en minuscules
-        return text.lower()
+        return normalize_text(text)
     
     def get_all_users(self, force_refresh: bool = False) -> List[Dict]:
         """
@@ -101,84 +97,14 @@ class UserSearchService:
         if not search_query or not search_query.strip():
             return []
         
-        # Récupérer tous les utilisateurs
-        all_users = self.get_all_users()
-        
-        if not all_users:
+        # Annuaire indexé (noms normalisés une fois par version de la liste)
+        try:
+            directory = self.service.get_user_directory()
+        except Exception as e:
+            print(f"❌ Erreur lors de la récupération des utilisateurs: {e}")
             return []
         
-        # Normaliser la requête de recherche
-        normalized_query = self.normalize_text(search_query)
-        query_words = normalized_query.split()
-        
-        # Résultats avec score de pertinence
-        results_with_score = []
-        
-        for user in all_users:
-            full_name = user.get('FullName', '')
-            
-            if not full_name:
-                continue
-            
-            # Normaliser le nom complet de l'utilisateur
-            normalized_name = self.normalize_text(full_name)
-            
-            # Calculer le score de correspondance
-            score = self._calculate_match_score(normalized_name, query_words)
-            
-            if score > 0:
-                results_with_score.append((user, score))
-        
-        # Trier par score décroissant
-        results_with_score.sort(key=lambda x: x[1], reverse=True)
-        
-        # Retourner uniquement les utilisateurs (sans le score)
-        return [user for user, score in results_with_score[:max_results]]
-    
-    def _calculate_match_score(self, normalized_name: str, query_words: List[str]) -> int:
-        """
-        Calcule un score de correspondance entre un nom et une requête
-        
-        Args:
-            normalized_name (str): Le nom normalisé de l'utilisateur
-            query_words (List[str]): Les mots de la requête
-            
-        Returns:
-            int: Le score de correspondance (0 = aucune correspondance)
-        """
-        score = 0
-        name_words = normalized_name.split()
-        
-        # Vérifier si tous les mots de la requête sont présents
-        for query_word in query_words:
-            word_found = False
-            
-            for name_word in name_words:
-                # Correspondance exacte
-                if query_word == name_word:
-                    score += 10
-                    word_found = True
-                    break
-                # Correspondance partielle (début du mot)
-                elif name_word.startswith(query_word):
-                    score += 7
-                    word_found = True
-                    break
-                # Correspondance partielle (contient le mot)
-                elif query_word in name_word:
-                    score += 5
-                    word_found = True
-                    break
-            
-            # Si un mot de la requête n'est pas trouvé, score = 0
-            if not word_found:
-                return 0
-        
-        # Bonus si la requête correspond au début du nom
-        if normalized_name.startswith(' '.join(query_words)):
-            score += 15
-        
-        return score
+        return directory.search(search_query, max_results)
     
     def search_user_by_matricule(self, matricule: str) -> Optional[Dict]:
         """
@@ -0,0 +1,93 @@
+#actions/services/async_ddr_service.py
+"""
+Accès asynchrone à BackendService pour les actions async du serveur d'actions.
+
+Les actions Rasa async (ex: ActionValidateSlots.run) s'exécutent sur la boucle
+d'événements du serveur d'actions : un appel bloquant `requests` y fige toutes
+les autres conversations. AsyncBackendService expose les mêmes méthodes que
+BackendService sous forme de coroutines : chaque appel s'exécute sur un pool
+de threads borné (BACKEND_ASYNC_WORKERS, 16 par défaut) et passe par le même
+_send (disjoncteur, limiteur de concurrence, retries, métriques, caches) que
+les actions synchrones. Le contexte de l'appelant (trace de l'action,
+conversation pour la file équitable du limiteur) suit l'appel dans le thread.
+
+Usage:
+    >>> backend = await get_backend_service()
+    >>> postes = await backend.get_postes()
+    >>> events = await backend.run_sync(validator.run, dispatcher, tracker, domain)
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from actions.services import ddr_service
+from actions.services.ddr_service import BackendService
+
+
+class AsyncBackendService:
+    """
+    Façade awaitable d'un BackendService
+
+    Args:
+        service (BackendService): Service synchrone dont les politiques sont réutilisées
+        max_workers (int): Taille du pool des appels bloquants
+    """
+
+    def __init__(self, service: BackendService, max_workers: Optional[int] = None):
+        self.service = service
+        self.max_workers = max_workers or int(os.getenv('BACKEND_ASYNC_WORKERS', '16'))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='backend-async')
+
+    async def run_sync(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Exécute func (bloquant) sur le pool sans bloquer la boucle, contexte compris"""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(context.run, func, *args, **kwargs)
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.service, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self.run_sync(attr, *args, **kwargs)
+
+        return method
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+# Singleton instance
+_async_backend_service = None
+_async_backend_service_lock = threading.Lock()
+
+
+def _get_async_backend_service() -> AsyncBackendService:
+    global _async_backend_service
+    with _async_backend_service_lock:
+        service = ddr_service.get_backend_service()
+        # Suit le singleton synchrone (remplacé dans les tests)
+        if _async_backend_service is None or _async_backend_service.service is not service:
+            if _async_backend_service is not None:
+                _async_backend_service.shutdown()
+            _async_backend_service = AsyncBackendService(service)
+        return _async_backend_service
+
+
+async def get_backend_service() -> AsyncBackendService:
+    """
+    Get singleton AsyncBackendService (wraps the BackendService singleton)
+
+    The first call builds the synchronous service off the event loop.
+    """
+    if _async_backend_service is not None and _async_backend_service.service is ddr_service._backend_service:
+        return _async_backend_service
+    return await asyncio.get_running_loop().run_in_executor(None, _get_async_backend_service)
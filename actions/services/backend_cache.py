@@ -0,0 +1,312 @@
+#actions/services/backend_cache.py
+"""
+Cache applicatif des données de référence du backend.
+
+Les listes de référence (postes, directions, motifs, statuts...) changent
+rarement mais étaient re-téléchargées à chaque appel de validateur. Ce module
+conserve la valeur décodée de chaque endpoint pendant un TTL propre à
+l'endpoint, puis la sert encore pendant une fenêtre "stale-while-revalidate"
+le temps qu'un rafraîchissement en arrière-plan la remplace. La revalidation
+HTTP (ETag / If-None-Match / Cache-Control) est assurée par CacheControl sur
+la session de BackendService, dont les réponses sont gardées dans un
+HttpResponseCache borné (LRU).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from cachecontrol.cache import BaseCache
+
+
+class CacheEntry:
+    """
+    Valeur décodée d'un endpoint avec ses métadonnées de fraîcheur
+
+    stored_at sert au TTL ; validated_at est le dernier instant où le backend
+    a confirmé la valeur (plus ancien pour une entrée chargée d'un instantané)
+    et sert à borner l'âge des données servies en mode dégradé.
+    """
+
+    __slots__ = ('value', 'stored_at', 'validated_at', 'ttl', 'etag')
+
+    def __init__(self, value: Any, ttl: float, etag: Optional[str] = None, stored_at: Optional[float] = None,
+                 validated_at: Optional[float] = None):
+        self.value = value
+        self.ttl = ttl
+        self.etag = etag
+        self.stored_at = time.monotonic() if stored_at is None else stored_at
+        self.validated_at = self.stored_at if validated_at is None else validated_at
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+    @property
+    def data_age(self) -> float:
+        """Secondes écoulées depuis la dernière confirmation par le backend"""
+        return time.monotonic() - self.validated_at
+
+    def is_fresh(self) -> bool:
+        return self.age < self.ttl
+
+
+class ReferenceCache:
+    """
+    Cache TTL thread-safe avec stale-while-revalidate
+
+    Args:
+        stale_while_revalidate (float): Durée (secondes) pendant laquelle une
+            entrée expirée est encore servie pendant son rafraîchissement
+    """
+
+    def __init__(self, stale_while_revalidate: float = 60.0):
+        self.stale_while_revalidate = stale_while_revalidate
+        self._entries: Dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'revalidated': 0}
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, value: Any, ttl: float, etag: Optional[str] = None,
+            stored_at: Optional[float] = None, validated_at: Optional[float] = None) -> CacheEntry:
+        entry = CacheEntry(value, ttl, etag, stored_at, validated_at)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def touch(self, key: str) -> None:
+        """Remet à zéro l'âge d'une entrée revalidée sans changement (même ETag)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = entry.validated_at = time.monotonic()
+                self._stats['revalidated'] += 1
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Supprime une entrée, ou tout le cache si key est None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Supprime les entrées dont la clé commence par prefix"""
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def purge_expired(self) -> int:
+        """Supprime les entrées dont le TTL est dépassé"""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if not entry.is_fresh()]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[Optional[CacheEntry]], Any]) -> Any:
+        """
+        Retourne la valeur en cache ou la récupère via fetch
+
+        Args:
+            key (str): Clé du cache (chemin de l'endpoint)
+            fetch (Callable): Fonction de récupération, reçoit l'entrée
+                actuelle (ou None) et retourne la nouvelle valeur
+
+        Returns:
+            Any: Valeur fraîche, valeur périmée en cours de revalidation,
+                ou résultat de fetch en cas d'absence
+        """
+        entry = self.get(key)
+
+        if entry is not None:
+            if entry.is_fresh():
+                self._stats['hits'] += 1
+                return entry.value
+
+            if entry.age < entry.ttl + self.stale_while_revalidate:
+                self._stats['stale_hits'] += 1
+                self._refresh_in_background(key, fetch, entry)
+                return entry.value
+
+        self._stats['misses'] += 1
+        return fetch(entry)
+
+    def _refresh_in_background(self, key: str, fetch: Callable, entry: CacheEntry) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                fetch(entry)
+            except Exception as e:
+                print(f"⚠️ Rafraîchissement du cache '{key}' échoué: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"cache-refresh-{key}", daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques d'utilisation du cache"""
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries)}
+
+
+class StaleList(list):
+    """Liste servie depuis le cache en mode dégradé (backend indisponible)"""
+    stale = True
+    age = 0.0
+    source = None
+
+
+class StaleDict(dict):
+    """Objet servi depuis le cache en mode dégradé (backend indisponible)"""
+    stale = True
+    age = 0.0
+    source = None
+
+
+def mark_stale(value: Any, age: float) -> Any:
+    """Copie de value marquée comme périmée (listes et dictionnaires) ; source garde l'original"""
+    if isinstance(value, list):
+        stale = StaleList(value)
+    elif isinstance(value, dict):
+        stale = StaleDict(value)
+    else:
+        return value
+    stale.age = age
+    stale.source = value
+    return stale
+
+
+def is_stale(value: Any) -> bool:
+    """Indique si une valeur retournée par BackendService vient du mode dégradé"""
+    return getattr(value, 'stale', False)
+
+
+def unwrap_stale(value: Any) -> Any:
+    """Valeur d'origine d'une copie périmée (value elle-même sinon)"""
+    source = getattr(value, 'source', None) if is_stale(value) else None
+    return value if source is None else source
+
+
+class _InFlightCall:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Regroupe les appels identiques simultanés (request coalescing)
+
+    Le premier appelant d'une clé exécute la requête ; les appelants suivants
+    arrivant avant la fin attendent et reçoivent le même résultat décodé.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Any, _InFlightCall] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        """
+        Exécute fn une seule fois pour tous les appels concurrents sur key
+
+        Args:
+            key: Identifiant de la requête (méthode, URL, paramètres)
+            fn (Callable): Fonction effectuant la requête
+
+        Returns:
+            Any: Résultat partagé de fn (l'exception est propagée à tous)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+        return call.result
+
+    def in_flight(self) -> int:
+        """Nombre de requêtes distinctes actuellement en vol"""
+        with self._lock:
+            return len(self._calls)
+
+
+class HttpResponseCache(BaseCache):
+    """
+    Stockage LRU borné des réponses HTTP de CacheControl
+
+    Le DictCache par défaut de CacheControl garde une réponse par URL sans
+    limite (une entrée par Demandes/{id} consultée). Au-delà de max_entries,
+    la réponse la moins récemment utilisée est supprimée.
+
+    Args:
+        max_entries (int): Nombre maximum de réponses conservées
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, expires: Any = None) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Supprime les réponses dont l'URL commence par prefix"""
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
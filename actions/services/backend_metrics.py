@@ -0,0 +1,236 @@
+#actions/services/backend_metrics.py
+"""
+Métriques des appels au backend .NET (format texte Prometheus).
+
+Pour chaque endpoint (route template, ex: "Postes/{poste_id}") :
+- nombre de requêtes par méthode et code de statut
+- histogramme des latences
+- taille des réponses
+
+Activation : BACKEND_METRICS_ENABLED=true. Chaque worker du serveur d'actions
+sert alors ses métriques sur http://<BACKEND_METRICS_HOST>:<port>/metrics et
+l'état du backend (BackendService.get_health) sur /health. Le port est le
+premier libre à partir de BACKEND_METRICS_PORT (5056 par défaut, à côté du
+webhook sur 5055) parmi BACKEND_METRICS_PORT_RANGE ports (16 par défaut) :
+un worker par port, à déclarer comme cibles Prometheus distinctes. La métrique
+backend_metrics_worker_info indique le PID et le port de chaque worker.
+Les endpoints ne sont pas authentifiés et /health décrit l'état du backend :
+le serveur écoute sur 127.0.0.1 par défaut, BACKEND_METRICS_HOST=0.0.0.0 (ou
+l'adresse d'une interface) l'ouvre au scraper Prometheus d'une autre machine.
+Désactivées, get_backend_metrics() retourne None et BackendService n'enregistre rien.
+"""
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Bornes (secondes) de l'histogramme des latences
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _EndpointStats:
+    __slots__ = ('bucket_counts', 'count', 'duration_sum', 'size_sum')
+
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * bucket_count
+        self.count = 0
+        self.duration_sum = 0.0
+        self.size_sum = 0
+
+
+class BackendMetrics:
+    """
+    Collecteur thread-safe des métriques par endpoint
+
+    Args:
+        buckets (tuple): Bornes supérieures (secondes) de l'histogramme
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str], _EndpointStats] = {}
+        self._statuses: Dict[Tuple[str, str, str], int] = {}
+        # Sources de lignes supplémentaires (jauges de concurrence...)
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        """Ajoute une fonction retournant des lignes Prometheus à chaque export"""
+        self._collectors.append(collector)
+
+    def observe(self, method: str, endpoint: str, status: Optional[int], duration: float, size: int = 0) -> None:
+        """
+        Enregistre une requête
+
+        Args:
+            method (str): Méthode HTTP
+            endpoint (str): Route template de l'endpoint
+            status (int): Code HTTP, None si aucune réponse (erreur réseau)
+            duration (float): Durée en secondes
+            size (int): Taille de la réponse en octets
+        """
+        key = (method, endpoint)
+        status_key = (method, endpoint, str(status) if status is not None else 'error')
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = _EndpointStats(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    stats.bucket_counts[i] += 1
+                    break
+            stats.count += 1
+            stats.duration_sum += duration
+            stats.size_sum += size
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._statuses.clear()
+
+    def render_prometheus(self) -> str:
+        """Exporte les métriques au format texte Prometheus"""
+        with self._lock:
+            endpoints = {key: (list(s.bucket_counts), s.count, s.duration_sum, s.size_sum)
+                         for key, s in self._endpoints.items()}
+            statuses = dict(self._statuses)
+
+        lines = [
+            '# HELP backend_requests_total Requêtes envoyées au backend par endpoint et statut',
+            '# TYPE backend_requests_total counter',
+        ]
+        for (method, endpoint, status), count in sorted(statuses.items()):
+            lines.append(
+                f'backend_requests_total{{{_labels(method, endpoint)},status="{status}"}} {count}'
+            )
+
+        lines += [
+            '# HELP backend_request_duration_seconds Latence des requêtes au backend',
+            '# TYPE backend_request_duration_seconds histogram',
+        ]
+        for (method, endpoint), (bucket_counts, count, duration_sum, _) in sorted(endpoints.items()):
+            labels = _labels(method, endpoint)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'backend_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'backend_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'backend_request_duration_seconds_sum{{{labels}}} {duration_sum:.6f}')
+            lines.append(f'backend_request_duration_seconds_count{{{labels}}} {count}')
+
+        lines += [
+            '# HELP backend_response_size_bytes Taille des réponses du backend',
+            '# TYPE backend_response_size_bytes summary',
+        ]
+        for (method, endpoint), (_, count, _, size_sum) in sorted(endpoints.items()):
+            labels = _labels(method, endpoint)
+            lines.append(f'backend_response_size_bytes_sum{{{labels}}} {size_sum}')
+            lines.append(f'backend_response_size_bytes_count{{{labels}}} {count}')
+
+        for collector in self._collectors:
+            lines += collector()
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(method: str, endpoint: str) -> str:
+    endpoint = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+    return f'method="{method}",endpoint="{endpoint}"'
+
+
+def start_metrics_server(render: Callable[[], str], health: Optional[Callable[[], dict]] = None,
+                         port: int = 5056, host: str = '127.0.0.1', port_range: int = 1) -> Optional[ThreadingHTTPServer]:
+    """
+    Démarre un serveur HTTP (thread daemon) exposant /metrics et /health
+
+    Essaie port, port + 1... (port_range ports) : chaque worker obtient le sien.
+    N'écoute que sur la machine locale sauf si host est élargi (ex: '0.0.0.0').
+    Retourne None si aucun port n'est libre.
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path == '/metrics':
+                body = self.server.render().encode('utf-8')
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            elif path == '/health' and self.server.health is not None:
+                body = json.dumps(self.server.health(), default=str).encode('utf-8')
+                content_type = 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    last_error = None
+    for candidate in range(port, port + max(1, port_range)):
+        try:
+            server = ThreadingHTTPServer((host, candidate), MetricsHandler)
+        except OSError as e:
+            last_error = e
+            continue
+        server.render = render
+        server.health = health
+        threading.Thread(target=server.serve_forever, name='backend-metrics', daemon=True).start()
+        print(f"📊 Métriques backend (PID {os.getpid()}) disponibles sur http://{host}:{candidate}/metrics")
+        return server
+
+    print(f"⚠️ Impossible de démarrer le serveur de métriques sur les ports {port}-{port + max(1, port_range) - 1}: "
+          f"{last_error}")
+    return None
+
+
+def serve_backend_metrics(render: Callable[[], str], health: Optional[Callable[[], dict]] = None) -> None:
+    """
+    Expose render / health sur le serveur de métriques du worker
+
+    Démarre le serveur au premier appel (BACKEND_METRICS_PORT=0 : pas de serveur) ;
+    les appels suivants remplacent les sources servies.
+    """
+    global _metrics_server
+    with _backend_metrics_lock:
+        if _metrics_server is not None:
+            _metrics_server.render = render
+            _metrics_server.health = health
+            return
+        port = int(os.getenv('BACKEND_METRICS_PORT', '5056'))
+        if not port:
+            return
+        _metrics_server = start_metrics_server(
+            render, health, port,
+            host=os.getenv('BACKEND_METRICS_HOST', '127.0.0.1'),
+            port_range=int(os.getenv('BACKEND_METRICS_PORT_RANGE', '16')),
+        )
+        if _metrics_server is not None and _backend_metrics is not None:
+            worker = f'pid="{os.getpid()}",port="{_metrics_server.server_address[1]}"'
+            _backend_metrics.add_collector(lambda: [
+                '# HELP backend_metrics_worker_info Worker du serveur d\'actions exposant ces métriques',
+                '# TYPE backend_metrics_worker_info gauge',
+                f'backend_metrics_worker_info{{{worker}}} 1',
+            ])
+
+
+# Singleton instance
+_backend_metrics = None
+_metrics_server = None
+_backend_metrics_lock = threading.Lock()
+
+
+def get_backend_metrics() -> Optional[BackendMetrics]:
+    """Get singleton BackendMetrics (None when BACKEND_METRICS_ENABLED is not true)"""
+    global _backend_metrics
+    if os.getenv('BACKEND_METRICS_ENABLED', 'false').lower() != 'true':
+        return None
+    with _backend_metrics_lock:
+        if _backend_metrics is None:
+            _backend_metrics = BackendMetrics()
+    return _backend_metrics
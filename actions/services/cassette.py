@@ -0,0 +1,264 @@
+#actions/services/cassette.py
+"""
+Enregistrement / rejeu ("cassette") des échanges HTTP avec le backend .NET.
+
+- record : les requêtes partent vers le backend et chaque échange
+  (requête + réponse + durée) est écrit dans BACKEND_CASSETTE_DIR
+- replay : aucune requête réseau, les réponses enregistrées sont rejouées
+
+Une requête est identifiée par sa méthode, son chemin (sans l'hôte, pour
+rejouer quel que soit API_URL), ses paramètres triés et son corps. Les
+réponses successives d'une même requête sont rejouées dans l'ordre (la
+dernière est répétée), ce qui garde le rejeu déterministe quand une
+liste change après une création.
+
+Profil de latence au rejeu (BACKEND_CASSETTE_LATENCY) :
+- none : réponse immédiate (par défaut, pour mesurer le coût CPU)
+- recorded : attend la durée enregistrée
+- un nombre : attend ce nombre de millisecondes
+"""
+import base64
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+class CassetteMiss(Exception):
+    """
+    Aucun enregistrement ne correspond à la requête (mode replay)
+
+    Exception simple (pas une erreur réseau) : BackendService la laisse
+    remonter sans nouvelle tentative ni échec compté par le disjoncteur.
+    """
+
+    def __init__(self, message: str, request: Optional[requests.PreparedRequest] = None):
+        super().__init__(message)
+        self.request = request
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    Adaptateur Requests qui enregistre ou rejoue les échanges HTTP
+
+    Args:
+        directory (str): Dossier des enregistrements (un fichier JSON par requête)
+        mode (str): 'record' ou 'replay'
+        inner (BaseAdapter): Adaptateur réel utilisé en mode record
+        latency (str): Profil de latence au rejeu ('none', 'recorded' ou millisecondes)
+    """
+
+    RECORD = 'record'
+    REPLAY = 'replay'
+
+    def __init__(self, directory: str, mode: str = REPLAY, inner: Optional[BaseAdapter] = None,
+                 latency: str = 'none'):
+        super().__init__()
+        if mode not in (self.RECORD, self.REPLAY):
+            raise ValueError(f"Mode cassette inconnu: {mode}")
+        if mode == self.RECORD and inner is None:
+            raise ValueError("Le mode record nécessite un adaptateur réel")
+        self.directory = directory
+        self.mode = mode
+        self.inner = inner
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, Dict[str, Any]] = {}
+        self._replay_positions: Dict[str, int] = {}
+        self.stats = {'recorded': 0, 'replayed': 0, 'missed': 0}
+        os.makedirs(directory, exist_ok=True)
+
+    # ==================== MATCHING ====================
+    @staticmethod
+    def request_signature(request: requests.PreparedRequest) -> Dict[str, Any]:
+        """Éléments de la requête utilisés pour la correspondance"""
+        parts = urlsplit(request.url)
+        params = sorted(parse_qsl(parts.query, keep_blank_values=True))
+        return {
+            'method': request.method,
+            'path': parts.path,
+            'params': urlencode(params),
+            'body': CassetteAdapter._canonical_body(request),
+        }
+
+    @staticmethod
+    def _canonical_body(request: requests.PreparedRequest) -> str:
+        body = request.body
+        if body is None:
+            return ''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if not isinstance(body, bytes):
+            # Corps en flux (fichier) : non comparable, ignoré
+            return '<stream>'
+
+        content_type = request.headers.get('Content-Type', '')
+        if 'json' in content_type:
+            try:
+                return json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False)
+            except ValueError:
+                pass
+        # Multipart : la frontière est aléatoire, on la remplace par une valeur fixe
+        match = re.search(r'boundary=([^;]+)', content_type)
+        if match:
+            body = body.replace(match.group(1).encode('utf-8'), b'BOUNDARY')
+        return hashlib.sha1(body).hexdigest()
+
+    def _key(self, signature: Dict[str, Any]) -> str:
+        digest = hashlib.sha1(json.dumps(signature, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', f"{signature['method']}{signature['path']}").strip('_')
+        return f"{slug[:80]}-{digest}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    # ==================== TRANSPORT ====================
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        signature = self.request_signature(request)
+        key = self._key(signature)
+        if self.mode == self.RECORD:
+            return self._record(key, signature, request, **kwargs)
+        return self._replay(key, request)
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+    def attach(self, session: requests.Session) -> 'CassetteAdapter':
+        """
+        Monte la cassette sur une autre session
+
+        Les enregistrements (fichiers, positions de rejeu, statistiques) sont
+        partagés ; en mode record, les vraies requêtes passent par l'adaptateur
+        propre à cette session (sans le cache HTTP de la session principale).
+        """
+        adapter = copy.copy(self)
+        adapter.inner = session.get_adapter('https://') if self.mode == self.RECORD else None
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return adapter
+
+    def _record(self, key: str, signature: Dict[str, Any], request: requests.PreparedRequest,
+                **kwargs) -> requests.Response:
+        start = time.perf_counter()
+        response = self.inner.send(request, **kwargs)
+        content = response.content
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        recorded = {
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'elapsed_ms': elapsed_ms,
+        }
+        try:
+            recorded['text'] = content.decode('utf-8')
+        except UnicodeDecodeError:
+            recorded['base64'] = base64.b64encode(content).decode('ascii')
+
+        with self._lock:
+            interaction = self._interactions.get(key)
+            if interaction is None:
+                # Premier échange de la session : remplace un éventuel ancien enregistrement
+                interaction = self._interactions[key] = {'request': signature, 'responses': []}
+            interaction['responses'].append(recorded)
+            self._write(key, interaction)
+            self.stats['recorded'] += 1
+        return response
+
+    def _replay(self, key: str, request: requests.PreparedRequest) -> requests.Response:
+        with self._lock:
+            interaction = self._interactions.get(key)
+            if interaction is None:
+                interaction = self._load(key)
+                if interaction is not None:
+                    self._interactions[key] = interaction
+            if interaction is None or not interaction['responses']:
+                self.stats['missed'] += 1
+                raise CassetteMiss(f"Aucun enregistrement pour {request.method} {request.url}", request=request)
+
+            position = self._replay_positions.get(key, 0)
+            responses: List[Dict[str, Any]] = interaction['responses']
+            recorded = responses[min(position, len(responses) - 1)]
+            self._replay_positions[key] = position + 1
+            self.stats['replayed'] += 1
+
+        delay = self._replay_delay(recorded)
+        if delay:
+            time.sleep(delay)
+        return self._build_response(request, recorded)
+
+    def _replay_delay(self, recorded: Dict[str, Any]) -> float:
+        if self.latency == 'none':
+            return 0.0
+        if self.latency == 'recorded':
+            return recorded.get('elapsed_ms', 0) / 1000
+        return float(self.latency) / 1000
+
+    @staticmethod
+    def _build_response(request: requests.PreparedRequest, recorded: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = recorded['status_code']
+        response.reason = recorded.get('reason')
+        response.headers = CaseInsensitiveDict(recorded.get('headers', {}))
+        # Le corps est déjà décodé (gzip...) à l'enregistrement
+        response.headers.pop('Content-Encoding', None)
+        if 'base64' in recorded:
+            response._content = base64.b64decode(recorded['base64'])
+        else:
+            response._content = recorded.get('text', '').encode('utf-8')
+        response._content_consumed = True
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(milliseconds=recorded.get('elapsed_ms', 0))
+        return response
+
+    # ==================== FICHIERS ====================
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, key: str, interaction: Dict[str, Any]) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(interaction, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def rewind(self) -> None:
+        """Recommence le rejeu depuis la première réponse de chaque requête"""
+        with self._lock:
+            self._replay_positions.clear()
+
+
+def install_cassette(session: requests.Session, mode: str, directory: str, latency: str = 'none') -> CassetteAdapter:
+    """
+    Monte un CassetteAdapter sur une session Requests
+
+    En mode record, l'adaptateur actuel de la session (cache HTTP compris)
+    reste utilisé pour les vraies requêtes.
+    """
+    adapter = CassetteAdapter(
+        directory,
+        mode=mode,
+        inner=session.get_adapter('https://') if mode == CassetteAdapter.RECORD else None,
+        latency=latency
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    print(f"🎞️ Cassette backend en mode {mode} ({directory})")
+    return adapter
@@ -1,36 +1,376 @@
 #actions/services/ddr_service.py
 from multiprocessing import process
 import requests
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable, Tuple
 from dotenv import load_dotenv
 import os
+import time
+import threading
+import weakref
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from rapidfuzz import fuzz, process
+from cachecontrol.adapter import CacheControlAdapter
+from cachecontrol.controller import CacheController
+
+from actions.services.backend_cache import (
+    ReferenceCache, CacheEntry, SingleFlight, HttpResponseCache, mark_stale, unwrap_stale
+)
+from actions.services.resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, RetryPolicy
+from actions.services.backend_metrics import get_backend_metrics, serve_backend_metrics
+from actions.services.cassette import CassetteMiss, install_cassette
+from actions.services.reference_snapshot import (
+    ReferenceSnapshot, acquire_refresh_lock, default_snapshot_path, write_snapshot
+)
+from actions.services.json_stream import decode_json_array
+from actions.services.shared_store import SharedEntry, create_shared_store
+from actions.services.reference_index import ReferenceIndex
+from actions.services.user_directory import UserDirectory
+from actions.Middleware.backend_tracer import (
+    backend_call_trace, current_sender, record_backend_call, record_stale_data
+)
 
 load_dotenv()
 
 class BackendService:
-    def __init__(self, base_url: str = None, api_key: str = None):
+    # TTL (secondes) des endpoints de référence mis en cache, par route
+    CACHE_TTLS = {
+        'Postes': 3600,
+        'Directions': 3600,
+        'Exploitations': 3600,
+        'MotifDemandes': 3600,
+        'MotifDemandesManoeuvre': 3600,
+        'SituationBudgets': 3600,
+        'DotationCategories': 3600,
+        'DotationListes': 3600,
+        'MpTypeMobilites': 3600,
+        'ObjectifDemandes': 3600,
+        'ObjectifDemandesManoeuvre': 3600,
+        'Statuts': 3600,
+        'StatutTraitements': 3600,
+        'StatutMobilites': 3600,
+        'LiaisonDotationPostes': 3600,
+        'NomFlux': 3600,
+        'Login/getAllUsers': 900,
+        'FluxMouvements/with-user-details': 900,
+    }
+
+    # Timeouts (connexion, lecture) en secondes des routes lentes ou volumineuses
+    ENDPOINT_TIMEOUTS = {
+        'Login/getAllUsers': (3.05, 30),
+        'FluxMouvements/with-user-details': (3.05, 30),
+        'Demandes/UploadFiles': (3.05, 60),
+        'Demandes/DownloadFile/{filename}': (3.05, 60),
+        'Embauches/{embauche_id}': (3.05, 60),
+    }
+
+    # Endpoints composant get_all_reference_data (clé du résultat -> route)
+    REFERENCE_DATA_ROUTES = {
+        'postes': 'Postes',
+        'directions': 'Directions',
+        'exploitations': 'Exploitations',
+        'motif_demandes': 'MotifDemandes',
+        'motif_demandes_manoeuvre': 'MotifDemandesManoeuvre',
+        'objectif_demandes': 'ObjectifDemandes',
+        'objectif_demandes_manoeuvre': 'ObjectifDemandesManoeuvre',
+        'situation_budgets': 'SituationBudgets',
+        'statuts': 'Statuts',
+        'statut_traitements': 'StatutTraitements',
+        'statut_mobilites': 'StatutMobilites',
+        'type_mobilites': 'MpTypeMobilites',
+        'dotation_categories': 'DotationCategories',
+        'nom_flux': 'NomFlux',
+    }
+
+    # Routes jamais écrites dans l'instantané disque ni, sauf BACKEND_SHARED_CACHE_PERSONAL_DATA=true,
+    # dans le cache partagé (données personnelles des utilisateurs)
+    SNAPSHOT_EXCLUDED_ROUTES = frozenset({'Login/getAllUsers', 'FluxMouvements/with-user-details'})
+
+    # Index des tables de référence : route -> (champ identifiant, champ nom)
+    REFERENCE_INDEXES = {
+        'Postes': ('IdPoste', 'NomPoste'),
+        'Directions': ('IdDir', 'NomDirection'),
+        'Exploitations': ('IdExp', 'NomExploitation'),
+        'MotifDemandes': ('IdMotif', 'Motif'),
+        'MotifDemandesManoeuvre': ('IdMotifMOE', 'Motif'),
+        'SituationBudgets': ('IdSb', 'SituationBudget'),
+        'ObjectifDemandes': ('IdObjectif', 'Objectif'),
+        'ObjectifDemandesManoeuvre': ('IdObjectifMOE', 'Objectif'),
+        'MpTypeMobilites': ('IdTypeMobilite', 'TypeMobilite'),
+        'Statuts': ('IdStatut', 'Statut'),
+        'StatutTraitements': ('IdStatutTraitement', 'StatutTraitement'),
+        'StatutMobilites': ('IdStatutMobilite', 'StatutMobilite'),
+        'DotationCategories': ('IdCategorie', 'Categorie'),
+        'NomFlux': ('IdNomFlux', 'NomFlux'),
+    }
+
+    # Routes utilisateur dont la dernière réponse valide est servie si le backend tombe
+    STALE_FALLBACK_ROUTES = frozenset([
+        'Login/getUserByLogin',
+        'Login/getUserByFullName/{username}',
+        'Login/{username}',
+        'Login/getDetailsLogin',
+        'User/currentUserRole',
+    ])
+
+    # Grandes listes décodées en flux, avec les champs conservés (None = tous)
+    STREAMED_ROUTES = {
+        'Login/getAllUsers': ('UserName', 'FullName', 'Email', 'Matricule', 'Poste'),
+        'FluxMouvements/with-user-details': None,
+    }
+
+    # Détails d'une demande (get_demande_with_details, prefetch_demande)
+    DEMANDE_DETAIL_ROUTES = {
+        'objectifs': "Demandes/{demande_id}/Objectifs",
+        'dotations': "Demandes/{demande_id}/Dotations",
+        'complements': "ComplementDdrs/demande/{demande_id}",
+        'liaisons_dotation': "LiaisonDdrdotations/demande/{demande_id}",
+        'flux_taches': "FluxTaches/demande/{demande_id}/validation",
+    }
+
+    # Détails d'une demande manoeuvre (get_demande_manoeuvre_with_details, prefetch_demande)
+    DEMANDE_MANOEUVRE_DETAIL_ROUTES = {
+        'objectifs': "DemandesManoeuvre/{demande_id}/Objectifs",
+        'complements': "ComplementDdrsMOE/demande/{demande_id}",
+        'flux_taches': "FluxTachesManoeuvre/demande/{demande_id}/validation",
+    }
+
+    # Routes préchargées par type de demande (slot type_demande) : demande, détails
+    PREFETCH_DEMANDE_ROUTES = {
+        'DDR': ("Demandes/{demande_id}", DEMANDE_DETAIL_ROUTES),
+        'DMOE': ("DemandesManoeuvre/{demande_id}", DEMANDE_MANOEUVRE_DETAIL_ROUTES),
+    }
+
+    # Recherches par identifiant dont les 404 sont mémorisés (cache négatif)
+    NEGATIVE_CACHE_ROUTES = frozenset([
+        'Demandes/{demande_id}',
+        'DemandesManoeuvre/{demande_id}',
+        'FluxMouvements/{flux_id}',
+        'NomFlux/{nom_flux_id}',
+        'Postes/{poste_id}',
+        'Embauches/{embauche_id}',
+        'Login/getUserByLogin',
+        'Login/getUserByFullName/{username}',
+        'Login/{username}',
+    ])
+
+    # Écritures -> clés de cache rendues caduques (référence, 404 mémorisés, dernières
+    # valeurs valides, index des services de recherche). Les paramètres de la route
+    # sont substitués ; une clé terminée par '*' invalide toutes les clés de ce préfixe.
+    CACHE_INVALIDATIONS = {
+        ('POST', 'Postes'): ('Postes', 'Postes/*'),
+        ('POST', 'FluxMouvements'): ('FluxMouvements/*',),
+        ('PUT', 'FluxMouvements/{flux_id}'): ('FluxMouvements/*',),
+        ('DELETE', 'FluxMouvements/{flux_id}'): ('FluxMouvements/*',),
+        ('POST', 'DotationListes'): ('DotationListes', 'DotationListes/*'),
+        ('PUT', 'DotationListes/{dotation_id}'): ('DotationListes', 'DotationListes/*'),
+        ('DELETE', 'DotationListes/{dotation_id}'): ('DotationListes', 'DotationListes/*'),
+        ('POST', 'LiaisonDotationPostes'): ('LiaisonDotationPostes', 'LiaisonDotationPostes/*'),
+        ('PUT', 'LiaisonDotationPostes/{liaison_id}'): ('LiaisonDotationPostes', 'LiaisonDotationPostes/*'),
+        ('DELETE', 'LiaisonDotationPostes/{liaison_id}'): ('LiaisonDotationPostes', 'LiaisonDotationPostes/*'),
+        ('POST', 'Demandes'): ('Demandes/*',),
+        ('PUT', 'Demandes/{demande_id}'): ('Demandes/{demande_id}', 'Demandes/{demande_id}/*'),
+        ('PUT', 'Demandes/statut/{demande_id}'): ('Demandes/{demande_id}', 'Demandes/validateur/*'),
+        ('PUT', 'Demandes/{demande_id}/validate'): ('Demandes/{demande_id}', 'Demandes/validateur/*', 'FluxTaches/*'),
+        ('POST', 'Demandes/{demande_id}/send-to-validateur/{nom_flux_id}/{responsable_rh}'): (
+            'Demandes/{demande_id}', 'Demandes/validateur/*', 'FluxTaches/*'
+        ),
+        ('DELETE', 'Demandes/{demande_id}'): ('Demandes/{demande_id}', 'Demandes/{demande_id}/*'),
+        ('POST', 'DemandesManoeuvre'): ('DemandesManoeuvre', 'DemandesManoeuvre/*'),
+        ('PUT', 'DemandesManoeuvre/{demande_id}'): ('DemandesManoeuvre', 'DemandesManoeuvre/{demande_id}'),
+        ('PUT', 'DemandesManoeuvre/statut/{demande_id}'): ('DemandesManoeuvre', 'DemandesManoeuvre/{demande_id}'),
+        ('PUT', 'DemandesManoeuvre/{demande_id}/validate'): (
+            'DemandesManoeuvre', 'DemandesManoeuvre/{demande_id}', 'FluxTachesManoeuvre/*'
+        ),
+        ('POST', 'DemandesManoeuvre/{demande_id}/send-to-validateur/{nom_flux_id}/{responsable_rh}'): (
+            'DemandesManoeuvre/{demande_id}', 'FluxTachesManoeuvre/*'
+        ),
+        ('PUT', 'FluxTaches/{flux_id}'): ('FluxTaches/*', 'Demandes/validateur/*'),
+        ('PUT', 'FluxTachesManoeuvre/{flux_id}'): ('FluxTachesManoeuvre/*',),
+        ('POST', 'ComplementDdrs'): ('ComplementDdrs/*',),
+        ('POST', 'ComplementDdrsMOE'): ('ComplementDdrsMOE/*',),
+        ('PUT', 'LiaisonDdrdotations/{liaison_id}'): ('LiaisonDdrdotations/*', 'LiaisonDdrdotations'),
+        ('POST', 'Embauches'): ('Embauches', 'Embauches/*'),
+        ('PUT', 'Embauches/{embauche_id}'): ('Embauches', 'Embauches/{embauche_id}', 'Embauches/filtered-embauches'),
+        ('DELETE', 'Embauches/{embauche_id}'): ('Embauches', 'Embauches/{embauche_id}', 'Embauches/filtered-embauches'),
+    }
+
+    FAN_OUT_THREAD_PREFIX = 'backend-fanout'
+    PREFETCH_THREAD_PREFIX = 'backend-prefetch-worker'
+
+    def __init__(self, base_url: str = None, api_key: str = None, cache_ttls: Optional[Dict[str, float]] = None):
         self.base_url = base_url or os.getenv('API_URL', '')
         self.api_key = api_key or os.getenv('RASA_API_KEY', '')
         print(f"BackendService initialized with base_url: {self.base_url} and api_key: {self.api_key}")
 
+        # Cache des données de référence (désactivable avec BACKEND_CACHE_ENABLED=false)
+        self.cache_enabled = os.getenv('BACKEND_CACHE_ENABLED', 'true').lower() != 'false'
+        self.cache_ttls = {**self.CACHE_TTLS, **(cache_ttls or {})}
+        self.cache = ReferenceCache(
+            stale_while_revalidate=float(os.getenv('BACKEND_CACHE_STALE_WHILE_REVALIDATE', '60'))
+        )
+        # Regroupement des GET identiques simultanés
+        self._inflight = SingleFlight()
+
+        # Mode dégradé : âge maximum (secondes) des données servies quand le backend est indisponible
+        self.max_stale = float(os.getenv('BACKEND_MAX_STALE', '3600'))
+        self._last_good = ReferenceCache()
+        self._stale_served = 0
+        # Copie périmée servie par clé, réutilisée tant que quelqu'un la garde (index de
+        # référence, annuaire...) : pas de nouvelle copie ni de réindexation à chaque appel
+        self._stale_values = weakref.WeakValueDictionary()
+
+        # Cache négatif : un identifiant inconnu ne coûte qu'un aller-retour pendant ce délai
+        self.negative_cache_ttl = float(os.getenv('BACKEND_NEGATIVE_CACHE_TTL', '30'))
+        self._not_found = ReferenceCache(stale_while_revalidate=0)
+        self._not_found_hits = 0
+
+        # Préchargement en début de session : réponses servies une fois au premier tour
+        self.prefetch_ttl = float(os.getenv('BACKEND_PREFETCH_TTL', '60'))
+        self._prefetched = ReferenceCache(stale_while_revalidate=0)
+        self._prefetch_started: Dict[str, float] = {}
+
+        # Index des tables de référence, reconstruits quand la liste en cache change
+        self._reference_indexes: Dict[str, ReferenceIndex] = {}
+        self._user_directory: Optional[UserDirectory] = None
+
+        # Services abonnés aux invalidations (références faibles)
+        self._invalidation_listeners = set()
+
+        # Cache partagé entre workers (BACKEND_SHARED_CACHE=sqlite|redis) : réponses et invalidations
+        self.shared_store = create_shared_store() if self.cache_enabled else None
+        self.shared_poll_interval = float(os.getenv('BACKEND_SHARED_CACHE_POLL_INTERVAL', '1'))
+        self._shared_excluded = (
+            frozenset() if os.getenv('BACKEND_SHARED_CACHE_PERSONAL_DATA', 'false').lower() == 'true'
+            else self.SNAPSHOT_EXCLUDED_ROUTES
+        )
+        self._shared_thread = None
+
+        # Instantané disque des tables de référence (désactivé par défaut, BACKEND_SNAPSHOT_ENABLED=true)
+        self.snapshot_enabled = (
+            self.cache_enabled and os.getenv('BACKEND_SNAPSHOT_ENABLED', 'false').lower() == 'true'
+        )
+        self.snapshot_path = os.getenv('BACKEND_SNAPSHOT_PATH') or default_snapshot_path()
+        self.snapshot_refresh_interval = float(os.getenv('BACKEND_SNAPSHOT_REFRESH_INTERVAL', '600'))
+        self.snapshot = ReferenceSnapshot.load(self.snapshot_path, self.base_url) if self.snapshot_enabled else None
+        self._snapshot_seeded = set()
+        # Table chargée depuis l'instantané (par route) et dernière revalidation de son index persisté
+        self._snapshot_values = {}
+        self._snapshot_checked = {}
+        self._snapshot_thread = None
+        self._snapshot_lock_file = None
+        self._snapshot_thread_lock = threading.Lock()
+
+        # Timeouts, nouvelles tentatives (GET uniquement) et disjoncteur
+        self.default_timeout = (
+            float(os.getenv('BACKEND_CONNECT_TIMEOUT', '3.05')),
+            float(os.getenv('BACKEND_READ_TIMEOUT', '15'))
+        )
+        self.endpoint_timeouts = dict(self.ENDPOINT_TIMEOUTS)
+        self.retry_policy = RetryPolicy(
+            max_retries=int(os.getenv('BACKEND_MAX_RETRIES', '2')),
+            backoff_base=float(os.getenv('BACKEND_RETRY_BACKOFF', '0.2'))
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv('BACKEND_CIRCUIT_FAILURE_THRESHOLD', '5')),
+            recovery_timeout=float(os.getenv('BACKEND_CIRCUIT_RECOVERY_TIMEOUT', '30'))
+        )
+
+        # Concurrence adaptative par endpoint, file équitable par conversation
+        self.limiter = None
+        if os.getenv('BACKEND_CONCURRENCY_LIMIT_ENABLED', 'true').lower() != 'false':
+            self.limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=int(os.getenv('BACKEND_CONCURRENCY_INITIAL', '8')),
+                min_limit=int(os.getenv('BACKEND_CONCURRENCY_MIN', '1')),
+                max_limit=int(os.getenv('BACKEND_CONCURRENCY_MAX', '32')),
+                latency_tolerance=float(os.getenv('BACKEND_CONCURRENCY_LATENCY_TOLERANCE', '2')),
+                queue_timeout=float(os.getenv('BACKEND_CONCURRENCY_QUEUE_TIMEOUT', '30'))
+            )
+
+        # Métriques par endpoint (None si BACKEND_METRICS_ENABLED n'est pas activé)
+        self.metrics = get_backend_metrics()
+        if self.metrics is not None and self.limiter is not None:
+            self.metrics.add_collector(self.limiter.render_prometheus)
+
+        # Pool de threads borné pour les appels parallèles (fan-out)
+        self.max_workers = int(os.getenv('BACKEND_MAX_WORKERS', '8'))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=self.FAN_OUT_THREAD_PREFIX
+        )
+        # Pool séparé et plus petit pour les préchargements : une rafale de débuts de
+        # session ne retarde pas les fan-out des tours en cours. Au-delà de
+        # BACKEND_PREFETCH_MAX_PENDING préchargements en cours, les suivants sont abandonnés
+        self.prefetch_workers = int(os.getenv('BACKEND_PREFETCH_WORKERS', '2'))
+        self._prefetch_executor = ThreadPoolExecutor(
+            max_workers=self.prefetch_workers, thread_name_prefix=self.PREFETCH_THREAD_PREFIX
+        )
+        self.prefetch_max_pending = int(os.getenv('BACKEND_PREFETCH_MAX_PENDING', '4'))
+        self._prefetch_slots = threading.BoundedSemaphore(self.prefetch_max_pending)
+        self._prefetch_dropped = 0
+
         # Création de la session Requests
+        # CacheControlAdapter gère la revalidation HTTP (ETag / If-None-Match / Cache-Control)
+        # et dimensionne le pool de connexions pour les appels parallèles ; ses réponses
+        # sont gardées dans un cache LRU borné (BACKEND_HTTP_CACHE_MAX_ENTRIES)
         self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'Accept': 'application/json',
-            'X-Api-Key': self.api_key
-        })
-
-        # ⚠️ Ignore les certificats auto-signés pour localhost/dev
-        self.session.verify = False  # ← applique à toutes les requêtes
+        self.http_cache = HttpResponseCache(int(os.getenv('BACKEND_HTTP_CACHE_MAX_ENTRIES', '256')))
+        adapter = CacheControlAdapter(
+            cache=self.http_cache, pool_connections=10, pool_maxsize=max(10, self.max_workers * 2)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Session sans cache HTTP pour les grandes listes lues en flux : CacheControl
+        # mettrait tout le corps en mémoire, le cache de référence revalide déjà par ETag
+        self._stream_session = requests.Session()
+        self._stream_session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers))
+        self._stream_session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers))
+        self.streamed_routes = self._streamed_routes_from_env()
+
+        # Session des envois multipart (uploads) : sans Content-Type JSON par défaut,
+        # requests pose lui-même multipart/form-data et sa frontière à chaque requête
+        self._upload_session = requests.Session()
+        self._upload_session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers))
+        self._upload_session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers))
+
+        # Enregistrement / rejeu des échanges HTTP (BACKEND_CASSETTE_MODE=record|replay)
+        self.cassette = None
+        cassette_mode = os.getenv('BACKEND_CASSETTE_MODE', '').lower()
+        if cassette_mode:
+            self.cassette = install_cassette(
+                self.session,
+                cassette_mode,
+                os.getenv('BACKEND_CASSETTE_DIR', 'results/backend_cassettes'),
+                latency=os.getenv('BACKEND_CASSETTE_LATENCY', 'none')
+            )
+            # Chaque session garde son propre adaptateur réel (flux et uploads sans cache HTTP)
+            for session in (self._stream_session, self._upload_session):
+                self.cassette.attach(session)
+
+        for session in (self.session, self._stream_session):
+            session.headers['Content-Type'] = 'application/json'
+        for session in (self.session, self._stream_session, self._upload_session):
+            session.headers.update({
+                'Accept': 'application/json',
+                'X-Api-Key': self.api_key
+            })
+
+            # ⚠️ Ignore les certificats auto-signés pour localhost/dev
+            session.verify = False  # ← applique à toutes les requêtes
 
         if not self.api_key:
             print("⚠️ WARNING: RASA_API_KEY not configured. API calls may fail with 401/403 errors.")
 
-    def _handle_response(self, response: requests.Response) -> Any:
+        # /metrics et /health de ce worker (service entièrement initialisé)
+        if self.metrics is not None:
+            serve_backend_metrics(self.get_metrics_text, self.get_health)
+
+    def _handle_response(self, response: Optional[requests.Response]) -> Any:
         """Handle API response and errors"""
+        if response is None:
+            # Aucune réponse : backend injoignable ou circuit ouvert (déjà journalisé)
+            return None
         try:
             response.raise_for_status()
             return response.json()
@@ -53,201 +393,1015 @@ class BackendService:
         except Exception as e:
             print(f"Error: {e}")
             return None
+
+    def _streamed_routes_from_env(self) -> Dict[str, Optional[tuple]]:
+        """STREAMED_ROUTES, with the kept user fields overridable by BACKEND_USER_FIELDS ('*' = all)"""
+        routes = dict(self.STREAMED_ROUTES)
+        user_fields = os.getenv('BACKEND_USER_FIELDS')
+        if user_fields:
+            routes['Login/getAllUsers'] = (
+                None if user_fields.strip() == '*'
+                else tuple(field.strip() for field in user_fields.split(',') if field.strip())
+            )
+        return routes
+
+    def _send(self, method: str, route: str, *, params: Optional[Dict] = None, json: Any = None,
+              data: Any = None, files: Any = None, headers: Optional[Dict] = None,
+              stream: bool = False, **path_params) -> Optional[requests.Response]:
+        """
+        Send a request on a route template with timeouts, retries and circuit breaker
+
+        Only GET requests are retried (idempotent). Returns None when the
+        backend could not be reached or the circuit is open. With stream=True
+        the body is not read (and bypasses the HTTP cache session). Requests
+        with files go through the upload session (multipart, no shared state
+        is modified, safe to call from several threads).
+        """
+        path = route.format(**path_params) if path_params else route
+        url = f"{self.base_url}/{path}"
+
+        if not self.circuit_breaker.allow_request():
+            print(f"⚡ Circuit ouvert : {method} {path} non envoyé (backend indisponible)")
+            return None
+
+        timeout = self.endpoint_timeouts.get(route, self.default_timeout)
+        # Pas d'attente dans la file plus longue que la requête elle-même
+        queue_timeout = timeout[-1] if isinstance(timeout, tuple) else timeout
+        attempts = 1 + (self.retry_policy.max_retries if method == 'GET' else 0)
+        # Limite de concurrence par contrôleur (Demandes, FluxTaches...)
+        endpoint = route.split('/', 1)[0]
+        sender = current_sender()
+
+        for attempt in range(attempts):
+            is_last = attempt == attempts - 1
+            if self.limiter is not None and not self.limiter.acquire(endpoint, sender, queue_timeout):
+                # Requête non envoyée : la place de test du disjoncteur (half_open) est rendue
+                self.circuit_breaker.release_probe()
+                print(f"🚦 File d'attente {endpoint} saturée : {method} {path} non envoyé")
+                return None
+            start = time.perf_counter()
+            # Toute issue est enregistrée par le disjoncteur, y compris une exception
+            # inattendue (ChunkedEncodingError, TooManyRedirects...) : la place de
+            # test (half_open) est toujours rendue
+            outcome_recorded = False
+            try:
+                try:
+                    if files is not None:
+                        session = self._upload_session
+                    elif stream:
+                        session = self._stream_session
+                    else:
+                        session = self.session
+                    response = session.request(
+                        method, url, params=params, json=json, data=data,
+                        files=files, headers=headers, timeout=timeout, stream=stream
+                    )
+                except CassetteMiss:
+                    # Rejeu : requête absente de la cassette, remontée telle quelle
+                    # (ni nouvelle tentative, ni échec pour le disjoncteur)
+                    self._release_slot(endpoint, start, success=True, measured=False)
+                    self.circuit_breaker.release_probe()
+                    outcome_recorded = True
+                    raise
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    self._release_slot(endpoint, start, success=False)
+                    record_backend_call(method, route, time.perf_counter() - start)
+                    if self.metrics is not None:
+                        self.metrics.observe(method, route, None, time.perf_counter() - start)
+                    self.circuit_breaker.record_failure()
+                    outcome_recorded = True
+                    if not is_last and self.circuit_breaker.allow_request():
+                        time.sleep(self.retry_policy.delay(attempt))
+                        continue
+                    print(f"❌ Connection Error: Unable to reach the API at {self.base_url} ({method} {path})")
+                    print(f"   {type(e).__name__}: {e}")
+                    return None
+                except Exception:
+                    self._release_slot(endpoint, start, success=False)
+                    record_backend_call(method, route, time.perf_counter() - start)
+                    if self.metrics is not None:
+                        self.metrics.observe(method, route, None, time.perf_counter() - start)
+                    raise
+
+                self._release_slot(
+                    endpoint, start, success=response.status_code < 500 and response.status_code != 429,
+                    # 304 et réponses du cache HTTP : ne mesurent pas la latence du backend
+                    measured=response.status_code != 304 and not getattr(response, 'from_cache', False)
+                )
+                record_backend_call(method, route, time.perf_counter() - start)
+                if self.metrics is not None:
+                    self.metrics.observe(
+                        method, route, response.status_code, time.perf_counter() - start,
+                        int(response.headers.get('Content-Length') or (0 if stream else len(response.content)))
+                    )
+
+                if response.status_code >= 500 or response.status_code == 429:
+                    self.circuit_breaker.record_failure()
+                    outcome_recorded = True
+                    if (not is_last and self.retry_policy.is_retryable_status(response.status_code)
+                            and self.circuit_breaker.allow_request()):
+                        response.close()
+                        time.sleep(self.retry_policy.delay(attempt))
+                        continue
+                else:
+                    self.circuit_breaker.record_success()
+                    outcome_recorded = True
+                    if method != 'GET' and response.status_code < 400:
+                        self._after_write(method, route, path_params)
+                return response
+            finally:
+                if not outcome_recorded:
+                    self.circuit_breaker.record_failure()
+
+        return None
+
+    def _release_slot(self, endpoint: str, start: float, success: bool, measured: bool = True) -> None:
+        if self.limiter is not None:
+            self.limiter.release(endpoint, time.perf_counter() - start, success, measured)
+
+    def _after_write(self, method: str, route: str, path_params: Dict) -> None:
+        """Invalidate the cache keys a successful write makes obsolete (see CACHE_INVALIDATIONS)"""
+        keys = self.CACHE_INVALIDATIONS.get((method, route))
+        if keys:
+            self.invalidate_keys([key.format(**path_params) for key in keys])
+
+    def invalidate_keys(self, keys: List[str], broadcast: bool = True) -> None:
+        """
+        Invalidate cache keys in every store and notify the invalidation listeners
+
+        Args:
+            keys (List[str]): Paths (ex: "Postes", "Demandes/42"); a trailing
+                '*' invalidates every key starting with the prefix
+            broadcast (bool): Also invalidate the shared cache (and so the other workers)
+        """
+        if broadcast and self.shared_store is not None:
+            try:
+                self.shared_store.invalidate(keys)
+            except Exception as e:
+                print(f"⚠️ Invalidation du cache partagé échouée: {e}")
+
+        for key in keys:
+            for store in (self.cache, self._not_found, self._last_good, self._prefetched):
+                if key.endswith('*'):
+                    store.invalidate_prefix(key[:-1])
+                else:
+                    store.invalidate(key)
+                    store.invalidate_prefix(f"{key}?")
+            self._invalidate_http_cache(key)
+        # Tables modifiées : l'instantané (et ses index) n'est plus à jour pour elles
+        for route in self.cache_ttls:
+            if self.affects(keys, route):
+                self._snapshot_seeded.add(route)
+                self._snapshot_values.pop(route, None)
+        print(f"🧹 Cache invalidé : {', '.join(keys)}")
+
+        for ref in list(self._invalidation_listeners):
+            listener = ref()
+            if listener is None:
+                self._invalidation_listeners.discard(ref)
+                continue
+            try:
+                listener(keys)
+            except Exception as e:
+                print(f"⚠️ Listener d'invalidation en erreur: {e}")
+
+    def _invalidate_http_cache(self, key: str) -> None:
+        """Drop the CacheControl responses of a cache key (keyed by normalized URL, query included)"""
+        try:
+            url = CacheController.cache_url(f"{self.base_url}/{key.rstrip('*')}")
+        except Exception:
+            # URL du backend non configurée : aucune réponse n'a pu être mise en cache
+            return
+        if key.endswith('*'):
+            self.http_cache.delete_prefix(url)
+        else:
+            self.http_cache.delete(url)
+            self.http_cache.delete_prefix(f"{url}?")
+
+    def add_invalidation_listener(self, listener: Callable[[List[str]], None]) -> None:
+        """
+        Call listener(keys) after every invalidation (search services drop their indexes)
+
+        Bound methods are held weakly, so short-lived services need no unregistration.
+        """
+        ref = weakref.WeakMethod(listener) if hasattr(listener, '__self__') else (lambda: listener)
+        self._invalidation_listeners.add(ref)
+
+    @staticmethod
+    def affects(keys: List[str], key: str) -> bool:
+        """True if an invalidation of keys covers key"""
+        return any(
+            key.startswith(k[:-1]) if k.endswith('*') else key == k
+            for k in keys
+        )
+
+    def get_metrics_text(self) -> str:
+        """Per-endpoint metrics in Prometheus text format (empty when metrics are disabled)"""
+        return self.metrics.render_prometheus() if self.metrics is not None else ''
+
+    def get_health(self) -> Dict[str, Any]:
+        """Backend health snapshot (circuit breaker, cache, in-flight requests) for monitoring"""
+        return {
+            'base_url': self.base_url,
+            'circuit_breaker': self.circuit_breaker.snapshot(),
+            'cache': self.cache.stats(),
+            'in_flight': self._inflight.in_flight(),
+            'coalesced': self._inflight.coalesced,
+            'cassette': self.cassette.stats if self.cassette is not None else None,
+            'degraded': self.is_degraded(),
+            'stale_served': self._stale_served,
+            'not_found_hits': self._not_found_hits,
+            'prefetch_dropped': self._prefetch_dropped,
+            'shared_cache': self.shared_store.stats() if self.shared_store is not None else None,
+            'concurrency': self.limiter.snapshot() if self.limiter is not None else None,
+        }
+
+    def is_degraded(self) -> bool:
+        """True while the backend is considered down (circuit not closed)"""
+        return self.circuit_breaker.state != CircuitBreaker.CLOSED
+
+    def _get(self, route: str, params: Optional[Dict] = None, **path_params) -> Any:
+        """
+        GET on a route template (ex: "Postes/{poste_id}")
+
+        Routes listed in cache_ttls are served from the reference cache.
+        Identical concurrent GETs share a single request and decoded result.
+        """
+        path = route.format(**path_params) if path_params else route
+        url = f"{self.base_url}/{path}"
+        flight_key = (url, tuple(sorted(params.items())) if params else ())
+
+        if self.cache_enabled and route in self.cache_ttls and not params and not path_params:
+            if self.snapshot is not None and path not in self._snapshot_seeded:
+                self._seed_from_snapshot(route, path)
+            self.start_snapshot_refresher()
+            return self.cache.get_or_fetch(
+                path,
+                lambda entry: self._inflight.do(
+                    flight_key, lambda: self._fetch_and_cache(route, path, entry)
+                )
+            )
+
+        # Réponse préchargée (début de session, demande citée) : servie une seule fois
+        key = self._cache_key(path, params)
+        prefetched = self._prefetched.get(key)
+        if prefetched is not None:
+            self._prefetched.invalidate(key)
+            if prefetched.is_fresh():
+                return prefetched.value
+
+        data = self._inflight.do(
+            flight_key,
+            lambda: self._fetch(route, path, params, path_params)
+        )
+        # Préchargement rejoint en cours de route : déjà consommé
+        self._prefetched.invalidate(key)
+        return data
+
+    @staticmethod
+    def _cache_key(path: str, params: Optional[Dict]) -> str:
+        return path if not params else f"{path}?{sorted(params.items())}"
+
+    def _fetch(self, route: str, path: str, params: Optional[Dict], path_params: Dict) -> Any:
+        """
+        Uncached GET
+
+        Id lookups remember 404s for negative_cache_ttl seconds; user routes
+        keep their last good response for degraded mode.
+        """
+        key = self._cache_key(path, params)
+        negative = self.cache_enabled and route in self.NEGATIVE_CACHE_ROUTES
+        if negative and self.is_known_missing(key):
+            return None
+
+        response = self._send('GET', route, params=params, **path_params)
+        if negative and response is not None and response.status_code == 404:
+            self._remember_not_found(key)
+
+        if route not in self.STALE_FALLBACK_ROUTES:
+            return self._handle_response(response)
+
+        if self._backend_unavailable(response):
+            stale = self._serve_stale(key, self._last_good.get(key))
+            if stale is not None:
+                return stale
+        data = self._handle_response(response)
+        if data is not None:
+            self._last_good.set(key, data, ttl=0)
+        return data
+
+    def is_known_missing(self, key: str) -> bool:
+        """True if key (ex: "Demandes/42") answered 404 less than negative_cache_ttl seconds ago"""
+        entry = self._not_found.get(key)
+        if entry is None or not entry.is_fresh():
+            return False
+        self._not_found_hits += 1
+        print(f"🚫 {key} introuvable (réponse 404 mémorisée, pas d'appel au backend)")
+        return True
+
+    def _remember_not_found(self, key: str) -> None:
+        if self._not_found.stats()['entries'] >= 1024:
+            self._not_found.purge_expired()
+        self._not_found.set(key, True, ttl=self.negative_cache_ttl)
+
+    def invalidate_not_found(self, prefix: str = '') -> None:
+        """Forget remembered 404s (all of them, or those whose key starts with prefix)"""
+        self._not_found.invalidate_prefix(prefix)
+
+    @staticmethod
+    def _backend_unavailable(response: Optional[requests.Response]) -> bool:
+        return response is None or response.status_code >= 500
+
+    def _serve_stale(self, key: str, entry: Optional[CacheEntry]) -> Any:
+        """Last good value of key, marked stale, if younger than max_stale"""
+        if entry is None or entry.value is None:
+            return None
+        if entry.data_age > self.max_stale:
+            print(f"⚠️ Mode dégradé : {key} en cache trop ancien ({entry.data_age:.0f}s > {self.max_stale:.0f}s)")
+            return None
+        self._stale_served += 1
+        print(f"🕰️ Mode dégradé : {key} servi depuis le cache (âge {entry.data_age:.0f}s)")
+        # L'action en cours prévient l'utilisateur que les données peuvent dater
+        record_stale_data(key, entry.data_age)
+        stale = self._stale_values.get(key)
+        if stale is not None and stale.source is entry.value:
+            stale.age = entry.data_age
+            return stale
+        stale = mark_stale(entry.value, entry.data_age)
+        if stale is not entry.value:
+            self._stale_values[key] = stale
+        return stale
+
+    def _fetch_and_cache(self, route: str, path: str, entry: Optional[CacheEntry]) -> Any:
+        """
+        Fetch a cacheable route and store the decoded value
+
+        The shared cache is read first: a value another worker fetched less
+        than a TTL ago is used as is, an older one is revalidated by ETag.
+        """
+        ttl = self.cache_ttls[route]
+        shared = self._shared_get(path, entry.etag if entry is not None else None)
+        if shared is not None:
+            fresh = shared.age < ttl
+            stored_at = time.monotonic() - min(shared.age, ttl)
+            if not shared.unchanged:
+                entry = self.cache.set(path, shared.value, ttl, etag=shared.etag, stored_at=stored_at)
+            elif fresh:
+                # Même version que la nôtre, revalidée récemment par un autre worker
+                entry = self.cache.set(path, entry.value, ttl, etag=entry.etag, stored_at=stored_at)
+            if fresh:
+                return entry.value
+
+        headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else None
+        streamed = route in self.streamed_routes
+        response = self._send('GET', route, headers=headers, stream=streamed)
+        if self._backend_unavailable(response):
+            # Backend injoignable, en erreur ou circuit ouvert : servir la dernière valeur connue
+            return self._serve_stale(path, entry)
+
+        etag = response.headers.get('ETag')
+
+        # 304 : la valeur en cache (ex: chargée depuis l'instantané) est toujours valide
+        if entry is not None and response.status_code == 304:
+            self.cache.touch(path)
+            self._shared_touch(path, entry)
+            return entry.value
+
+        # Même ETag que l'entrée en cache : inutile de re-décoder le JSON
+        if entry is not None and etag and etag == entry.etag and response.status_code == 200:
+            response.close()
+            self.cache.touch(path)
+            self._shared_touch(path, entry)
+            return entry.value
+
+        if streamed and response.status_code == 200:
+            data = self._decode_stream(route, response)
+        else:
+            data = self._handle_response(response)
+        if data is None:
+            return None
+
+        if 'no-store' not in response.headers.get('Cache-Control', ''):
+            self.cache.set(path, data, ttl, etag=etag)
+            self._shared_set(path, data, etag, ttl)
+        return data
+
+    # ==================== CACHE PARTAGÉ ====================
+    # Une panne du cache partagé ne doit jamais empêcher de lire le backend
+
+    def _shared_get(self, path: str, known_etag: Optional[str]) -> Optional[SharedEntry]:
+        if self.shared_store is None or path in self._shared_excluded:
+            return None
+        try:
+            return self.shared_store.get(path, known_etag)
+        except Exception as e:
+            print(f"⚠️ Lecture du cache partagé ({path}) échouée: {e}")
+            return None
+
+    def _shared_set(self, path: str, data: Any, etag: Optional[str], ttl: float) -> None:
+        if self.shared_store is None or path in self._shared_excluded:
+            return
+        try:
+            self.shared_store.set(path, data, etag, ttl)
+        except Exception as e:
+            print(f"⚠️ Écriture du cache partagé ({path}) échouée: {e}")
+
+    def _shared_touch(self, path: str, entry: CacheEntry) -> None:
+        if self.shared_store is None or path in self._shared_excluded:
+            return
+        try:
+            # Absente du cache partagé (autre worker redémarré, invalidation) : la publier
+            if self.shared_store.get(path, entry.etag) is None:
+                self.shared_store.set(path, entry.value, entry.etag, entry.ttl)
+            else:
+                self.shared_store.touch(path)
+        except Exception as e:
+            print(f"⚠️ Mise à jour du cache partagé ({path}) échouée: {e}")
+
+    def sync_shared_invalidations(self) -> int:
+        """Apply the invalidations published by the other workers; returns how many were applied"""
+        if self.shared_store is None:
+            return 0
+        try:
+            events = self.shared_store.poll_invalidations()
+        except Exception as e:
+            print(f"⚠️ Lecture des invalidations partagées échouée: {e}")
+            return 0
+        for keys in events:
+            self.invalidate_keys(keys, broadcast=False)
+        return len(events)
+
+    def start_shared_cache_listener(self) -> None:
+        """Start the background thread that applies the other workers' invalidations"""
+        if self.shared_store is None or self._shared_thread is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(self.shared_poll_interval)
+                self.sync_shared_invalidations()
+
+        self._shared_thread = threading.Thread(target=loop, name='backend-shared-cache', daemon=True)
+        self._shared_thread.start()
+
+    def _decode_stream(self, route: str, response: requests.Response) -> Any:
+        """Decode a large JSON array incrementally, keeping only the configured fields (any other body whole)"""
+        try:
+            return decode_json_array(
+                response.iter_content(chunk_size=64 * 1024), self.streamed_routes[route]
+            )
+        except (ValueError, requests.exceptions.RequestException) as e:
+            print(f"❌ Décodage en flux de {route} échoué: {e}")
+            return None
+        finally:
+            response.close()
+
+    def _seed_from_snapshot(self, route: str, path: str) -> None:
+        """Load one table from the on-disk snapshot into the reference cache (decoded on first use)"""
+        self._snapshot_seeded.add(path)
+        snapshot = self.snapshot
+        if snapshot is None or self.cache.get(path) is not None or not snapshot.has_table(path):
+            return
+        ttl = self.cache_ttls[route]
+        # Toujours périmé : servi tout de suite puis revalidé en arrière-plan (304 si
+        # inchangé), un autre worker ayant pu modifier la table depuis l'instantané
+        now = time.monotonic()
+        rows = snapshot.get_table(path)
+        self._snapshot_values[path] = rows
+        self.cache.set(
+            path, rows, ttl, etag=snapshot.etag(path),
+            stored_at=now - ttl, validated_at=now - snapshot.age
+        )
+
+    def _snapshot_routes(self) -> List[str]:
+        """Cached routes that may be written to the snapshot (user data excluded)"""
+        return [route for route in self.cache_ttls if route not in self.SNAPSHOT_EXCLUDED_ROUTES]
+
+    def save_snapshot(self) -> bool:
+        """Write the cached reference tables to the on-disk snapshot"""
+        tables = {}
+        for route in self._snapshot_routes():
+            entry = self.cache.get(route)
+            if entry is not None and isinstance(entry.value, list):
+                tables[route] = (entry.value, entry.etag)
+        if not tables:
+            return False
+        try:
+            write_snapshot(self.snapshot_path, tables, self.base_url, indexes=self.REFERENCE_INDEXES)
+        except OSError as e:
+            print(f"⚠️ Écriture de l'instantané {self.snapshot_path} échouée: {e}")
+            return False
+        self._use_snapshot(ReferenceSnapshot.load(self.snapshot_path, self.base_url))
+        print(f"💾 Instantané de référence écrit ({len(tables)} tables): {self.snapshot_path}")
+        return True
+
+    def _use_snapshot(self, snapshot: Optional[ReferenceSnapshot]) -> None:
+        # L'ancien instantané reste valide pour ses lecteurs en cours (fermé par le GC)
+        if snapshot is not None:
+            self.snapshot = snapshot
+            self._snapshot_seeded = set()
+            self._snapshot_values = {}
+            self._snapshot_checked = {}
+
+    def refresh_snapshot(self) -> None:
+        """
+        Refresh the on-disk snapshot
+
+        Only revalidates the tables already in the snapshot or in the cache:
+        a table that no conversation has needed is never downloaded for it.
+        """
+        routes = [
+            route for route in self._snapshot_routes()
+            if self.cache.get(route) is not None or (self.snapshot is not None and self.snapshot.has_table(route))
+        ]
+        for route in routes:
+            if route not in self._snapshot_seeded and self.snapshot is not None:
+                self._seed_from_snapshot(route, route)
+
+        # Requêtes conditionnelles (If-None-Match) : une table inchangée coûte un 304
+        self._fan_out({
+            route: (lambda route=route: self._fetch_and_cache(route, route, self.cache.get(route)))
+            for route in routes
+        })
+        self.save_snapshot()
+
+    def start_snapshot_refresher(self) -> None:
+        """
+        Start the background thread that keeps the on-disk snapshot fresh
+
+        Started lazily by the first cached read. Only the process holding the
+        snapshot lock refreshes it; the other workers just read the file at startup.
+        """
+        if not self.snapshot_enabled or self._snapshot_thread is not None:
+            return
+        with self._snapshot_thread_lock:
+            if self._snapshot_thread is not None:
+                return
+            try:
+                self._snapshot_lock_file = acquire_refresh_lock(self.snapshot_path)
+            except OSError as e:
+                print(f"⚠️ Verrou de l'instantané {self.snapshot_path} indisponible: {e}")
+                self._snapshot_lock_file = None
+            if self._snapshot_lock_file is None:
+                # Un autre worker rafraîchit déjà l'instantané : ne plus réessayer
+                self._snapshot_thread = False
+                return
+
+            def loop():
+                # Premier rafraîchissement après un intervalle : rien n'est téléchargé au démarrage
+                if self.snapshot is not None:
+                    time.sleep(max(0.0, self.snapshot_refresh_interval - self.snapshot.age))
+                else:
+                    time.sleep(self.snapshot_refresh_interval)
+                while True:
+                    try:
+                        self.refresh_snapshot()
+                    except Exception as e:
+                        print(f"⚠️ Rafraîchissement de l'instantané échoué: {e}")
+                    time.sleep(self.snapshot_refresh_interval)
+
+            self._snapshot_thread = threading.Thread(target=loop, name='backend-snapshot', daemon=True)
+            self._snapshot_thread.start()
+
+    def get_reference_index(self, route: str) -> ReferenceIndex:
+        """
+        Id / name index of a reference table (see REFERENCE_INDEXES)
+
+        Built once per version of the cached list: the cache returns the same
+        list object until it is refetched or invalidated (a stale copy served
+        during an outage counts as the list it was made from).
+        """
+        snapshot_index = self._snapshot_index(route)
+        if snapshot_index is not None:
+            return snapshot_index
+
+        rows = self._get(route) or []
+        index = self._reference_indexes.get(route)
+        if index is None or unwrap_stale(index.rows) is not unwrap_stale(rows):
+            id_field, name_field = self.REFERENCE_INDEXES[route]
+            index = ReferenceIndex(rows, id_field, name_field)
+            self._reference_indexes[route] = index
+        return index
+
+    def _snapshot_index(self, route: str) -> Optional[Any]:
+        """
+        Persisted index of the on-disk snapshot, while the table is still the snapshot's version
+
+        Lookups decode only the matching row from the mapped file: neither the
+        whole table nor a ReferenceIndex is built. The table is revalidated
+        by ETag in the background (at most once per TTL); a changed or
+        invalidated table falls back to the regular index.
+        """
+        snapshot = self.snapshot
+        if snapshot is None or not self.cache_enabled or not snapshot.has_index(route):
+            return None
+        entry = self.cache.get(route)
+        if entry is None:
+            if route in self._snapshot_seeded:
+                return None
+        elif unwrap_stale(entry.value) is not self._snapshot_values.get(route):
+            return None
+        if entry is None or not entry.is_fresh():
+            self._revalidate_snapshot_table(route, snapshot)
+        return snapshot.index(route)
+
+    def _revalidate_snapshot_table(self, route: str, snapshot: ReferenceSnapshot) -> None:
+        """Conditional GET (snapshot ETag) in the background; a new version replaces the snapshot's"""
+        now = time.monotonic()
+        ttl = self.cache_ttls[route]
+        if now - self._snapshot_checked.get(route, -ttl) < ttl:
+            return
+        self._snapshot_checked[route] = now
+        etag = snapshot.etag(route)
+
+        def revalidate():
+            response = self._send('GET', route, headers={'If-None-Match': etag} if etag else None)
+            unchanged = response is not None and response.status_code in (200, 304) and (
+                response.status_code == 304 or (etag and response.headers.get('ETag') == etag)
+            )
+            if self._backend_unavailable(response) or unchanged:
+                if response is not None:
+                    response.close()
+                return
+            data = self._handle_response(response)
+            if data is not None and self.snapshot is snapshot:
+                self._snapshot_seeded.add(route)
+                self._snapshot_values.pop(route, None)
+                self.cache.set(route, data, ttl, etag=response.headers.get('ETag'))
+                self._shared_set(route, data, response.headers.get('ETag'), ttl)
+
+        self._executor.submit(revalidate)
+
+    def get_user_directory(self) -> UserDirectory:
+        """
+        Name index of Login/getAllUsers (see UserDirectory)
+
+        Rebuilt only when the cached user list is refetched or invalidated.
+        """
+        users = self.get_all_user_details()
+        directory = self._user_directory
+        if directory is None or unwrap_stale(directory.users) is not unwrap_stale(users):
+            directory = UserDirectory(users)
+            self._user_directory = directory
+        return directory
+
+    def _get_many(self, route: str, param: str, ids: List[Any], list_route: Optional[str] = None) -> Dict[Any, Optional[Dict]]:
+        """
+        GET route for several ids in one call
+
+        Ids are deduplicated. With list_route, ids found in the cached
+        reference list are served from its index without a request; the
+        other ids (and remembered 404s) go through _get, concurrently on the
+        bounded fan-out pool.
+
+        Returns:
+            Dict: id -> record (None if not found or on error), for each distinct id
+        """
+        unique_ids = [i for i in dict.fromkeys(ids) if i is not None]
+        results: Dict[Any, Optional[Dict]] = {}
+        if not unique_ids:
+            return results
+
+        missing = unique_ids
+        if list_route is not None and self.cache_enabled:
+            index = self.get_reference_index(list_route)
+            missing = []
+            for record_id in unique_ids:
+                record = index.by_id(record_id)
+                if record is not None:
+                    results[record_id] = record.row
+                else:
+                    missing.append(record_id)
+
+        if len(missing) == 1:
+            results[missing[0]] = self._get(route, **{param: missing[0]})
+        elif missing:
+            fetched, _, _ = self._fan_out({
+                record_id: (lambda record_id=record_id: self._get(route, **{param: record_id}))
+                for record_id in missing
+            })
+            results.update(fetched)
+        return {record_id: results.get(record_id) for record_id in unique_ids}
+
+    def _prefetch(self, route: str, params: Optional[Dict] = None, **path_params) -> Any:
+        """GET an uncached route and keep the response for the next identical _get"""
+        path = route.format(**path_params) if path_params else route
+        flight_key = (f"{self.base_url}/{path}", tuple(sorted(params.items())) if params else ())
+
+        def fetch():
+            # Stocké avant de réveiller les appels qui ont rejoint la requête
+            data = self._fetch(route, path, params, path_params)
+            if data is not None:
+                self._prefetched.set(self._cache_key(path, params), data, ttl=self.prefetch_ttl)
+            return data
+
+        return self._inflight.do(flight_key, fetch)
+
+    def prefetch_session(self, username: str, sender_id: Optional[str] = None) -> Optional[threading.Thread]:
+        """
+        Warm the user's data and the reference tables in the background (session start)
+
+        Non-blocking: the calls run on the prefetch pool from a daemon thread.
+        User routes are kept for prefetch_ttl seconds and served once; the
+        reference tables land in the reference cache. A user already
+        prefetched less than prefetch_ttl seconds ago is skipped, and so is
+        every prefetch while the pool is saturated (see _start_prefetch).
+
+        Returns:
+            Thread: The prefetch thread (None if skipped)
+        """
+        claim_key = f"session:{username}"
+        if not username or not self._claim_prefetch(claim_key):
+            return None
+
+        calls = {
+            'user': lambda: self._prefetch("Login/getUserByLogin", params={'username': username}),
+            'demandes_validateur': lambda: self._prefetch("Demandes/validateur/{username}", username=username),
+            'flux_taches_validateur': lambda: self._prefetch(
+                "FluxTaches/validateur/{validateur}", validateur=username
+            ),
+            'mes_demandes': lambda: self._prefetch("Demandes/Demandes/{username}", username=username),
+        }
+        for name, route in self.REFERENCE_DATA_ROUTES.items():
+            calls[name] = (lambda route=route: self._get(route))
+
+        return self._start_prefetch('prefetch_session', f"session de {username}", calls, sender_id, claim_key)
+
+    def prefetch_demande(self, demande_id: int, type_demande: str,
+                         sender_id: Optional[str] = None) -> Optional[threading.Thread]:
+        """
+        Speculatively fetch a demande and its details in the background
+
+        Called as soon as an id_demande entity is detected: the handler that
+        then calls get_demande_with_details (or get_demande_manoeuvre_with_details)
+        joins the requests still in flight, or is served the finished responses
+        (once, within prefetch_ttl seconds). The routes follow type_demande
+        (see PREFETCH_DEMANDE_ROUTES); other types are not prefetched. An id
+        prefetched less than prefetch_ttl seconds ago is skipped.
+
+        Returns:
+            Thread: The prefetch thread (None if skipped)
+        """
+        routes = self.PREFETCH_DEMANDE_ROUTES.get((type_demande or '').upper())
+        claim_key = f"demande:{(type_demande or '').upper()}:{demande_id}"
+        if routes is None or not self._claim_prefetch(claim_key):
+            return None
+
+        demande_route, detail_routes = routes
+        calls = {'demande': lambda: self._prefetch(demande_route, demande_id=demande_id)}
+        for section, route in detail_routes.items():
+            calls[section] = lambda route=route: self._prefetch(route, demande_id=demande_id)
+
+        return self._start_prefetch(
+            'prefetch_demande', f"demande {type_demande.upper()} {demande_id}", calls, sender_id, claim_key
+        )
+
+    def _claim_prefetch(self, key: str) -> bool:
+        """True if key was not prefetched in the last prefetch_ttl seconds (and marks it)"""
+        if not self.cache_enabled:
+            return False
+        now = time.monotonic()
+        if now - self._prefetch_started.get(key, -self.prefetch_ttl) < self.prefetch_ttl:
+            return False
+        self._prefetch_started = {
+            claimed: started for claimed, started in self._prefetch_started.items()
+            if now - started < self.prefetch_ttl
+        }
+        self._prefetch_started[key] = now
+        return True
+
+    def _start_prefetch(self, name: str, label: str, calls: Dict[str, Callable[[], Any]],
+                        sender_id: Optional[str], claim_key: Optional[str] = None) -> Optional[threading.Thread]:
+        """
+        Run calls on the prefetch pool from a daemon thread
+
+        Prefetches never wait for a slot: with prefetch_max_pending of them
+        already running, the prefetch is dropped and its claim released, so
+        the next session start or mention can try again.
+
+        Returns:
+            Thread: The prefetch thread (None if dropped)
+        """
+        if not self._prefetch_slots.acquire(blocking=False):
+            self._prefetch_dropped += 1
+            if claim_key is not None:
+                self._prefetch_started.pop(claim_key, None)
+            print(f"⏭️ Préchargement ignoré ({label}): {self.prefetch_max_pending} préchargement(s) déjà en cours")
+            return None
+
+        def run():
+            try:
+                # Trace au nom de la conversation : file d'attente équitable du limiteur
+                with backend_call_trace(name, sender_id) as trace:
+                    _, errors, _ = self._fan_out(calls, self._prefetch_executor)
+                print(f"🔥 Préchargement ({label}): {trace.total} appel(s), {len(errors)} erreur(s)")
+            finally:
+                self._prefetch_slots.release()
+
+        thread = threading.Thread(target=run, name='backend-prefetch', daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate_cache(self, route: Optional[str] = None) -> None:
+        """Invalidate one cached route (or every cached key)"""
+        self.invalidate_keys([route if route is not None else '*'])
+
+    def _fan_out(self, calls: Dict[str, Callable[[], Any]],
+                 executor: Optional[ThreadPoolExecutor] = None) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, float]]:
+        """
+        Run independent backend calls concurrently on the bounded worker pool
+
+        A call that raises or returns None is reported in errors (its result
+        is None); the other results are kept. Calls made from a pool thread
+        (fan-out or prefetch) run inline to avoid exhausting the pools with
+        nested fan-outs.
+
+        Args:
+            calls (Dict): Call name -> function
+            executor (ThreadPoolExecutor, optional): Pool to use (default: the fan-out pool)
+
+        Returns:
+            Tuple: (results, errors, timings in ms) keyed by call name
+        """
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        timings: Dict[str, float] = {}
+
+        def timed(name: str, fn: Callable[[], Any]) -> None:
+            start = time.perf_counter()
+            try:
+                results[name] = fn()
+                if results[name] is None:
+                    errors[name] = 'no data'
+            except Exception as e:
+                results[name] = None
+                errors[name] = f"{type(e).__name__}: {e}"
+                print(f"⚠️ Appel parallèle '{name}' échoué: {e}")
+            finally:
+                timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+        if threading.current_thread().name.startswith((self.FAN_OUT_THREAD_PREFIX, self.PREFETCH_THREAD_PREFIX)):
+            for name, fn in calls.items():
+                timed(name, fn)
+        else:
+            # copy_context : chaque appel garde le contexte (contextvars) de l'appelant
+            pool = executor if executor is not None else self._executor
+            futures = [
+                pool.submit(contextvars.copy_context().run, timed, name, fn)
+                for name, fn in calls.items()
+            ]
+            for future in futures:
+                future.result()
+
+        # Ordre stable (celui des appels) quel que soit l'ordre de fin
+        return (
+            {name: results[name] for name in calls},
+            errors,
+            {name: timings[name] for name in calls}
+        )
     
     # ==================== POSTES ====================
     def get_postes(self) -> List[Dict]:
         """Get all postes"""
-        url = f"{self.base_url}/Postes"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Postes")
         return data if data else []
     
     def get_poste_by_id(self, poste_id: int) -> Optional[Dict]:
         """Get poste by ID"""
-        url = f"{self.base_url}/Postes/{poste_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("Postes/{poste_id}", poste_id=poste_id)
+    
+    def get_postes_by_ids(self, poste_ids: List[int]) -> Dict[int, Optional[Dict]]:
+        """Get several postes by ID (served from the cached postes list when possible)"""
+        return self._get_many("Postes/{poste_id}", 'poste_id', poste_ids, list_route="Postes")
     
     # ==================== DIRECTIONS ====================
     def get_directions(self) -> List[Dict]:
         """Get all directions"""
-        url = f"{self.base_url}/Directions"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Directions")
         return data if data else []
     
     # ==================== EXPLOITATIONS ====================
     def get_exploitations(self) -> List[Dict]:
         """Get all exploitations"""
-        url = f"{self.base_url}/Exploitations"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Exploitations")
         return data if data else []
     
     # ==================== MOTIFS ====================
     def get_motif_demandes(self) -> List[Dict]:
         """Get all motif demandes"""
-        url = f"{self.base_url}/MotifDemandes"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("MotifDemandes")
         return data if data else []
     
     def get_motif_demandes_manoeuvre(self) -> List[Dict]:
         """Get all motif demandes manoeuvre"""
-        url = f"{self.base_url}/MotifDemandesManoeuvre"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("MotifDemandesManoeuvre")
         return data if data else []
     
     # ==================== SITUATION BUDGET ====================
     def get_situation_budgets(self) -> List[Dict]:
         """Get all situation budgets"""
-        url = f"{self.base_url}/SituationBudgets"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("SituationBudgets")
         return data if data else []
     
     # ==================== USERS ====================
     def get_users(self) -> List[Dict]:
         """Get all users"""
-        url = f"{self.base_url}/User"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("User")
         return data if data else []
     
     def get_user_by_login(self, username: str) -> Optional[Dict]:
         """Get user by login"""
-        url = f"{self.base_url}/Login/getUserByLogin"
-        response = self.session.get(url, params={'username': username})
-        return self._handle_response(response)
+        return self._get("Login/getUserByLogin", params={'username': username})
     
     def get_all_user_details(self) -> List[Dict]:
         """Get all user details"""
-        url = f"{self.base_url}/Login/getAllUsers"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Login/getAllUsers")
         return data if data else []
     
     # ==================== DEMANDES ====================
-    def create_demande(self, demande_data: Dict) -> Optional[Dict]:
-        """Create a new demande"""
-        url = f"{self.base_url}/Demandes"
-        response = self.session.post(url, json=demande_data)
+    def create_demande(self, demande_data: Dict, idempotency_key: Optional[str] = None) -> Optional[Dict]:
+        """
+        Create a new demande
+
+        idempotency_key is sent as the Idempotency-Key header. The backend must
+        honour it (return the first result for a key it has already seen): the
+        action server only deduplicates submissions within one process.
+        """
+        headers = {'Idempotency-Key': idempotency_key} if idempotency_key else None
+        response = self._send('POST', "Demandes", json=demande_data, headers=headers)
         return self._handle_response(response)
     
     def create_demande_manoeuvre(self, demande_data: Dict) -> Optional[Dict]:
         """Create a new demande manoeuvre"""
-        url = f"{self.base_url}/DemandesManoeuvre"
-        response = self.session.post(url, json=demande_data)
+        response = self._send('POST', "DemandesManoeuvre", json=demande_data)
         return self._handle_response(response)
     
     def get_demandes_by_username(self, username: str) -> List[Dict]:
         """Get demandes by username"""
-        url = f"{self.base_url}/Demandes/Demandes/{username}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Demandes/Demandes/{username}", username=username)
         return data if data else []
     
     def get_demande_by_id(self, demande_id: int) -> Optional[Dict]:
         """Get demande by ID"""
-        url = f"{self.base_url}/Demandes/{demande_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("Demandes/{demande_id}", demande_id=demande_id)
+    
+    def get_demandes_by_ids(self, demande_ids: List[int]) -> Dict[int, Optional[Dict]]:
+        """Get several demandes by ID (fetched concurrently)"""
+        return self._get_many("Demandes/{demande_id}", 'demande_id', demande_ids)
     
     # ==================== DOTATIONS ====================
     def get_dotation_categories(self) -> List[Dict]:
         """Get all dotation categories"""
-        url = f"{self.base_url}/DotationCategories"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("DotationCategories")
         return data if data else []
     
     def get_dotation_listes(self) -> List[Dict]:
         """Get all dotation listes"""
-        url = f"{self.base_url}/DotationListes"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("DotationListes")
         return data if data else []
     
     # ==================== VALIDATION HELPERS ====================
     def validate_poste(self, poste_name: str) -> bool:
         """Validate if poste exists"""
-        postes = self.get_postes()
-        poste_names = [p.get('NomPoste', '').lower() for p in postes if p.get('NomPoste')]
-        return poste_name.lower() in poste_names
+        return self.get_reference_index("Postes").has_name(poste_name)
     
     def validate_direction(self, direction_name: str) -> bool:
         """Validate if direction exists"""
-        directions = self.get_directions()
-        direction_names = [d.get('NomDirection', '').lower() for d in directions if d.get('NomDirection')]
-        return direction_name.lower() in direction_names
+        return self.get_reference_index("Directions").has_name(direction_name)
     
     def validate_exploitation(self, exploitation_name: str) -> bool:
         """Validate if exploitation exists"""
-        exploitations = self.get_exploitations()
-        exploitation_names = [e.get('NomExploitation', '').lower() for e in exploitations if e.get('NomExploitation')]
-        return exploitation_name.lower() in exploitation_names
+        return self.get_reference_index("Exploitations").has_name(exploitation_name)
     
     def validate_motif(self, motif_name: str, is_manoeuvre: bool = False) -> bool:
         """Validate if motif exists"""
-        if is_manoeuvre:
-            motifs = self.get_motif_demandes_manoeuvre()
-        else:
-            motifs = self.get_motif_demandes()
-        motif_names = [m.get('Motif', '').lower() for m in motifs if m.get('Motif')]
-        return motif_name.lower() in motif_names
+        route = "MotifDemandesManoeuvre" if is_manoeuvre else "MotifDemandes"
+        return self.get_reference_index(route).has_name(motif_name)
     
     def validate_situation_budget(self, situation_name: str) -> bool:
         """Validate if situation budget exists"""
-        situations = self.get_situation_budgets()
-        situation_names = [s.get('SituationBudget', '').lower() for s in situations if s.get('SituationBudget')]
-        return situation_name.lower() in situation_names
+        return self.get_reference_index("SituationBudgets").has_name(situation_name)
     
     def get_poste_id_by_name(self, poste_name: str) -> Optional[int]:
         """Get poste ID by name"""
-        postes = self.get_postes()
-        for p in postes:
-            if p.get('NomPoste', '').lower() == poste_name.lower():
-                return p.get('IdPoste')
-        return None
+        return self.get_reference_index("Postes").id_for_name(poste_name)
     
     def get_direction_id_by_name(self, direction_name: str) -> Optional[int]:
         """Get direction ID by name"""
-        directions = self.get_directions()
-        for d in directions:
-            if d.get('NomDirection', '').lower() == direction_name.lower():
-                return d.get('IdDir')
-        return None
+        return self.get_reference_index("Directions").id_for_name(direction_name)
     
     def get_exploitation_id_by_name(self, exploitation_name: str) -> Optional[int]:
         """Get exploitation ID by name"""
-        exploitations = self.get_exploitations()
-        for e in exploitations:
-            if e.get('NomExploitation', '').lower() == exploitation_name.lower():
-                return e.get('IdExp')
-        return None
+        return self.get_reference_index("Exploitations").id_for_name(exploitation_name)
     
     def get_motif_id_by_name(self, motif_name: str, is_manoeuvre: bool = False) -> Optional[int]:
         """Get motif ID by name"""
-        if is_manoeuvre:
-            motifs = self.get_motif_demandes_manoeuvre()
-            id_field = 'IdMotifMOE'
-        else:
-            motifs = self.get_motif_demandes()
-            id_field = 'IdMotif'
-        
-        for m in motifs:
-            if m.get('Motif', '').lower() == motif_name.lower():
-                return m.get(id_field)
-        return None
+        route = "MotifDemandesManoeuvre" if is_manoeuvre else "MotifDemandes"
+        return self.get_reference_index(route).id_for_name(motif_name)
     
     def get_situation_budget_id_by_name(self, situation_name: str) -> Optional[int]:
         """Get situation budget ID by name"""
-        situations = self.get_situation_budgets()
-        for s in situations:
-            if s.get('SituationBudget', '').lower() == situation_name.lower():
-                return s.get('IdSb')
-        return None
+        return self.get_reference_index("SituationBudgets").id_for_name(situation_name)
 
     def validate_user_exists(self, fullname: str):
         """Recherche intelligente des utilisateurs par fullname, tolère fautes et inversions"""
@@ -286,26 +1440,15 @@ class BackendService:
     def upload_file(self, file_data: bytes, filename: str, mime_type: str = None) -> Optional[Dict]:
         """Upload a single file to the backend using multipart/form-data"""
         # ✅ Utiliser l'endpoint UploadFiles (avec S) qui existe déjà
-        url = f"{self.base_url}/Demandes/UploadFiles"
-        
         try:
             # Déterminer le type MIME
             if not mime_type:
                 mime_type = 'application/octet-stream'
             
-            # Sauvegarder les headers
-            headers_backup = self.session.headers.copy()
-            
-            # Retirer temporairement Content-Type: application/json
-            if 'Content-Type' in self.session.headers:
-                del self.session.headers['Content-Type']
-            
             # ✅ Utiliser le paramètre 'files' (pluriel) comme dans upload_files()
+            # (session d'upload dédiée : aucun header partagé n'est modifié)
             files = [('files', (filename, file_data, mime_type))]
-            response = self.session.post(url, files=files)
-            
-            # Restaurer les headers
-            self.session.headers = headers_backup
+            response = self._send('POST', "Demandes/UploadFiles", files=files)
             
             result = self._handle_response(response)
             
@@ -346,7 +1489,7 @@ class BackendService:
                 header, encoded = file_url.split(',', 1)
                 file_data = base64.b64decode(encoded)
             else:
-                response = self.session.get(file_url)
+                response = self._upload_session.get(file_url, timeout=self.endpoint_timeouts['Demandes/UploadFiles'])
                 if response.status_code != 200:
                     print(f"❌ Failed to download file from {file_url}")
                     return None
@@ -394,664 +1537,502 @@ class BackendService:
     # ==================== DEMANDES MANOEUVRE ====================
     def get_demandes_manoeuvre(self) -> List[Dict]:
         """Get all demandes manoeuvre"""
-        url = f"{self.base_url}/DemandesManoeuvre"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("DemandesManoeuvre")
         return data if data else []
 
     def get_demandes_manoeuvre_by_username(self, username: str) -> List[Dict]:
         """Get demandes manoeuvre by username"""
-        url = f"{self.base_url}/DemandesManoeuvre/DemandesManoeuvre/{username}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("DemandesManoeuvre/DemandesManoeuvre/{username}", username=username)
         return data if data else []
 
     def get_demande_manoeuvre_by_id(self, demande_id: int) -> Optional[Dict]:
         """Get demande manoeuvre by ID"""
-        url = f"{self.base_url}/DemandesManoeuvre/{demande_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("DemandesManoeuvre/{demande_id}", demande_id=demande_id)
+
+    def get_demandes_manoeuvre_by_ids(self, demande_ids: List[int]) -> Dict[int, Optional[Dict]]:
+        """Get several demandes manoeuvre by ID (fetched concurrently)"""
+        return self._get_many("DemandesManoeuvre/{demande_id}", 'demande_id', demande_ids)
 
     def update_demande(self, demande_id: int, demande_data: Dict) -> Optional[Dict]:
         """Update a demande"""
-        url = f"{self.base_url}/Demandes/{demande_id}"
-        response = self.session.put(url, json=demande_data)
+        response = self._send('PUT', "Demandes/{demande_id}", json=demande_data, demande_id=demande_id)
         return self._handle_response(response)
 
     def update_demande_manoeuvre(self, demande_id: int, demande_data: Dict) -> Optional[Dict]:
         """Update a demande manoeuvre"""
-        url = f"{self.base_url}/DemandesManoeuvre/{demande_id}"
-        response = self.session.put(url, json=demande_data)
+        response = self._send('PUT', "DemandesManoeuvre/{demande_id}", json=demande_data, demande_id=demande_id)
         return self._handle_response(response)
 
     def update_demande_statut(self, demande_id: int, demande_traitement: Dict) -> Optional[Dict]:
         """Update demande status"""
-        url = f"{self.base_url}/Demandes/statut/{demande_id}"
-        response = self.session.put(url, json=demande_traitement)
+        response = self._send('PUT', "Demandes/statut/{demande_id}", json=demande_traitement, demande_id=demande_id)
         return self._handle_response(response)
 
     def update_demande_manoeuvre_statut(self, demande_id: int, demande_traitement: Dict) -> Optional[Dict]:
         """Update demande manoeuvre status"""
-        url = f"{self.base_url}/DemandesManoeuvre/statut/{demande_id}"
-        response = self.session.put(url, json=demande_traitement)
+        response = self._send('PUT', "DemandesManoeuvre/statut/{demande_id}", json=demande_traitement, demande_id=demande_id)
         return self._handle_response(response)
 
     def delete_demande(self, demande_id: int) -> bool:
         """Delete a demande"""
-        url = f"{self.base_url}/Demandes/{demande_id}"
-        response = self.session.delete(url)
+        response = self._send('DELETE', "Demandes/{demande_id}", demande_id=demande_id)
         return self._handle_response(response) is not None
 
     def filter_demande(self, search_criteria: Dict) -> List[Dict]:
         """Filter demandes"""
-        url = f"{self.base_url}/Demandes/filterDemande"
-        response = self.session.post(url, json=search_criteria)
+        response = self._send('POST', "Demandes/filterDemande", json=search_criteria)
         data = self._handle_response(response)
         return data if data else []
 
     def filter_demande_manoeuvre(self, search_criteria: Dict) -> List[Dict]:
         """Filter demandes manoeuvre"""
-        url = f"{self.base_url}/DemandesManoeuvre/filterDemande"
-        response = self.session.post(url, json=search_criteria)
+        response = self._send('POST', "DemandesManoeuvre/filterDemande", json=search_criteria)
         data = self._handle_response(response)
         return data if data else []
 
     # ==================== TYPE MOBILITE ====================
     def get_type_mobilites(self) -> List[Dict]:
         """Get all type mobilites"""
-        url = f"{self.base_url}/MpTypeMobilites"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("MpTypeMobilites")
         return data if data else []
 
     # ==================== OBJECTIFS ====================
     def get_objectif_demandes(self) -> List[Dict]:
         """Get all objectif demandes"""
-        url = f"{self.base_url}/ObjectifDemandes"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("ObjectifDemandes")
         return data if data else []
 
     def get_objectif_demandes_manoeuvre(self) -> List[Dict]:
         """Get all objectif demandes manoeuvre"""
-        url = f"{self.base_url}/ObjectifDemandesManoeuvre"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("ObjectifDemandesManoeuvre")
         return data if data else []
 
     def get_objectifs_by_demande_id(self, demande_id: int) -> List[Dict]:
         """Get objectifs by demande ID"""
-        url = f"{self.base_url}/Demandes/{demande_id}/Objectifs"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Demandes/{demande_id}/Objectifs", demande_id=demande_id)
         return data if data else []
 
     def get_objectifs_by_demande_manoeuvre_id(self, demande_id: int) -> List[Dict]:
         """Get objectifs by demande manoeuvre ID"""
-        url = f"{self.base_url}/DemandesManoeuvre/{demande_id}/Objectifs"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("DemandesManoeuvre/{demande_id}/Objectifs", demande_id=demande_id)
         return data if data else []
 
     # ==================== STATUTS ====================
     def get_statuts(self) -> List[Dict]:
         """Get all statuts"""
-        url = f"{self.base_url}/Statuts"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Statuts")
         return data if data else []
 
     def get_statut_traitements(self) -> List[Dict]:
         """Get all statut traitements"""
-        url = f"{self.base_url}/StatutTraitements"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("StatutTraitements")
         return data if data else []
 
     def get_statut_mobilites(self) -> List[Dict]:
         """Get all statut mobilites"""
-        url = f"{self.base_url}/StatutMobilites"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("StatutMobilites")
         return data if data else []
 
     # ==================== LIAISONS ====================
     def get_liaison_ddr_dotation(self) -> List[Dict]:
         """Get all liaison DDR dotation"""
-        url = f"{self.base_url}/LiaisonDdrdotations"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("LiaisonDdrdotations")
         return data if data else []
 
     def get_liaison_ddr_dotation_by_demande(self, demande_id: int) -> List[Dict]:
         """Get liaison DDR dotation by demande ID"""
-        url = f"{self.base_url}/LiaisonDdrdotations/demande/{demande_id}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("LiaisonDdrdotations/demande/{demande_id}", demande_id=demande_id)
         return data if data else []
 
     def update_liaison_ddr_dotation(self, liaison_id: int, dotation_embauche: Dict) -> Optional[Dict]:
         """Update liaison DDR dotation"""
-        url = f"{self.base_url}/LiaisonDdrdotations/{liaison_id}"
-        response = self.session.put(url, json=dotation_embauche)
+        response = self._send('PUT', "LiaisonDdrdotations/{liaison_id}", json=dotation_embauche, liaison_id=liaison_id)
         return self._handle_response(response)
 
     def get_liaison_dotation_poste(self) -> List[Dict]:
         """Get all liaison dotation poste"""
-        url = f"{self.base_url}/LiaisonDotationPostes"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("LiaisonDotationPostes")
         return data if data else []
 
     def create_liaison_poste_dotation(self, liaison_data: Dict) -> Optional[Dict]:
         """Create liaison poste dotation"""
-        url = f"{self.base_url}/LiaisonDotationPostes"
-        response = self.session.post(url, json=liaison_data)
+        response = self._send('POST', "LiaisonDotationPostes", json=liaison_data)
         return self._handle_response(response)
 
     def update_liaison_poste_dotation(self, liaison_id: int, liaison_data: Dict) -> Optional[Dict]:
         """Update liaison poste dotation"""
-        url = f"{self.base_url}/LiaisonDotationPostes/{liaison_id}"
-        response = self.session.put(url, json=liaison_data)
+        response = self._send('PUT', "LiaisonDotationPostes/{liaison_id}", json=liaison_data, liaison_id=liaison_id)
         return self._handle_response(response)
 
     def get_dotation_poste_by_id(self, liaison_id: int) -> Optional[Dict]:
         """Get dotation poste by ID"""
-        url = f"{self.base_url}/LiaisonDotationPostes/{liaison_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("LiaisonDotationPostes/{liaison_id}", liaison_id=liaison_id)
 
     def get_dotations_by_poste_id(self, poste_id: int) -> List[Dict]:
         """Get dotations by poste ID"""
-        url = f"{self.base_url}/LiaisonDotationPostes/{poste_id}/Dotations"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("LiaisonDotationPostes/{poste_id}/Dotations", poste_id=poste_id)
         return data if data else []
 
     def delete_liaison_dotation_poste(self, liaison_id: int) -> bool:
         """Delete liaison dotation poste"""
-        url = f"{self.base_url}/LiaisonDotationPostes/{liaison_id}"
-        response = self.session.delete(url)
+        response = self._send('DELETE', "LiaisonDotationPostes/{liaison_id}", liaison_id=liaison_id)
         return self._handle_response(response) is not None
 
     # ==================== FLUX ====================
     def get_flux_taches(self) -> List[Dict]:
         """Get all flux taches"""
-        url = f"{self.base_url}/FluxTaches"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("FluxTaches")
         return data if data else []
 
     def get_flux_mouvements(self) -> List[Dict]:
         """Get all flux mouvements"""
-        url = f"{self.base_url}/FluxMouvements"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("FluxMouvements")
         return data if data else []
 
     def get_flux_mouvements_with_details(self) -> List[Dict]:
         """Get all flux mouvements with details"""
-        url = f"{self.base_url}/FluxMouvements/with-user-details"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("FluxMouvements/with-user-details")
         return data if data else []
 
     def get_flux_mouvement_by_direction(self, direction_id: int) -> List[Dict]:
         """Get flux mouvement by direction"""
-        url = f"{self.base_url}/FluxMouvements/direction/{direction_id}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("FluxMouvements/direction/{direction_id}", direction_id=direction_id)
         return data if data else []
 
     def get_flux_mouvement_by_validateur(self, validateur: str) -> Optional[Dict]:
         """Get flux mouvement by validateur"""
-        url = f"{self.base_url}/FluxMouvements/validateur/{validateur}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("FluxMouvements/validateur/{validateur}", validateur=validateur)
 
     def get_flux_mouvement_by_validateur_and_demande(self, validateur: str, flux_id: int, demande_id: int) -> Optional[Dict]:
         """Get flux mouvement by validateur and demande"""
-        url = f"{self.base_url}/FluxMouvements/validateur/{validateur}/{flux_id}/{demande_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("FluxMouvements/validateur/{validateur}/{flux_id}/{demande_id}", validateur=validateur, flux_id=flux_id, demande_id=demande_id)
 
     def get_flux_mouvement_by_validateur_and_demande_moe(self, validateur: str, flux_id: int, demande_id: int) -> Optional[Dict]:
         """Get flux mouvement by validateur and demande manoeuvre"""
-        url = f"{self.base_url}/FluxMouvements/validateurMOE/{validateur}/{flux_id}/{demande_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("FluxMouvements/validateurMOE/{validateur}/{flux_id}/{demande_id}", validateur=validateur, flux_id=flux_id, demande_id=demande_id)
 
     def get_flux_mouvement_by_validateur_and_validation(self, validateur: str, validation_id: int) -> Optional[Dict]:
         """Get flux mouvement by validateur and validation"""
-        url = f"{self.base_url}/FluxMouvements/validateur/{validateur}/{validation_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("FluxMouvements/validateur/{validateur}/{validation_id}", validateur=validateur, validation_id=validation_id)
 
     def get_flux_tache_by_validateur(self, validateur: str) -> List[Dict]:
         """Get flux taches by validateur"""
-        url = f"{self.base_url}/FluxTaches/validateur/{validateur}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("FluxTaches/validateur/{validateur}", validateur=validateur)
         return data if data else []
 
     def get_flux_tache_manoeuvre_by_validateur(self, validateur: str) -> List[Dict]:
         """Get flux taches manoeuvre by validateur"""
-        url = f"{self.base_url}/FluxTachesManoeuvre/validateur/{validateur}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("FluxTachesManoeuvre/validateur/{validateur}", validateur=validateur)
         return data if data else []
 
     def update_flux_tache(self, flux_id: int, flux_data: Dict) -> Optional[Dict]:
         """Update flux tache"""
-        url = f"{self.base_url}/FluxTaches/{flux_id}"
-        response = self.session.put(url, json=flux_data)
+        response = self._send('PUT', "FluxTaches/{flux_id}", json=flux_data, flux_id=flux_id)
         return self._handle_response(response)
 
     def update_flux_tache_manoeuvre(self, flux_id: int, flux_data: Dict) -> Optional[Dict]:
         """Update flux tache manoeuvre"""
-        url = f"{self.base_url}/FluxTachesManoeuvre/{flux_id}"
-        response = self.session.put(url, json=flux_data)
+        response = self._send('PUT', "FluxTachesManoeuvre/{flux_id}", json=flux_data, flux_id=flux_id)
         return self._handle_response(response)
 
     def get_flux_tache_by_demande_and_validateur(self, demande_id: int, validateur: str) -> Optional[Dict]:
         """Get flux tache by demande and validateur"""
-        url = f"{self.base_url}/FluxTaches/demande/{demande_id}/validateur/{validateur}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("FluxTaches/demande/{demande_id}/validateur/{validateur}", demande_id=demande_id, validateur=validateur)
     
     def get_flux_tache_by_demande_manoeuvre_and_validateur(self, demande_id: int, validateur: str) -> Optional[Dict]:
         """Get flux tache by demande manoeuvre and validateur"""
-        url = f"{self.base_url}/FluxTachesManoeuvre/demande/{demande_id}/validateur/{validateur}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("FluxTachesManoeuvre/demande/{demande_id}/validateur/{validateur}", demande_id=demande_id, validateur=validateur)
 
     def get_flux_tache_by_demande_and_etat(self, demande_id: int) -> List[Dict]:
         """Get flux taches by demande ID and validation state"""
-        url = f"{self.base_url}/FluxTaches/demande/{demande_id}/validation"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("FluxTaches/demande/{demande_id}/validation", demande_id=demande_id)
         return data if data else []
 
     def get_flux_tache_by_demande_manoeuvre_and_etat(self, demande_id: int) -> List[Dict]:
         """Get flux taches by demande manoeuvre ID and validation state"""
-        url = f"{self.base_url}/FluxTachesManoeuvre/demande/{demande_id}/validation"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("FluxTachesManoeuvre/demande/{demande_id}/validation", demande_id=demande_id)
         return data if data else []
 
     def create_flux(self, flux_data: Dict) -> Optional[Dict]:
         """Create flux mouvement"""
-        url = f"{self.base_url}/FluxMouvements"
-        response = self.session.post(url, json=flux_data)
+        response = self._send('POST', "FluxMouvements", json=flux_data)
         return self._handle_response(response)
 
     def update_flux(self, flux_id: int, flux_data: Dict) -> Optional[Dict]:
         """Update flux mouvement"""
-        url = f"{self.base_url}/FluxMouvements/{flux_id}"
-        response = self.session.put(url, json=flux_data)
+        response = self._send('PUT', "FluxMouvements/{flux_id}", json=flux_data, flux_id=flux_id)
         return self._handle_response(response)
 
     def get_flux_by_id(self, flux_id: int) -> Optional[Dict]:
         """Get flux by ID"""
-        url = f"{self.base_url}/FluxMouvements/{flux_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("FluxMouvements/{flux_id}", flux_id=flux_id)
 
     def delete_flux(self, flux_id: int) -> bool:
         """Delete flux"""
-        url = f"{self.base_url}/FluxMouvements/{flux_id}"
-        response = self.session.delete(url)
+        response = self._send('DELETE', "FluxMouvements/{flux_id}", flux_id=flux_id)
         return self._handle_response(response) is not None
 
     # ==================== DOTATION ====================
     def create_dotation(self, dotation_data: Dict) -> Optional[Dict]:
         """Create dotation"""
-        url = f"{self.base_url}/DotationListes"
-        response = self.session.post(url, json=dotation_data)
+        response = self._send('POST', "DotationListes", json=dotation_data)
         return self._handle_response(response)
 
     def update_dotation(self, dotation_id: int, dotation_data: Dict) -> Optional[Dict]:
         """Update dotation"""
-        url = f"{self.base_url}/DotationListes/{dotation_id}"
-        response = self.session.put(url, json=dotation_data)
+        response = self._send('PUT', "DotationListes/{dotation_id}", json=dotation_data, dotation_id=dotation_id)
         return self._handle_response(response)
 
     def get_dotation_by_id(self, dotation_id: int) -> Optional[Dict]:
         """Get dotation by ID"""
-        url = f"{self.base_url}/DotationListes/{dotation_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("DotationListes/{dotation_id}", dotation_id=dotation_id)
 
     def get_dotation_by_demande_id(self, demande_id: int) -> List[Dict]:
         """Get dotations by demande ID"""
-        url = f"{self.base_url}/Demandes/{demande_id}/Dotations"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Demandes/{demande_id}/Dotations", demande_id=demande_id)
         return data if data else []
 
     def delete_dotation(self, dotation_id: int) -> bool:
         """Delete dotation"""
-        url = f"{self.base_url}/DotationListes/{dotation_id}"
-        response = self.session.delete(url)
+        response = self._send('DELETE', "DotationListes/{dotation_id}", dotation_id=dotation_id)
         return self._handle_response(response) is not None
 
     # ==================== EMBAUCHES ====================
     def get_embauches(self) -> List[Dict]:
         """Get all embauches"""
-        url = f"{self.base_url}/Embauches"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Embauches")
         return data if data else []
 
     def create_embauche(self, embauche_data: Dict) -> Optional[Dict]:
         """Create embauche"""
-        url = f"{self.base_url}/Embauches"
-        response = self.session.post(url, json=embauche_data)
+        response = self._send('POST', "Embauches", json=embauche_data)
         return self._handle_response(response)
 
     def get_embauche_by_id(self, embauche_id: int) -> Optional[Dict]:
         """Get embauche by ID"""
-        url = f"{self.base_url}/Embauches/{embauche_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("Embauches/{embauche_id}", embauche_id=embauche_id)
 
     def update_embauche(self, embauche_id: int, embauche_data: Dict, photo_file: Optional[str] = None) -> Optional[Dict]:
         """Update embauche (multipart/form-data if photo included)"""
-        url = f"{self.base_url}/Embauches/{embauche_id}"
-        
         if photo_file:
             # Si un fichier photo est fourni, utiliser multipart/form-data
-            files = {'Photo': open(photo_file, 'rb')}
-            response = self.session.put(url, data=embauche_data, files=files)
+            with open(photo_file, 'rb') as photo:
+                response = self._send('PUT', "Embauches/{embauche_id}", data=embauche_data, files={'Photo': photo}, embauche_id=embauche_id)
         else:
             # Sinon, envoyer en JSON
-            response = self.session.put(url, json=embauche_data)
+            response = self._send('PUT', "Embauches/{embauche_id}", json=embauche_data, embauche_id=embauche_id)
         
         return self._handle_response(response)
 
     def delete_embauche(self, embauche_id: int) -> bool:
         """Delete embauche"""
-        url = f"{self.base_url}/Embauches/{embauche_id}"
-        response = self.session.delete(url)
+        response = self._send('DELETE', "Embauches/{embauche_id}", embauche_id=embauche_id)
         return self._handle_response(response) is not None
 
     def get_filtered_embauches(self) -> List[Dict]:
         """Get filtered embauches"""
-        url = f"{self.base_url}/Embauches/filtered-embauches"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Embauches/filtered-embauches")
         return data if data else []
 
     # ==================== MOUVEMENTS ====================
     def get_mouvement_by_id(self, mouvement_id: int) -> Optional[Dict]:
         """Get mouvement by ID"""
-        url = f"{self.base_url}/Mouvements/{mouvement_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("Mouvements/{mouvement_id}", mouvement_id=mouvement_id)
 
     # ==================== COMPLEMENTS ====================
     def create_complement(self, complement_data: Dict) -> Optional[Dict]:
         """Create complement DDR"""
-        url = f"{self.base_url}/ComplementDdrs"
-        response = self.session.post(url, json=complement_data)
+        response = self._send('POST', "ComplementDdrs", json=complement_data)
         return self._handle_response(response)
 
     def create_complement_manoeuvre(self, complement_data: Dict) -> Optional[Dict]:
         """Create complement DDR manoeuvre"""
-        url = f"{self.base_url}/ComplementDdrsMOE"
-        response = self.session.post(url, json=complement_data)
+        response = self._send('POST', "ComplementDdrsMOE", json=complement_data)
         return self._handle_response(response)
 
     def get_complement_by_demande_id(self, demande_id: int) -> List[Dict]:
         """Get complements by demande ID"""
-        url = f"{self.base_url}/ComplementDdrs/demande/{demande_id}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("ComplementDdrs/demande/{demande_id}", demande_id=demande_id)
         return data if data else []
 
     def get_complement_by_demande_manoeuvre_id(self, demande_id: int) -> List[Dict]:
         """Get complements by demande manoeuvre ID"""
-        url = f"{self.base_url}/ComplementDdrsMOE/demande/{demande_id}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("ComplementDdrsMOE/demande/{demande_id}", demande_id=demande_id)
         return data if data else []
 
     # ==================== POSTE ====================
     def create_poste(self, poste_data: Dict) -> Optional[Dict]:
         """Create poste"""
-        url = f"{self.base_url}/Postes"
-        response = self.session.post(url, json=poste_data)
+        response = self._send('POST', "Postes", json=poste_data)
         return self._handle_response(response)
 
     # ==================== VALIDATION ====================
     def get_demandes_for_validateur(self, username: str) -> List[Dict]:
         """Get demandes for validateur"""
-        url = f"{self.base_url}/Demandes/validateur/{username}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Demandes/validateur/{username}", username=username)
         return data if data else []
 
     def get_demande_by_statut_and_login(self, statut_id: int, username: str) -> List[Dict]:
         """Get demandes by statut ID and username"""
-        url = f"{self.base_url}/Demandes/Statut/{username}/{statut_id}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Demandes/Statut/{username}/{statut_id}", username=username, statut_id=statut_id)
         return data if data else []
 
     def get_demande_manoeuvre_by_statut_and_login(self, statut_id: int, username: str) -> List[Dict]:
         """Get demandes manoeuvre by statut ID and username"""
-        url = f"{self.base_url}/DemandesManoeuvre/Statut/{username}/{statut_id}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("DemandesManoeuvre/Statut/{username}/{statut_id}", username=username, statut_id=statut_id)
         return data if data else []
 
     def get_demande_traitement_by_id(self, demande_id: int) -> Optional[Dict]:
         """Get demande traitement by ID"""
-        url = f"{self.base_url}/Demandes/traitement/{demande_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("Demandes/traitement/{demande_id}", demande_id=demande_id)
 
     def get_demande_manoeuvre_traitement_by_id(self, demande_id: int) -> Optional[Dict]:
         """Get demande manoeuvre traitement by ID"""
-        url = f"{self.base_url}/DemandesManoeuvre/traitement/{demande_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("DemandesManoeuvre/traitement/{demande_id}", demande_id=demande_id)
 
     def validate_mp_demande(self, demande_id: int, flux_tache_data: Dict) -> Optional[Dict]:
         """Validate MP demande"""
-        url = f"{self.base_url}/Demandes/{demande_id}/validate"
-        response = self.session.put(url, json=flux_tache_data)
+        response = self._send('PUT', "Demandes/{demande_id}/validate", json=flux_tache_data, demande_id=demande_id)
         return self._handle_response(response)
 
     def validate_mp_demande_manoeuvre(self, demande_id: int, flux_tache_data: Dict) -> Optional[Dict]:
         """Validate MP demande manoeuvre"""
-        url = f"{self.base_url}/DemandesManoeuvre/{demande_id}/validate"
-        response = self.session.put(url, json=flux_tache_data)
+        response = self._send('PUT', "DemandesManoeuvre/{demande_id}/validate", json=flux_tache_data, demande_id=demande_id)
         return self._handle_response(response)
 
     def send_demande_to_validateur(self, demande_id: int, nom_flux_id: int, responsable_rh: str, demande_data: Dict) -> Optional[Dict]:
         """Send demande to validateur"""
-        url = f"{self.base_url}/Demandes/{demande_id}/send-to-validateur/{nom_flux_id}/{responsable_rh}"
-        response = self.session.post(url, json=demande_data)
+        response = self._send('POST', "Demandes/{demande_id}/send-to-validateur/{nom_flux_id}/{responsable_rh}", json=demande_data, demande_id=demande_id, nom_flux_id=nom_flux_id, responsable_rh=responsable_rh)
         return self._handle_response(response)
 
     def send_demande_manoeuvre_to_validateur(self, demande_id: int, nom_flux_id: int, responsable_rh: str, demande_data: Dict) -> Optional[Dict]:
         """Send demande manoeuvre to validateur"""
-        url = f"{self.base_url}/DemandesManoeuvre/{demande_id}/send-to-validateur/{nom_flux_id}/{responsable_rh}"
-        response = self.session.post(url, json=demande_data)
+        response = self._send('POST', "DemandesManoeuvre/{demande_id}/send-to-validateur/{nom_flux_id}/{responsable_rh}", json=demande_data, demande_id=demande_id, nom_flux_id=nom_flux_id, responsable_rh=responsable_rh)
         return self._handle_response(response)
 
     def get_demandes_by_user_id(self, user_id: int) -> List[Dict]:
         """Get demandes by user ID"""
-        url = f"{self.base_url}/Demandes/{user_id}/Demandes"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Demandes/{user_id}/Demandes", user_id=user_id)
         return data if data else []
 
     def get_demandes_manoeuvre_by_user_id(self, user_id: int) -> List[Dict]:
         """Get demandes manoeuvre by user ID"""
-        url = f"{self.base_url}/Demandes/{user_id}/"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Demandes/{user_id}/", user_id=user_id)
         return data if data else []
 
     # ==================== FILES ====================
     def upload_files(self, files: List[str]) -> Optional[Dict]:
         """Upload files"""
-        url = f"{self.base_url}/Demandes/UploadFiles"
         files_data = [('files', open(f, 'rb')) for f in files]
-        response = self.session.post(url, files=files_data)
+        try:
+            response = self._send('POST', "Demandes/UploadFiles", files=files_data)
+        finally:
+            for _, f in files_data:
+                f.close()
         return self._handle_response(response)
 
     def download_file(self, filename: str) -> Optional[bytes]:
         """Download file"""
-        url = f"{self.base_url}/Demandes/DownloadFile/{filename}"
-        response = self.session.get(url)
-        if response.status_code == 200:
+        response = self._send('GET', "Demandes/DownloadFile/{filename}", filename=filename)
+        if response is not None and response.status_code == 200:
             return response.content
         return None
 
     # ==================== NOM FLUX ====================
+    def get_nom_flux(self) -> List[Dict]:
+        """Get all nom flux"""
+        data = self._get("NomFlux")
+        return data if data else []
 
     def get_nom_flux_by_id(self, nom_flux_id: int) -> Optional[Dict]:
         """Get nom flux by ID"""
-        url = f"{self.base_url}/NomFlux/{nom_flux_id}"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("NomFlux/{nom_flux_id}", nom_flux_id=nom_flux_id)
+
+    def get_nom_flux_by_ids(self, nom_flux_ids: List[int]) -> Dict[int, Optional[Dict]]:
+        """Get several nom flux by ID (served from the cached nom flux list when possible)"""
+        return self._get_many("NomFlux/{nom_flux_id}", 'nom_flux_id', nom_flux_ids, list_route="NomFlux")
 
     # ==================== USER DETAILS ====================
     def get_user_by_full_name(self, username: str) -> List[Dict]:
         """Get user by full name"""
-        url = f"{self.base_url}/Login/getUserByFullName/{username}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Login/getUserByFullName/{username}", username=username)
         return data if data else []
 
     def get_user_by_username(self, username: str) -> List[Dict]:
         """Get user by username"""
-        url = f"{self.base_url}/Login/{username}"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Login/{username}", username=username)
         return data if data else []
 
     def get_current_user_role(self) -> Optional[Dict]:
         """Get current user role"""
-        url = f"{self.base_url}/User/currentUserRole"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("User/currentUserRole")
 
     def get_windows_identity(self) -> Optional[str]:
         """Get Windows identity"""
-        url = f"{self.base_url}/Login/windowsIdentity"
-        response = self.session.get(url)
-        data = self._handle_response(response)
+        data = self._get("Login/windowsIdentity")
         return data if data else None
 
     def get_current_user_details_login(self) -> Optional[Dict]:
         """Get current user details from login"""
-        url = f"{self.base_url}/Login/getDetailsLogin"
-        response = self.session.get(url)
-        return self._handle_response(response)
+        return self._get("Login/getDetailsLogin")
 
     # ==================== VALIDATION HELPERS (EXTENDED) ====================
     def get_objectif_demande_id_by_name(self, objectif_name: str) -> Optional[int]:
         """Get objectif demande ID by name"""
-        objectifs = self.get_objectif_demandes()
-        for obj in objectifs:
-            if obj.get('Objectif', '').lower() == objectif_name.lower():
-                return obj.get('IdObjectif')
-        return None
+        return self.get_reference_index("ObjectifDemandes").id_for_name(objectif_name)
 
     def get_objectif_demande_manoeuvre_id_by_name(self, objectif_name: str) -> Optional[int]:
         """Get objectif demande manoeuvre ID by name"""
-        objectifs = self.get_objectif_demandes_manoeuvre()
-        for obj in objectifs:
-            if obj.get('Objectif', '').lower() == objectif_name.lower():
-                return obj.get('IdObjectifMOE')
-        return None
-    
+        return self.get_reference_index("ObjectifDemandesManoeuvre").id_for_name(objectif_name)
+
     def get_type_mobilite_id_by_name(self, type_name: str) -> Optional[int]:
         """Get type mobilite ID by name"""
-        types = self.get_type_mobilites()
-        for t in types:
-            if t.get('TypeMobilite', '').lower() == type_name.lower():
-                return t.get('IdTypeMobilite')
-        return None
+        return self.get_reference_index("MpTypeMobilites").id_for_name(type_name)
 
     def get_statut_id_by_name(self, statut_name: str) -> Optional[int]:
         """Get statut ID by name"""
-        statuts = self.get_statuts()
-        for s in statuts:
-            if s.get('Statut', '').lower() == statut_name.lower():
-                return s.get('IdStatut')
-        return None
+        return self.get_reference_index("Statuts").id_for_name(statut_name)
 
     def get_statut_traitement_id_by_name(self, statut_name: str) -> Optional[int]:
         """Get statut traitement ID by name"""
-        statuts = self.get_statut_traitements()
-        for s in statuts:
-            if s.get('StatutTraitement', '').lower() == statut_name.lower():
-                return s.get('IdStatutTraitement')
-        return None
+        return self.get_reference_index("StatutTraitements").id_for_name(statut_name)
 
     def get_statut_mobilite_id_by_name(self, statut_name: str) -> Optional[int]:
         """Get statut mobilite ID by name"""
-        statuts = self.get_statut_mobilites()
-        for s in statuts:
-            if s.get('StatutMobilite', '').lower() == statut_name.lower():
-                return s.get('IdStatutMobilite')
-        return None
+        return self.get_reference_index("StatutMobilites").id_for_name(statut_name)
 
     def get_dotation_categorie_id_by_name(self, categorie_name: str) -> Optional[int]:
         """Get dotation categorie ID by name"""
-        categories = self.get_dotation_categories()
-        for cat in categories:
-            if cat.get('Categorie', '').lower() == categorie_name.lower():
-                return cat.get('IdCategorie')
-        return None
+        return self.get_reference_index("DotationCategories").id_for_name(categorie_name)
 
     # ==================== VALIDATION HELPERS (BOOLEAN) ====================
     def validate_objectif_demande(self, objectif_name: str) -> bool:
         """Validate if objectif demande exists"""
-        objectifs = self.get_objectif_demandes()
-        objectif_names = [obj.get('Objectif', '').lower() for obj in objectifs if obj.get('Objectif')]
-        return objectif_name.lower() in objectif_names
+        return self.get_reference_index("ObjectifDemandes").has_name(objectif_name)
 
     def validate_objectif_demande_manoeuvre(self, objectif_name: str) -> bool:
         """Validate if objectif demande manoeuvre exists"""
-        objectifs = self.get_objectif_demandes_manoeuvre()
-        objectif_names = [obj.get('Objectif', '').lower() for obj in objectifs if obj.get('Objectif')]
-        return objectif_name.lower() in objectif_names
+        return self.get_reference_index("ObjectifDemandesManoeuvre").has_name(objectif_name)
 
     def validate_type_mobilite(self, type_name: str) -> bool:
         """Validate if type mobilite exists"""
-        types = self.get_type_mobilites()
-        type_names = [t.get('TypeMobilite', '').lower() for t in types if t.get('TypeMobilite')]
-        return type_name.lower() in type_names
+        return self.get_reference_index("MpTypeMobilites").has_name(type_name)
 
     def validate_statut(self, statut_name: str) -> bool:
         """Validate if statut exists"""
-        statuts = self.get_statuts()
-        statut_names = [s.get('Statut', '').lower() for s in statuts if s.get('Statut')]
-        return statut_name.lower() in statut_names
+        return self.get_reference_index("Statuts").has_name(statut_name)
 
     def validate_statut_traitement(self, statut_name: str) -> bool:
         """Validate if statut traitement exists"""
-        statuts = self.get_statut_traitements()
-        statut_names = [s.get('StatutTraitement', '').lower() for s in statuts if s.get('StatutTraitement')]
-        return statut_name.lower() in statut_names
+        return self.get_reference_index("StatutTraitements").has_name(statut_name)
 
     def validate_statut_mobilite(self, statut_name: str) -> bool:
         """Validate if statut mobilite exists"""
-        statuts = self.get_statut_mobilites()
-        statut_names = [s.get('StatutMobilite', '').lower() for s in statuts if s.get('StatutMobilite')]
-        return statut_name.lower() in statut_names
+        return self.get_reference_index("StatutMobilites").has_name(statut_name)
 
     def validate_dotation_categorie(self, categorie_name: str) -> bool:
         """Validate if dotation categorie exists"""
-        categories = self.get_dotation_categories()
-        categorie_names = [cat.get('Categorie', '').lower() for cat in categories if cat.get('Categorie')]
-        return categorie_name.lower() in categorie_names
+        return self.get_reference_index("DotationCategories").has_name(categorie_name)
 
     # ==================== SEARCH AND FUZZY MATCHING ====================
     def find_similar_postes(self, poste_name: str, threshold: int = 70, limit: int = 5) -> List[tuple]:
@@ -1139,43 +2120,67 @@ class BackendService:
         return [match for match in matches if match[1] >= threshold]
 
     # ==================== BATCH OPERATIONS ====================
-    def get_demande_with_details(self, demande_id: int) -> Optional[Dict]:
-        """Get demande with all related details (objectifs, dotations, complements)"""
-        demande = self.get_demande_by_id(demande_id)
+    def _get_with_details(self, demande_id: int, demande_route: str, detail_routes: Dict[str, str]) -> Optional[Dict]:
+        """
+        Fetch a demande, then its detail lists concurrently
+
+        The demande is fetched first so an unknown id costs a single call;
+        the details are then requested at once (latency of the slowest one
+        instead of the sum). A detail that fails is set to [] and its name
+        listed in demande['partial_errors'].
+        """
+        # Numéro déjà connu comme inexistant : ni la demande ni ses détails ne sont demandés
+        if self.cache_enabled and self.is_known_missing(demande_route.format(demande_id=demande_id)):
+            return None
+
+        demande = self._get(demande_route, demande_id=demande_id)
         if not demande:
             return None
-        
+
+        results, errors, _ = self._fan_out({
+            section: (lambda route=route: self._get(route, demande_id=demande_id))
+            for section, route in detail_routes.items()
+        })
+
+        # Copie : le résultat décodé peut être partagé avec d'autres appels simultanés
+        demande = dict(demande)
+
         # Enrichir avec les détails
-        demande['objectifs'] = self.get_objectifs_by_demande_id(demande_id)
-        demande['dotations'] = self.get_dotation_by_demande_id(demande_id)
-        demande['complements'] = self.get_complement_by_demande_id(demande_id)
-        demande['liaisons_dotation'] = self.get_liaison_ddr_dotation_by_demande(demande_id)
-        demande['flux_taches'] = self.get_flux_tache_by_demande_and_etat(demande_id)
-        
+        for section in detail_routes:
+            demande[section] = results[section] if results[section] else []
+
+        partial_errors = [section for section in detail_routes if section in errors]
+        if partial_errors:
+            print(f"⚠️ Demande {demande_id}: détails indisponibles {partial_errors}")
+        demande['partial_errors'] = partial_errors
+
         return demande
 
+    def get_demande_with_details(self, demande_id: int) -> Optional[Dict]:
+        """Get demande with all related details (objectifs, dotations, complements)"""
+        return self._get_with_details(demande_id, "Demandes/{demande_id}", self.DEMANDE_DETAIL_ROUTES)
+
     def get_demande_manoeuvre_with_details(self, demande_id: int) -> Optional[Dict]:
         """Get demande manoeuvre with all related details"""
-        demande = self.get_demande_manoeuvre_by_id(demande_id)
-        if not demande:
-            return None
-        
-        # Enrichir avec les détails
-        demande['objectifs'] = self.get_objectifs_by_demande_manoeuvre_id(demande_id)
-        demande['complements'] = self.get_complement_by_demande_manoeuvre_id(demande_id)
-        demande['flux_taches'] = self.get_flux_tache_by_demande_manoeuvre_and_etat(demande_id)
-        
-        return demande
+        return self._get_with_details(
+            demande_id, "DemandesManoeuvre/{demande_id}", self.DEMANDE_MANOEUVRE_DETAIL_ROUTES
+        )
 
     def get_user_demandes_summary(self, username: str) -> Dict:
-        """Get complete summary of user's demandes and demandes manoeuvre"""
-        summary = {
-            'demandes': self.get_demandes_by_username(username),
-            'demandes_manoeuvre': self.get_demandes_manoeuvre_by_username(username),
-            'demandes_a_valider': self.get_demandes_for_validateur(username),
-            'flux_taches': self.get_flux_tache_by_validateur(username),
-            'flux_taches_manoeuvre': self.get_flux_tache_manoeuvre_by_validateur(username)
+        """Get complete summary of user's demandes and demandes manoeuvre (fetched concurrently)"""
+        routes = {
+            'demandes': ("Demandes/Demandes/{username}", {'username': username}),
+            'demandes_manoeuvre': ("DemandesManoeuvre/DemandesManoeuvre/{username}", {'username': username}),
+            'demandes_a_valider': ("Demandes/validateur/{username}", {'username': username}),
+            'flux_taches': ("FluxTaches/validateur/{validateur}", {'validateur': username}),
+            'flux_taches_manoeuvre': ("FluxTachesManoeuvre/validateur/{validateur}", {'validateur': username}),
         }
+        results, errors, timings = self._fan_out({
+            name: (lambda route=route, path_params=path_params: self._get(route, **path_params))
+            for name, (route, path_params) in routes.items()
+        })
+
+        summary = {name: results[name] if results[name] else [] for name in routes}
         
         # Ajouter des statistiques
         summary['stats'] = {
@@ -1185,28 +2190,30 @@ class BackendService:
             'total_flux_taches': len(summary['flux_taches']),
             'total_flux_taches_manoeuvre': len(summary['flux_taches_manoeuvre'])
         }
+        summary['timings'] = timings
+        summary['partial_errors'] = [name for name in routes if name in errors]
         
         return summary
 
     # ==================== UTILITY FUNCTIONS ====================
     def get_all_reference_data(self) -> Dict:
-        """Get all reference data in one call for caching purposes"""
-        return {
-            'postes': self.get_postes(),
-            'directions': self.get_directions(),
-            'exploitations': self.get_exploitations(),
-            'motif_demandes': self.get_motif_demandes(),
-            'motif_demandes_manoeuvre': self.get_motif_demandes_manoeuvre(),
-            'objectif_demandes': self.get_objectif_demandes(),
-            'objectif_demandes_manoeuvre': self.get_objectif_demandes_manoeuvre(),
-            'situation_budgets': self.get_situation_budgets(),
-            'statuts': self.get_statuts(),
-            'statut_traitements': self.get_statut_traitements(),
-            'statut_mobilites': self.get_statut_mobilites(),
-            'type_mobilites': self.get_type_mobilites(),
-            'dotation_categories': self.get_dotation_categories(),
-            'nom_flux': self.get_nom_flux()
-        }
+        """
+        Get all reference data in one call for caching purposes
+
+        The reference endpoints are fetched concurrently (and land in the
+        reference cache), which makes this cheap enough for a warm-up.
+        'timings' gives the duration (ms) of each sub-request and
+        'partial_errors' the tables that could not be loaded.
+        """
+        results, errors, timings = self._fan_out({
+            name: (lambda route=route: self._get(route))
+            for name, route in self.REFERENCE_DATA_ROUTES.items()
+        })
+
+        data = {name: results[name] if results[name] else [] for name in self.REFERENCE_DATA_ROUTES}
+        data['timings'] = timings
+        data['partial_errors'] = [name for name in self.REFERENCE_DATA_ROUTES if name in errors]
+        return data
 
     def format_date_for_api(self, date_str: str) -> str:
         """Format date string for API (ISO format)"""
@@ -1250,12 +2257,22 @@ class BackendService:
         print("=" * 80)
 # Singleton instance
 _backend_service = None
+_backend_service_lock = threading.Lock()
 
 def get_backend_service() -> BackendService:
-    """Get singleton instance of BackendService"""
+    """
+    Get singleton instance of BackendService
+
+    Actions must use this instance: the caches are per instance, so writes
+    made through another BackendService would not invalidate them.
+    """
     global _backend_service
     if _backend_service is None:
-        _backend_service = BackendService()
+        with _backend_service_lock:
+            if _backend_service is None:
+                service = BackendService()
+                service.start_shared_cache_listener()
+                _backend_service = service
     return _backend_service
 
 
@@ -0,0 +1,140 @@
+#actions/services/json_stream.py
+"""
+Décodage incrémental d'un tableau JSON reçu en flux.
+
+Les grandes listes du backend (Login/getAllUsers, FluxMouvements/with-user-details)
+étaient chargées entièrement en mémoire (corps brut + texte + objets) avant
+d'être décodées. iter_json_array décode les éléments au fil des morceaux reçus :
+seuls le morceau courant et les éléments déjà décodés (éventuellement réduits
+aux champs utiles) restent en mémoire.
+"""
+import codecs
+import itertools
+import json
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+_WHITESPACE = ' \t\n\r'
+_BLANK_BYTES = _WHITESPACE.encode('ascii')
+_NUMBER_CHARS = '0123456789+-.eE'
+
+
+def project(item: Any, fields: Optional[Sequence[str]]) -> Any:
+    """Ne garde que les champs demandés d'un objet (tous si fields est None)"""
+    if fields is None or not isinstance(item, dict):
+        return item
+    return {field: item[field] for field in fields if field in item}
+
+
+def iter_json_array(chunks: Iterable[bytes], fields: Optional[Sequence[str]] = None,
+                    encoding: str = 'utf-8') -> Iterator[Any]:
+    """
+    Décode les éléments d'un tableau JSON au fur et à mesure
+
+    Args:
+        chunks (Iterable[bytes]): Morceaux du corps de la réponse
+        fields (Sequence[str], optional): Champs à conserver pour chaque objet
+        encoding (str): Encodage du corps
+
+    Yields:
+        Any: Chaque élément du tableau (projeté sur fields)
+
+    Raises:
+        ValueError: Si le corps n'est pas un tableau JSON valide
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+    iterator = iter(chunks)
+    buffer = ''
+    position = 0
+    eof = False
+    started = False
+
+    def read_more() -> None:
+        # Ajoute le morceau suivant au texte restant à décoder
+        nonlocal buffer, position, eof
+        if eof:
+            raise ValueError("Tableau JSON incomplet")
+        buffer = buffer[position:]
+        position = 0
+        chunk = next(iterator, None)
+        if chunk is None:
+            eof = True
+            buffer += text_decoder.decode(b'', final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
+
+    while True:
+        # Avancer jusqu'au prochain élément
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        if position >= len(buffer):
+            read_more()
+            continue
+
+        char = buffer[position]
+        if not started:
+            if char == '\ufeff':
+                position += 1
+                continue
+            if char != '[':
+                raise ValueError("Le corps de la réponse n'est pas un tableau JSON")
+            started = True
+            position += 1
+            continue
+        if char == ']':
+            return
+        if char == ',':
+            position += 1
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Élément coupé entre deux morceaux : lire la suite
+            read_more()
+            continue
+
+        if not eof and not isinstance(item, (dict, list)) and not buffer[end:].strip(_NUMBER_CHARS):
+            # Un nombre en fin de morceau (ex: "-1500." puis "5") peut se poursuivre dans le suivant
+            read_more()
+            continue
+
+        yield project(item, fields)
+        position = end
+
+        # Libérer le texte déjà décodé
+        if position > 65536:
+            buffer = buffer[position:]
+            position = 0
+
+
+def decode_json_array(chunks: Iterable[bytes], fields: Optional[Sequence[str]] = None) -> Any:
+    """
+    Liste des éléments d'un tableau JSON reçu en flux (voir iter_json_array)
+
+    Un corps qui n'est pas un tableau (objet d'erreur, enveloppe) est décodé
+    en entier, sans projection, comme le ferait response.json().
+
+    Raises:
+        ValueError: Si le corps est tronqué ou n'est pas du JSON valide
+    """
+    iterator = iter(chunks)
+    head = b''
+    while True:
+        chunk = next(iterator, None)
+        if chunk is None:
+            # Corps vide ou fait uniquement d'espaces
+            return json.loads(head)
+        head += chunk
+        body = head.lstrip(_BLANK_BYTES)
+        if body.startswith(codecs.BOM_UTF8):
+            body = body[len(codecs.BOM_UTF8):].lstrip(_BLANK_BYTES)
+        elif codecs.BOM_UTF8.startswith(body):
+            # Vide ou début de BOM coupé entre deux morceaux
+            continue
+        if body:
+            break
+
+    if body.startswith(b'['):
+        return list(iter_json_array(itertools.chain([head], iterator), fields))
+    return json.loads(head + b''.join(iterator))
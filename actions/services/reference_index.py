@@ -0,0 +1,84 @@
+#actions/services/reference_index.py
+"""
+Index en mémoire d'une table de référence du backend.
+
+Les helpers get_*_id_by_name / validate_* parcouraient toute la liste (et
+reconstruisaient une liste de noms) à chaque appel. ReferenceIndex est
+construit une seule fois par version de la liste : dictionnaires par
+identifiant et par nom normalisé, enregistrements compacts (__slots__).
+"""
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+def normalize_name(name: str) -> str:
+    """Nom normalisé pour la recherche (comparaison insensible à la casse)"""
+    return name.lower()
+
+
+class ReferenceRecord:
+    """Ligne indexée : identifiant, nom et ligne d'origine"""
+
+    __slots__ = ('id', 'name', 'row')
+
+    def __init__(self, record_id: Any, name: Optional[str], row: Dict):
+        self.id = record_id
+        self.name = name
+        self.row = row
+
+
+class ReferenceIndex:
+    """
+    Index d'une table de référence par identifiant et par nom
+
+    Args:
+        rows (Iterable[Dict]): Lignes de la table (telles que renvoyées par le backend)
+        id_field (str): Champ identifiant (ex: 'IdPoste')
+        name_field (str): Champ nom (ex: 'NomPoste')
+
+    À nom égal, la première ligne l'emporte (comme l'ancien parcours linéaire).
+    """
+
+    __slots__ = ('rows', 'id_field', 'name_field', '_by_id', '_by_name')
+
+    def __init__(self, rows: Iterable[Dict], id_field: str, name_field: str):
+        self.rows = rows
+        self.id_field = id_field
+        self.name_field = name_field
+        self._by_id: Dict[Any, ReferenceRecord] = {}
+        self._by_name: Dict[str, ReferenceRecord] = {}
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            name = row.get(name_field)
+            record = ReferenceRecord(row.get(id_field), name, row)
+            if record.id is not None:
+                self._by_id.setdefault(record.id, record)
+            if name:
+                self._by_name.setdefault(normalize_name(name), record)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[ReferenceRecord]:
+        return iter(self._by_id.values())
+
+    def by_name(self, name: Optional[str]) -> Optional[ReferenceRecord]:
+        if not name:
+            return None
+        return self._by_name.get(normalize_name(name))
+
+    def by_id(self, record_id: Any) -> Optional[ReferenceRecord]:
+        return self._by_id.get(record_id)
+
+    def id_for_name(self, name: Optional[str]) -> Optional[Any]:
+        """Identifiant de la ligne portant ce nom (None si inconnu)"""
+        record = self.by_name(name)
+        return record.id if record is not None else None
+
+    def name_for_id(self, record_id: Any) -> Optional[str]:
+        """Nom de la ligne portant cet identifiant (None si inconnu)"""
+        record = self._by_id.get(record_id)
+        return record.name if record is not None else None
+
+    def has_name(self, name: Optional[str]) -> bool:
+        return self.by_name(name) is not None
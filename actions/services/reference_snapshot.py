@@ -0,0 +1,379 @@
+#actions/services/reference_snapshot.py
+"""
+Instantané binaire des tables de référence du backend.
+
+Après un redémarrage, chaque worker re-téléchargeait les tables de référence
+(postes, directions, motifs...) et reconstruisait leurs index avant de pouvoir
+répondre. L'instantané les conserve sur disque dans un fichier compact (msgpack) :
+
+- en-tête versionné (format, URL du backend, date de création)
+- pour chaque table : ETag, lignes encodées une à une, table des positions
+  des lignes (uint32) et index persistés identifiant -> n° de ligne et
+  nom normalisé -> n° de ligne (tables de REFERENCE_INDEXES)
+
+Le fichier est mappé en lecture seule (pages partagées entre les processus).
+Une recherche par nom ou par identifiant (SnapshotIndex) ne décode que les
+deux index de la table, puis la seule ligne trouvée, à sa position dans le
+fichier ; la liste complète n'est décodée que si un appelant la demande
+(get_table). Les utilisateurs (données personnelles) n'y sont jamais écrits.
+
+Sécurité : le fichier est créé en mode 0600 dans un dossier privé (0700), et
+un fichier qui n'appartient pas à l'utilisateur courant ou modifiable par
+d'autres est refusé. L'écriture est atomique (fichier temporaire +
+os.replace), un lecteur garde donc toujours une version complète.
+"""
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import msgpack
+
+from actions.services.reference_index import ReferenceRecord, normalize_name
+
+MAGIC = b'RBSNAP'
+FORMAT_VERSION = 3
+# magic, version du format, taille de l'en-tête
+_PREAMBLE = struct.Struct('<6sHI')
+# Position d'une ligne dans la zone des lignes de sa table
+_OFFSET = struct.Struct('<I')
+
+
+def private_cache_path(filename: str) -> str:
+    """
+    Chemin d'un fichier du dossier de cache de l'utilisateur (XDG_CACHE_HOME ou ~/.cache),
+    sinon d'un dossier propre à l'utilisateur dans le répertoire temporaire
+    """
+    base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    if not os.path.isabs(base):
+        uid = os.getuid() if hasattr(os, 'getuid') else os.getenv('USERNAME', 'user')
+        base = os.path.join(tempfile.gettempdir(), f"rasa_backend_{uid}")
+    return os.path.join(base, 'rasa_backend', filename)
+
+
+def default_snapshot_path() -> str:
+    """Chemin par défaut de l'instantané (dossier de cache privé)"""
+    return private_cache_path('reference_snapshot.bin')
+
+
+def _is_trusted(file_stat: os.stat_result) -> bool:
+    """Fichier régulier, appartenant à l'utilisateur courant et non modifiable par d'autres"""
+    if not stat.S_ISREG(file_stat.st_mode):
+        return False
+    if not hasattr(os, 'getuid'):
+        # Windows : pas de propriétaire POSIX, les ACL du dossier font foi
+        return True
+    return file_stat.st_uid == os.getuid() and not file_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def ensure_private_dir(directory: str) -> None:
+    """
+    Crée le dossier (0700) s'il n'existe pas
+
+    Raises:
+        PermissionError: Si le dossier existant appartient à un autre utilisateur
+            ou est modifiable par d'autres (fichiers remplaçables par un tiers)
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        return
+    dir_stat = os.lstat(directory)
+    if (not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != os.getuid()
+            or dir_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+        raise PermissionError(f"Dossier {directory} non sûr (propriétaire ou permissions)")
+
+
+class ReferenceSnapshot:
+    """
+    Instantané mappé en mémoire (lecture seule)
+
+    Utiliser ReferenceSnapshot.load() pour l'ouvrir ; retourne None si le
+    fichier est absent, corrompu, d'une autre version de format ou non sûr.
+    """
+
+    def __init__(self, path: str, file, buffer: mmap.mmap, header: Dict[str, Any], data_start: int):
+        self.path = path
+        self._file = file
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._data_start = data_start
+        self.header = header
+        self.created_at: float = header['created_at']
+        self.base_url: str = header['base_url']
+        self._tables: Dict[str, Dict[str, Any]] = header['tables']
+        self._decoded: Dict[str, List[Any]] = {}
+        self._indexes: Dict[str, SnapshotIndex] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, base_url: Optional[str] = None) -> Optional['ReferenceSnapshot']:
+        """
+        Ouvre un instantané
+
+        Args:
+            path (str): Chemin du fichier
+            base_url (str, optional): URL du backend attendue (instantané ignoré sinon)
+        """
+        if not os.path.exists(path):
+            return None
+        f = None
+        try:
+            f = open(path, 'rb')
+            # Vérifié sur le descripteur ouvert : le fichier lu est bien celui contrôlé
+            if not _is_trusted(os.fstat(f.fileno())):
+                print(f"⚠️ Instantané {path} ignoré (propriétaire ou permissions non sûrs)")
+                f.close()
+                return None
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, header_length = _PREAMBLE.unpack_from(buffer, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                print(f"⚠️ Instantané {path} ignoré (format {version} attendu {FORMAT_VERSION})")
+                buffer.close()
+                f.close()
+                return None
+            header = msgpack.unpackb(buffer[_PREAMBLE.size:_PREAMBLE.size + header_length], strict_map_key=False)
+            if base_url is not None and header.get('base_url') != base_url:
+                print(f"⚠️ Instantané {path} ignoré (créé pour {header.get('base_url')})")
+                buffer.close()
+                f.close()
+                return None
+            return cls(path, f, buffer, header, _PREAMBLE.size + header_length)
+        except (OSError, ValueError, struct.error, msgpack.UnpackException) as e:
+            print(f"⚠️ Instantané {path} illisible: {e}")
+            if f is not None:
+                f.close()
+            return None
+
+    @property
+    def age(self) -> float:
+        """Âge de l'instantané en secondes"""
+        return time.time() - self.created_at
+
+    def tables(self) -> List[str]:
+        return list(self._tables)
+
+    def has_table(self, key: str) -> bool:
+        return key in self._tables
+
+    def etag(self, key: str) -> Optional[str]:
+        meta = self._tables.get(key)
+        return meta.get('etag') if meta else None
+
+    def _row_bounds(self, meta: Dict[str, Any], position: int) -> Tuple[int, int]:
+        start = self._data_start + meta['offsets_offset'] + position * _OFFSET.size
+        rows_start = self._data_start + meta['rows_offset']
+        return (rows_start + _OFFSET.unpack_from(self._buffer, start)[0],
+                rows_start + _OFFSET.unpack_from(self._buffer, start + _OFFSET.size)[0])
+
+    def get_row(self, key: str, position: int) -> Any:
+        """Décode une seule ligne, à sa position dans le fichier"""
+        meta = self._tables[key]
+        if not 0 <= position < meta['count']:
+            raise IndexError(position)
+        start, end = self._row_bounds(meta, position)
+        return msgpack.unpackb(self._view[start:end], strict_map_key=False)
+
+    def get_table(self, key: str) -> Optional[List[Any]]:
+        """Décode (une seule fois) toutes les lignes d'une table"""
+        if key not in self._tables:
+            return None
+        with self._lock:
+            rows = self._decoded.get(key)
+            if rows is None:
+                rows = [self.get_row(key, position) for position in range(self._tables[key]['count'])]
+                self._decoded[key] = rows
+            return rows
+
+    def has_index(self, key: str) -> bool:
+        meta = self._tables.get(key)
+        return meta is not None and 'index_offset' in meta
+
+    def index(self, key: str) -> Optional['SnapshotIndex']:
+        """Index persisté de la table (None si la table n'a pas été indexée à l'écriture)"""
+        if not self.has_index(key):
+            return None
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                meta = self._tables[key]
+                start = self._data_start + meta['index_offset']
+                by_id, by_name = msgpack.unpackb(
+                    self._view[start:start + meta['index_length']], strict_map_key=False
+                )
+                index = SnapshotIndex(self, key, meta['index_fields'], by_id, by_name)
+                self._indexes[key] = index
+            return index
+
+    def close(self) -> None:
+        self._view.release()
+        self._buffer.close()
+        self._file.close()
+
+
+class SnapshotIndex:
+    """
+    Index persisté d'une table de l'instantané (même interface que ReferenceIndex)
+
+    Les index identifiant / nom pointent vers des numéros de ligne ; une ligne
+    n'est décodée (depuis le fichier mappé) que lorsqu'une recherche la trouve.
+    """
+
+    def __init__(self, snapshot: 'ReferenceSnapshot', key: str, fields: List[str],
+                 by_id: Dict[Any, int], by_name: Dict[str, int]):
+        self.snapshot = snapshot
+        self.key = key
+        self.id_field, self.name_field = fields
+        self._by_id = by_id
+        self._by_name = by_name
+        self._records: Dict[int, ReferenceRecord] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> List[Any]:
+        """Toutes les lignes (décode la table entière)"""
+        return self.snapshot.get_table(self.key)
+
+    def _record(self, position: Optional[int]) -> Optional[ReferenceRecord]:
+        if position is None:
+            return None
+        record = self._records.get(position)
+        if record is None:
+            row = self.snapshot.get_row(self.key, position)
+            record = ReferenceRecord(row.get(self.id_field), row.get(self.name_field), row)
+            with self._lock:
+                record = self._records.setdefault(position, record)
+        return record
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[ReferenceRecord]:
+        return (self._record(position) for position in self._by_id.values())
+
+    def by_name(self, name: Optional[str]) -> Optional[ReferenceRecord]:
+        if not name:
+            return None
+        return self._record(self._by_name.get(normalize_name(name)))
+
+    def by_id(self, record_id: Any) -> Optional[ReferenceRecord]:
+        return self._record(self._by_id.get(record_id))
+
+    def id_for_name(self, name: Optional[str]) -> Optional[Any]:
+        """Identifiant de la ligne portant ce nom (None si inconnu)"""
+        record = self.by_name(name)
+        return record.id if record is not None else None
+
+    def name_for_id(self, record_id: Any) -> Optional[str]:
+        """Nom de la ligne portant cet identifiant (None si inconnu)"""
+        record = self.by_id(record_id)
+        return record.name if record is not None else None
+
+    def has_name(self, name: Optional[str]) -> bool:
+        return self.by_name(name) is not None
+
+
+def _build_index(rows: List[Any], id_field: str, name_field: str) -> Tuple[Dict[Any, int], Dict[str, int]]:
+    """Index identifiant / nom normalisé -> n° de ligne (à nom égal, la première ligne l'emporte)"""
+    by_id: Dict[Any, int] = {}
+    by_name: Dict[str, int] = {}
+    for position, row in enumerate(rows):
+        if not isinstance(row, dict):
+            continue
+        if row.get(id_field) is not None:
+            by_id.setdefault(row.get(id_field), position)
+        name = row.get(name_field)
+        if name:
+            by_name.setdefault(normalize_name(name), position)
+    return by_id, by_name
+
+
+def write_snapshot(path: str, tables: Dict[str, Tuple[List[Any], Optional[str]]], base_url: str,
+                   indexes: Optional[Dict[str, Tuple[str, str]]] = None) -> None:
+    """
+    Écrit un instantané de façon atomique (fichier 0600 dans un dossier 0700)
+
+    Args:
+        path (str): Chemin du fichier
+        tables (Dict): clé de la table -> (lignes, ETag)
+        base_url (str): URL du backend d'origine
+        indexes (Dict, optional): clé de la table -> (champ identifiant, champ nom) des index à persister
+    """
+    chunks: List[bytes] = []
+    size = 0
+    meta_tables: Dict[str, Dict[str, Any]] = {}
+
+    def append(data: bytes) -> int:
+        nonlocal size
+        offset = size
+        chunks.append(data)
+        size += len(data)
+        return offset
+
+    for key, (rows, etag) in tables.items():
+        encoded_rows = [msgpack.packb(row) for row in rows]
+        offsets = [0]
+        for encoded in encoded_rows:
+            offsets.append(offsets[-1] + len(encoded))
+        meta = meta_tables[key] = {
+            'count': len(rows),
+            'etag': etag,
+            'rows_offset': append(b''.join(encoded_rows)),
+            'offsets_offset': append(b''.join(_OFFSET.pack(offset) for offset in offsets)),
+        }
+        if indexes and key in indexes:
+            encoded_index = msgpack.packb(_build_index(rows, *indexes[key]))
+            meta['index_fields'] = list(indexes[key])
+            meta['index_offset'] = append(encoded_index)
+            meta['index_length'] = len(encoded_index)
+
+    header = msgpack.packb({
+        'format': FORMAT_VERSION,
+        'created_at': time.time(),
+        'base_url': base_url,
+        'tables': meta_tables,
+    })
+
+    ensure_private_dir(os.path.dirname(os.path.abspath(path)))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    # O_EXCL : ne réutilise jamais un fichier (ou lien) déposé par un tiers
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o600)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def acquire_refresh_lock(path: str):
+    """
+    Verrou exclusif non bloquant sur "<path>.lock" : un seul processus rafraîchit l'instantané
+
+    Returns:
+        Le fichier verrou (à garder ouvert tant que le verrou est nécessaire),
+        None si un autre processus le détient déjà
+    """
+    ensure_private_dir(os.path.dirname(os.path.abspath(path)))
+    lock_file = open(f"{path}.lock", 'a+b')
+    try:
+        try:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except ImportError:
+            import msvcrt
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
@@ -0,0 +1,350 @@
+#actions/services/resilience.py
+"""
+Politiques de résilience pour les appels au backend .NET.
+
+- RetryPolicy : nouvelles tentatives avec backoff exponentiel et jitter
+  (réservées aux requêtes idempotentes)
+- CircuitBreaker : coupe les appels quand le backend enchaîne les échecs,
+  pour échouer vite au lieu d'empiler des requêtes qui vont expirer
+- AdaptiveConcurrencyLimiter : limite le nombre de requêtes simultanées par
+  endpoint (AIMD selon la latence observée), avec une file d'attente
+  équitable entre conversations
+"""
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, List, Optional
+
+
+class RetryPolicy:
+    """
+    Politique de nouvelles tentatives avec "full jitter"
+
+    Args:
+        max_retries (int): Nombre de nouvelles tentatives après le premier essai
+        backoff_base (float): Délai de base (secondes) du backoff exponentiel
+        backoff_max (float): Délai maximum (secondes) entre deux tentatives
+    """
+
+    RETRYABLE_STATUS = frozenset([429, 502, 503, 504])
+
+    def __init__(self, max_retries: int = 2, backoff_base: float = 0.2, backoff_max: float = 2.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def delay(self, attempt: int) -> float:
+        """Délai aléatoire avant la tentative suivante (attempt commence à 0)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        return status_code in self.RETRYABLE_STATUS
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur à trois états (closed / open / half_open)
+
+    - closed : les requêtes passent, les échecs consécutifs sont comptés
+    - open : après failure_threshold échecs, les requêtes sont refusées
+      pendant recovery_timeout secondes
+    - half_open : une requête de test est autorisée ; son succès referme le
+      circuit, son échec le rouvre
+
+    Args:
+        failure_threshold (int): Échecs consécutifs avant ouverture
+        recovery_timeout (float): Durée (secondes) d'ouverture avant test
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {'failures': 0, 'successes': 0, 'rejected': 0, 'opened': 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Indique si une requête peut être envoyée au backend"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats['rejected'] += 1
+            return False
+
+    def release_probe(self) -> None:
+        """
+        Rend la place de test (half_open) d'une requête finalement non envoyée,
+        sans succès ni échec : la requête suivante pourra tester le backend.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats['successes'] += 1
+            self._consecutive_failures = 0
+            if self._state != self.CLOSED:
+                print("✅ Circuit backend refermé : le backend répond de nouveau")
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats['failures'] += 1
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats['opened'] += 1
+                    print(f"⚡ Circuit backend ouvert après {self._consecutive_failures} échec(s) consécutif(s)")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """État courant du disjoncteur (pour le monitoring)"""
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+            return {
+                'state': state,
+                'consecutive_failures': self._consecutive_failures,
+                'retry_in_seconds': retry_in,
+                **self._stats
+            }
+
+
+class _Waiter:
+    __slots__ = ('event', 'granted')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+
+
+class _EndpointLimit:
+    __slots__ = ('limit', 'in_flight', 'queues', 'samples', 'baseline', 'last_decrease', 'rejected', 'max_queued')
+
+    def __init__(self, limit: float, window: int):
+        self.limit = limit
+        self.in_flight = 0
+        # conversation -> requêtes en attente (ordre = tour de rôle)
+        self.queues: 'OrderedDict[Hashable, deque]' = OrderedDict()
+        # Dernières latences mesurées (réponses réellement servies par le backend)
+        self.samples: deque = deque(maxlen=window)
+        self.baseline: Optional[float] = None
+        self.last_decrease = 0.0
+        self.rejected = 0
+        self.max_queued = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limite de concurrence adaptative par endpoint (AIMD)
+
+    - latence de référence : 10e centile des baseline_window dernières
+      latences (les 304 et les réponses du cache HTTP en sont exclues, elles
+      ne mesurent pas le backend) ; aucune réponse n'est jugée lente avant
+      min_samples mesures
+    - augmentation additive : tant que les réponses restent rapides, la
+      limite croît de 1/limite par réponse (environ +1 par aller-retour),
+      jusqu'à max_limit si la limite est atteinte, sinon jusqu'à
+      initial_limit (retour à la normale après une baisse)
+    - diminution multiplicative : une réponse plus lente que
+      latency_tolerance × la latence de référence, une erreur 5xx/429 ou
+      une erreur réseau multiplie la limite par backoff_ratio (au plus une
+      fois par aller-retour)
+
+    Au-delà de la limite, les requêtes attendent dans une file par
+    conversation (sender) servie à tour de rôle : une conversation qui
+    envoie une rafale ne bloque pas les autres. La conversation est celle de
+    l'action tracée en cours (current_sender) ; les appels hors action
+    partagent la file None.
+
+    Args:
+        initial_limit (int): Limite de départ par endpoint
+        min_limit (int): Limite minimale
+        max_limit (int): Limite maximale
+        latency_tolerance (float): Ratio latence / latence de référence toléré
+        backoff_ratio (float): Facteur de diminution de la limite
+        queue_timeout (float): Attente maximale (secondes) dans la file
+        baseline_window (int): Nombre de latences gardées pour la référence
+        min_samples (int): Mesures nécessaires avant de juger une réponse lente
+    """
+
+    # Centile des latences récentes utilisé comme latence de référence
+    BASELINE_PERCENTILE = 0.1
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 32,
+                 latency_tolerance: float = 2.0, backoff_ratio: float = 0.75, queue_timeout: float = 30.0,
+                 baseline_window: int = 50, min_samples: int = 10):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.queue_timeout = queue_timeout
+        self.baseline_window = baseline_window
+        self.min_samples = min_samples
+        self._endpoints: Dict[str, _EndpointLimit] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, endpoint: str) -> _EndpointLimit:
+        state = self._endpoints.get(endpoint)
+        if state is None:
+            state = self._endpoints[endpoint] = _EndpointLimit(float(self.initial_limit), self.baseline_window)
+        return state
+
+    def acquire(self, endpoint: str, sender: Optional[Hashable] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Réserve une place pour une requête (attend son tour si la limite est atteinte)
+
+        Args:
+            endpoint (str): Endpoint de la requête
+            sender: Conversation à l'origine de la requête (tour de rôle)
+            timeout (float): Attente maximale pour cette requête (bornée par queue_timeout),
+                typiquement le timeout de la requête elle-même
+
+        Returns:
+            bool: False si la place n'a pas été obtenue à temps
+        """
+        with self._lock:
+            state = self._state(endpoint)
+            if state.in_flight < int(state.limit) and not state.queues:
+                state.in_flight += 1
+                return True
+            waiter = _Waiter()
+            state.queues.setdefault(sender, deque()).append(waiter)
+            state.max_queued = max(state.max_queued, state.queued)
+
+        wait = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+        if waiter.event.wait(wait):
+            return True
+
+        with self._lock:
+            if waiter.granted:
+                return True
+            queue = state.queues.get(sender)
+            if queue is not None:
+                try:
+                    queue.remove(waiter)
+                except ValueError:
+                    pass
+                if not queue:
+                    del state.queues[sender]
+            state.rejected += 1
+        return False
+
+    def release(self, endpoint: str, latency: float, success: bool = True, measured: bool = True) -> None:
+        """
+        Libère la place d'une requête terminée et ajuste la limite
+
+        Args:
+            endpoint (str): Endpoint de la requête
+            latency (float): Durée de la requête en secondes
+            success (bool): False pour une erreur réseau, 5xx ou 429
+            measured (bool): False si la réponse ne mesure pas le backend
+                (304, réponse du cache HTTP) : ni référence ni jugement de lenteur
+        """
+        with self._lock:
+            state = self._state(endpoint)
+            saturated = state.in_flight >= int(state.limit) or bool(state.queues)
+            state.in_flight = max(0, state.in_flight - 1)
+            self._adjust(state, latency, success, saturated, measured)
+            self._grant(state)
+
+    def _adjust(self, state: _EndpointLimit, latency: float, success: bool, saturated: bool,
+                measured: bool) -> None:
+        if success and measured:
+            state.samples.append(latency)
+            ordered = sorted(state.samples)
+            state.baseline = ordered[int(len(ordered) * self.BASELINE_PERCENTILE)]
+
+        slow = (
+            success and measured
+            and len(state.samples) >= self.min_samples
+            and latency > self.latency_tolerance * max(state.baseline, 0.005)
+        )
+        if not success or slow:
+            now = time.monotonic()
+            if now - state.last_decrease >= latency:
+                state.limit = max(float(self.min_limit), state.limit * self.backoff_ratio)
+                state.last_decrease = now
+        elif saturated:
+            state.limit = min(float(self.max_limit), state.limit + 1.0 / state.limit)
+        elif state.limit < self.initial_limit:
+            # Hors saturation, la limite revient vers sa valeur de départ
+            state.limit = min(float(self.initial_limit), state.limit + 1.0 / state.limit)
+
+    def _grant(self, state: _EndpointLimit) -> None:
+        # Tour de rôle entre conversations : la première file est servie puis passe en fin
+        while state.queues and state.in_flight < int(state.limit):
+            sender, queue = next(iter(state.queues.items()))
+            waiter = queue.popleft()
+            if queue:
+                state.queues.move_to_end(sender)
+            else:
+                del state.queues[sender]
+            waiter.granted = True
+            state.in_flight += 1
+            waiter.event.set()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Limite, requêtes en cours et profondeur des files par endpoint (pour le monitoring)"""
+        with self._lock:
+            return {
+                endpoint: {
+                    'limit': round(state.limit, 2),
+                    'in_flight': state.in_flight,
+                    'queued': state.queued,
+                    'queued_by_sender': {str(sender): len(queue) for sender, queue in state.queues.items()},
+                    'max_queued': state.max_queued,
+                    'rejected': state.rejected,
+                    'baseline_latency_ms': round(state.baseline * 1000, 1) if state.baseline is not None else None,
+                }
+                for endpoint, state in self._endpoints.items()
+            }
+
+    def render_prometheus(self) -> List[str]:
+        """Jauges au format texte Prometheus (ajoutées aux métriques backend)"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, key, help_text in (
+            ('backend_concurrency_limit', 'limit', 'Limite de concurrence adaptative par endpoint'),
+            ('backend_in_flight_requests', 'in_flight', 'Requêtes en cours par endpoint'),
+            ('backend_queue_depth', 'queued', "Requêtes en file d'attente par endpoint"),
+            ('backend_queue_rejected_total', 'rejected', "Requêtes abandonnées après attente dans la file"),
+        ):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {"counter" if name.endswith("_total") else "gauge"}')
+            for endpoint, state in sorted(snapshot.items()):
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {state[key]}')
+        return lines
@@ -0,0 +1,390 @@
+#actions/services/shared_store.py
+"""
+Cache partagé entre les workers du serveur d'actions.
+
+Chaque worker gardait ses propres listes (utilisateurs, flux, tables de
+référence) : N workers = N fois le trafic vers le backend et la mémoire.
+Le cache partagé conserve les réponses décodées (msgpack) avec leur ETag et
+diffuse les invalidations à tous les workers.
+
+Backends (BACKEND_SHARED_CACHE) :
+- sqlite : fichier local (BACKEND_SHARED_CACHE_PATH, par défaut dans le dossier
+  de cache privé de l'utilisateur), pour les workers d'une même machine, sans
+  service à déployer. Le fichier est créé en 0600 dans un dossier 0700 ; un
+  fichier ou un dossier d'un autre utilisateur, ou accessible à d'autres, est refusé
+- redis : serveur Redis (BACKEND_SHARED_CACHE_URL), pour plusieurs machines
+- vide / none : pas de cache partagé (comportement par défaut)
+
+Les invalidations sont un journal d'événements (clés invalidées + origine) :
+chaque worker lit les événements des autres et vide ses caches locaux.
+"""
+import json
+import os
+import sqlite3
+import stat
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional
+
+import msgpack
+
+from actions.services.reference_snapshot import ensure_private_dir, private_cache_path
+
+
+class SharedEntry:
+    """Valeur lue dans le cache partagé"""
+
+    __slots__ = ('value', 'etag', 'stored_at', 'ttl', 'unchanged')
+
+    def __init__(self, value: Any, etag: Optional[str], stored_at: float, ttl: float, unchanged: bool = False):
+        self.value = value
+        self.etag = etag
+        self.stored_at = stored_at
+        self.ttl = ttl
+        # True si l'ETag est celui déjà connu de l'appelant (valeur non décodée)
+        self.unchanged = unchanged
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.stored_at)
+
+
+class SharedStore(ABC):
+    """
+    Interface du cache partagé
+
+    Les clés sont les chemins du backend (ex: "Postes"). Une clé d'invalidation
+    terminée par '*' couvre toutes les clés de ce préfixe.
+    """
+
+    name = 'shared'
+
+    def __init__(self, retention: float = 86400):
+        # Durée de conservation des valeurs (au-delà du TTL : revalidation par ETag, mode dégradé)
+        self.retention = retention
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'invalidations_sent': 0, 'invalidations_received': 0}
+
+    @abstractmethod
+    def get(self, key: str, known_etag: Optional[str] = None) -> Optional[SharedEntry]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, etag: Optional[str], ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def touch(self, key: str) -> None:
+        """Marque une valeur comme revalidée (réponse 304)"""
+
+    @abstractmethod
+    def invalidate(self, keys: List[str]) -> None:
+        """Supprime les clés et publie l'invalidation pour les autres workers"""
+
+    @abstractmethod
+    def poll_invalidations(self) -> List[List[str]]:
+        """Invalidations publiées par les autres workers depuis le dernier appel"""
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {'backend': self.name, **self._stats}
+
+    @staticmethod
+    def _pack(value: Any) -> bytes:
+        return msgpack.packb(value)
+
+    @staticmethod
+    def _unpack(data: bytes) -> Any:
+        return msgpack.unpackb(data, strict_map_key=False)
+
+
+def _open_private_file(path: str) -> None:
+    """
+    Crée le fichier (0600, O_EXCL) s'il n'existe pas, sinon vérifie qu'il est privé
+
+    Raises:
+        PermissionError: Fichier d'un autre utilisateur, lisible ou modifiable par d'autres
+    """
+    flags = os.O_RDWR | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0)
+    try:
+        fd = os.open(path, flags | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        fd = os.open(path, flags)
+    try:
+        file_stat = os.fstat(fd)
+        if not stat.S_ISREG(file_stat.st_mode):
+            raise PermissionError(f"{path} n'est pas un fichier régulier")
+        if hasattr(os, 'getuid') and (
+                file_stat.st_uid != os.getuid() or file_stat.st_mode & (stat.S_IRWXG | stat.S_IRWXO)):
+            raise PermissionError(f"Cache partagé {path} non sûr (propriétaire ou permissions)")
+    finally:
+        os.close(fd)
+
+
+class SQLiteSharedStore(SharedStore):
+    """
+    Cache partagé dans un fichier SQLite (mode WAL : lectures concurrentes)
+
+    Args:
+        path (str): Chemin du fichier
+        retention (float): Durée de conservation des valeurs en secondes
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, retention: float = 86400):
+        super().__init__(retention)
+        self.path = path
+        self._local = threading.local()
+        # Dossier privé : SQLite y crée aussi ses fichiers -wal / -shm (mêmes permissions)
+        ensure_private_dir(os.path.dirname(os.path.abspath(path)))
+        _open_private_file(path)
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB, etag TEXT, stored_at REAL, ttl REAL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS invalidations ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT, keys TEXT, created_at REAL)"
+            )
+        # Seules les invalidations postérieures au démarrage concernent ce worker
+        row = connection.execute("SELECT COALESCE(MAX(id), 0) FROM invalidations").fetchone()
+        self._last_event_id = row[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        # Une connexion par thread (sqlite3 interdit le partage par défaut)
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, known_etag: Optional[str] = None) -> Optional[SharedEntry]:
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT etag, stored_at, ttl FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.retention:
+            self._stats['misses'] += 1
+            return None
+        etag, stored_at, ttl = row
+        self._stats['hits'] += 1
+        if known_etag is not None and etag == known_etag:
+            return SharedEntry(None, etag, stored_at, ttl, unchanged=True)
+        data = connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if data is None:
+            return None
+        return SharedEntry(self._unpack(data[0]), etag, stored_at, ttl)
+
+    def set(self, key: str, value: Any, etag: Optional[str], ttl: float) -> None:
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, etag, stored_at, ttl) VALUES (?, ?, ?, ?, ?)",
+                (key, self._pack(value), etag, now, ttl)
+            )
+            connection.execute("DELETE FROM entries WHERE stored_at < ?", (now - self.retention,))
+        self._stats['writes'] += 1
+
+    def touch(self, key: str) -> None:
+        connection = self._connection()
+        with connection:
+            connection.execute("UPDATE entries SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+    def invalidate(self, keys: List[str]) -> None:
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            for key in keys:
+                if key.endswith('*'):
+                    prefix = key[:-1]
+                    connection.execute(
+                        "DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+                    )
+                else:
+                    connection.execute(
+                        "DELETE FROM entries WHERE key = ? OR substr(key, 1, ?) = ?",
+                        (key, len(key) + 1, f"{key}?")
+                    )
+            connection.execute(
+                "INSERT INTO invalidations (origin, keys, created_at) VALUES (?, ?, ?)",
+                (self.origin, json.dumps(keys), now)
+            )
+            # Le journal ne sert qu'aux workers en cours d'exécution
+            connection.execute("DELETE FROM invalidations WHERE created_at < ?", (now - 3600,))
+        self._stats['invalidations_sent'] += 1
+
+    def poll_invalidations(self) -> List[List[str]]:
+        rows = self._connection().execute(
+            "SELECT id, origin, keys FROM invalidations WHERE id > ? ORDER BY id", (self._last_event_id,)
+        ).fetchall()
+        events = []
+        for event_id, origin, keys in rows:
+            self._last_event_id = event_id
+            if origin != self.origin:
+                events.append(json.loads(keys))
+        self._stats['invalidations_received'] += len(events)
+        return events
+
+    def close(self) -> None:
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def stats(self) -> dict:
+        return {**super().stats(), 'path': self.path}
+
+
+class RedisSharedStore(SharedStore):
+    """
+    Cache partagé dans Redis (valeurs + flux d'invalidations)
+
+    Args:
+        client: Client redis.Redis (réponses binaires, decode_responses=False)
+        namespace (str): Préfixe des clés Redis
+        retention (float): Durée de conservation des valeurs en secondes
+    """
+
+    name = 'redis'
+
+    def __init__(self, client, namespace: str = 'rasa-backend', retention: float = 86400):
+        super().__init__(retention)
+        self.client = client
+        self.namespace = namespace
+        self._events_key = f"{namespace}:invalidations"
+        # Seules les invalidations postérieures au démarrage concernent ce worker
+        last = client.xrevrange(self._events_key, count=1)
+        self._last_event_id = last[0][0] if last else b'0-0'
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.namespace}:entry:{key}"
+
+    def get(self, key: str, known_etag: Optional[str] = None) -> Optional[SharedEntry]:
+        entry_key = self._entry_key(key)
+        meta = self.client.hmget(entry_key, 'etag', 'stored_at', 'ttl')
+        if meta[1] is None:
+            self._stats['misses'] += 1
+            return None
+        etag = meta[0].decode('utf-8') if meta[0] else None
+        stored_at, ttl = float(meta[1]), float(meta[2])
+        self._stats['hits'] += 1
+        if known_etag is not None and etag == known_etag:
+            return SharedEntry(None, etag, stored_at, ttl, unchanged=True)
+        data = self.client.hget(entry_key, 'value')
+        if data is None:
+            return None
+        return SharedEntry(self._unpack(data), etag, stored_at, ttl)
+
+    def set(self, key: str, value: Any, etag: Optional[str], ttl: float) -> None:
+        entry_key = self._entry_key(key)
+        pipeline = self.client.pipeline()
+        pipeline.hset(entry_key, mapping={
+            'value': self._pack(value),
+            'etag': etag or '',
+            'stored_at': time.time(),
+            'ttl': ttl,
+        })
+        pipeline.expire(entry_key, int(self.retention))
+        pipeline.execute()
+        self._stats['writes'] += 1
+
+    def touch(self, key: str) -> None:
+        entry_key = self._entry_key(key)
+        if self.client.exists(entry_key):
+            self.client.hset(entry_key, 'stored_at', time.time())
+
+    def _keys_with_prefix(self, prefix: str) -> List[bytes]:
+        pattern = self._entry_key(prefix)
+        for char in '\\*?[]':
+            pattern = pattern.replace(char, f"\\{char}")
+        return list(self.client.scan_iter(match=f"{pattern}*", count=500))
+
+    def invalidate(self, keys: List[str]) -> None:
+        to_delete = []
+        for key in keys:
+            if key.endswith('*'):
+                to_delete.extend(self._keys_with_prefix(key[:-1]))
+            else:
+                to_delete.append(self._entry_key(key))
+                to_delete.extend(self._keys_with_prefix(f"{key}?"))
+        pipeline = self.client.pipeline()
+        if to_delete:
+            pipeline.delete(*to_delete)
+        pipeline.xadd(
+            self._events_key, {'origin': self.origin, 'keys': json.dumps(keys)},
+            maxlen=1000, approximate=True
+        )
+        pipeline.execute()
+        self._stats['invalidations_sent'] += 1
+
+    def poll_invalidations(self) -> List[List[str]]:
+        response = self.client.xread({self._events_key: self._last_event_id}, count=1000)
+        events = []
+        for _stream, messages in response or []:
+            for event_id, fields in messages:
+                self._last_event_id = event_id
+                if fields.get(b'origin', b'').decode('utf-8') != self.origin:
+                    events.append(json.loads(fields[b'keys']))
+        self._stats['invalidations_received'] += len(events)
+        return events
+
+    def close(self) -> None:
+        self.client.close()
+
+    def stats(self) -> dict:
+        return {**super().stats(), 'namespace': self.namespace}
+
+
+def create_shared_store() -> Optional[SharedStore]:
+    """
+    Cache partagé configuré par BACKEND_SHARED_CACHE (None si désactivé ou indisponible)
+
+    Variables :
+        BACKEND_SHARED_CACHE: 'sqlite', 'redis' ou vide
+        BACKEND_SHARED_CACHE_PATH: fichier SQLite (dossier de cache privé par défaut)
+        BACKEND_SHARED_CACHE_URL: URL Redis (redis://host:6379/0)
+        BACKEND_SHARED_CACHE_NAMESPACE: préfixe des clés Redis
+        BACKEND_SHARED_CACHE_RETENTION: conservation des valeurs en secondes
+    """
+    kind = os.getenv('BACKEND_SHARED_CACHE', '').lower()
+    if kind in ('', 'none', 'false'):
+        return None
+    retention = float(os.getenv('BACKEND_SHARED_CACHE_RETENTION', '86400'))
+
+    try:
+        if kind == 'sqlite':
+            path = os.getenv('BACKEND_SHARED_CACHE_PATH') or private_cache_path('shared_cache.sqlite3')
+            store = SQLiteSharedStore(path, retention=retention)
+            print(f"🔗 Cache partagé SQLite: {path}")
+            return store
+
+        if kind == 'redis':
+            try:
+                import redis
+            except ImportError:
+                print("⚠️ BACKEND_SHARED_CACHE=redis mais le paquet redis n'est pas installé")
+                return None
+            url = os.getenv('BACKEND_SHARED_CACHE_URL', 'redis://localhost:6379/0')
+            client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+            client.ping()
+            store = RedisSharedStore(
+                client, namespace=os.getenv('BACKEND_SHARED_CACHE_NAMESPACE', 'rasa-backend'), retention=retention
+            )
+            print(f"🔗 Cache partagé Redis: {url}")
+            return store
+    except Exception as e:
+        print(f"⚠️ Cache partagé {kind} indisponible, cache local uniquement: {e}")
+        return None
+
+    print(f"⚠️ BACKEND_SHARED_CACHE inconnu: {kind}")
+    return None
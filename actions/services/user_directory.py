@@ -0,0 +1,166 @@
+#actions/services/user_directory.py
+"""
+Annuaire en mémoire des utilisateurs pour la recherche par nom.
+
+UserSearchService.search_user_by_name normalisait (NFD + filtre des accents)
+et découpait le FullName de chaque utilisateur à chaque requête, puis
+comparait chaque mot de la requête à chaque mot de chaque nom. UserDirectory
+normalise les noms une seule fois par version de la liste et indexe les mots :
+- index inversé mot -> utilisateurs ;
+- index des n-grammes (1 à 3 caractères) -> mots qui les contiennent.
+
+Les mots qui contiennent le mot le plus sélectif de la requête (égalité,
+début ou contenu) sont obtenus depuis les n-grammes ; seuls les utilisateurs
+portant ces mots sont évalués. Le score est identique à l'ancien parcours
+complet.
+"""
+import heapq
+import unicodedata
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+_GRAM_MAX = 3
+
+
+def normalize_text(text: str) -> str:
+    """
+    Supprime les accents et convertit en minuscules
+
+    Example:
+        >>> normalize_text("Éléonore")
+        'eleonore'
+    """
+    if not text:
+        return ""
+    text = ''.join(
+        c for c in unicodedata.normalize('NFD', text)
+        if unicodedata.category(c) != 'Mn'
+    )
+    return text.lower()
+
+
+class UserDirectory:
+    """
+    Index des utilisateurs par mots de leur nom complet
+
+    Args:
+        users (List[Dict]): Utilisateurs (tels que renvoyés par Login/getAllUsers)
+
+    Les utilisateurs sans FullName sont ignorés ; l'ordre de la liste départage
+    les scores égaux.
+    """
+
+    __slots__ = ('users', '_entries', '_names', '_words', '_by_word', '_grams')
+
+    def __init__(self, users: List[Dict]):
+        self.users = users
+        self._entries: List[Dict] = []
+        self._names: List[str] = []
+        self._words: List[Tuple[str, ...]] = []
+        self._by_word: Dict[str, List[int]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+
+        for user in users:
+            full_name = user.get('FullName', '') if isinstance(user, dict) else ''
+            if not full_name:
+                continue
+            entry = len(self._entries)
+            normalized_name = normalize_text(full_name)
+            words = tuple(normalized_name.split())
+            self._entries.append(user)
+            self._names.append(normalized_name)
+            self._words.append(words)
+            for word in set(words):
+                postings = self._by_word.get(word)
+                if postings is None:
+                    self._by_word[word] = [entry]
+                    self._index_grams(word)
+                else:
+                    postings.append(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _index_grams(self, word: str) -> None:
+        for size in range(1, min(_GRAM_MAX, len(word)) + 1):
+            for start in range(len(word) - size + 1):
+                self._grams.setdefault(word[start:start + size], set()).add(word)
+
+    def words_containing(self, fragment: str) -> FrozenSet[str]:
+        """Mots indexés qui contiennent fragment (égalité et début compris)"""
+        grams = sorted(self._fragment_grams(fragment), key=len)
+        if len(fragment) <= _GRAM_MAX:
+            return frozenset(grams[0])
+        candidates = grams[0].intersection(*grams[1:])
+        return frozenset(word for word in candidates if fragment in word)
+
+    def _fragment_grams(self, fragment: str) -> List[Set[str]]:
+        if len(fragment) <= _GRAM_MAX:
+            return [self._grams.get(fragment, set())]
+        return [self._grams.get(fragment[i:i + _GRAM_MAX], set()) for i in range(len(fragment) - _GRAM_MAX + 1)]
+
+    def _selectivity(self, fragment: str) -> int:
+        """Borne haute du nombre de mots contenant fragment (sans les énumérer)"""
+        return min(len(words) for words in self._fragment_grams(fragment))
+
+    def _score(self, entry: int, query_words: List[str], prefix: str) -> int:
+        """
+        Score de correspondance (mêmes règles que l'ancien _calculate_match_score)
+
+        Pour chaque mot de la requête, le premier mot du nom qui le contient
+        compte 10 (égalité), 7 (début) ou 5 (contenu) ; 0 si un mot de la
+        requête n'est trouvé nulle part. +15 si le nom commence par la requête.
+        """
+        score = 0
+        words = self._words[entry]
+        for query_word in query_words:
+            for name_word in words:
+                if query_word in name_word:
+                    if name_word == query_word:
+                        score += 10
+                    elif name_word.startswith(query_word):
+                        score += 7
+                    else:
+                        score += 5
+                    break
+            else:
+                return 0
+
+        if self._names[entry].startswith(prefix):
+            score += 15
+        return score
+
+    def search(self, search_query: str, max_results: int = 10) -> List[Dict]:
+        """
+        Utilisateurs dont le nom contient tous les mots de la requête, par pertinence
+
+        Args:
+            search_query (str): Nom ou partie du nom (casse, accents et ordre des mots indifférents)
+            max_results (int): Nombre maximum de résultats
+
+        Returns:
+            List[Dict]: Utilisateurs triés par score décroissant
+        """
+        query_words = normalize_text(search_query).split()
+        if not query_words:
+            # Requête vide après normalisation : tous les noms commencent par ''
+            return self._entries[:max_results]
+
+        # Candidats : utilisateurs portant un mot qui contient le mot le plus sélectif
+        rarest = min(query_words, key=self._selectivity)
+        candidates: Set[int] = set()
+        for word in self.words_containing(rarest):
+            candidates.update(self._by_word[word])
+
+        prefix = ' '.join(query_words)
+        scored: List[Tuple[int, int]] = []
+        for entry in candidates:
+            score = self._score(entry, query_words, prefix)
+            if score > 0:
+                scored.append((-score, entry))
+
+        # À score égal, l'ordre de la liste d'origine est conservé
+        if max_results >= 0:
+            ranked = heapq.nsmallest(max_results, scored)
+        else:
+            ranked = sorted(scored)[:max_results]
+        return [self._entries[entry] for _, entry in ranked]
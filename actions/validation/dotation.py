@@ -15,6 +15,7 @@ logger = logging.getLogger(__name__)
 
 # Import the backend service
 from actions.services.ddr_service import get_backend_service
+from actions.Middleware.backend_tracer import trace_backend_calls
 
 
 def remove_accents(text: str) -> str:
@@ -36,6 +37,7 @@ class ActionVerificationDotation(Action):
     def name(self) -> Text:
         return "verification_dotation"
     
+    @trace_backend_calls
     def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
@@ -689,6 +691,7 @@ class ActionRemplacerDotation(Action):
     def name(self) -> Text:
         return "action_remplacer_dotation"
     
+    @trace_backend_calls
     def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -1043,6 +1046,7 @@ class ActionExtractDotationsSecours(Action):
     def name(self) -> Text:
         return "action_extract_dotations_secours"
     
+    @trace_backend_calls
     def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
@@ -10,15 +10,60 @@ import re
 from datetime import datetime
 import unicodedata
 import logging
+import numpy as np
+from rapidfuzz import fuzz, process
 
 logger = logging.getLogger(__name__)
 
 # Import the backend service
 from actions.services.ddr_service import get_backend_service
+from actions.Middleware.backend_tracer import trace_backend_calls
+from actions.services.backend_cache import unwrap_stale
+
+
+class _TableNoms:
+    """
+    Noms des utilisateurs normalisés une fois par version de la liste
+    (tableaux alignés + index pour les correspondances exactes et par mot)
+    """
+
+    __slots__ = ('users', 'entries', 'lowered', 'normalized', 'by_lowered', 'by_normalized', 'by_token')
+
+    def __init__(self, users: List[Dict], remove_accents):
+        self.users = users
+        self.entries: List[Dict] = []
+        self.lowered: List[str] = []
+        self.normalized: List[str] = []
+        self.by_lowered: Dict[str, List[int]] = {}
+        self.by_normalized: Dict[str, List[int]] = {}
+        self.by_token: Dict[str, List[int]] = {}
+
+        for user in users:
+            fullname = user.get('FullName', '')
+            if not fullname:
+                continue
+            i = len(self.entries)
+            lowered = fullname.lower().strip()
+            normalized = remove_accents(lowered)
+            self.entries.append(user)
+            self.lowered.append(lowered)
+            self.normalized.append(normalized)
+
+            # Les noms d'un caractère ne servent qu'aux suggestions
+            if len(fullname) < 2:
+                continue
+            self.by_lowered.setdefault(lowered, []).append(i)
+            self.by_normalized.setdefault(normalized, []).append(i)
+            for token in set(normalized.split()):
+                self.by_token.setdefault(token, []).append(i)
+
 
 class ActionVerificationEncadreur(Action):
     """Valide l'encadreur avec recherche intelligente optimisée"""
     
+    # Table des noms partagée entre les instances (reconstruite si la liste change)
+    _table_noms: Optional[_TableNoms] = None
+    
     def __init__(self):
         super().__init__()
         self.backend = get_backend_service()
@@ -26,6 +71,7 @@ class ActionVerificationEncadreur(Action):
     def name(self) -> Text:
         return "verification_encadreur"
     
+    @trace_backend_calls
     def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
@@ -137,6 +183,18 @@ class ActionVerificationEncadreur(Action):
             SlotSet("poste_encadreur", None)
         ]
     
+    def _get_table_noms(self) -> Optional[_TableNoms]:
+        """Table des noms de la liste d'utilisateurs en cache (None si indisponible)"""
+        users = self.backend.get_all_user_details() or []
+        if not users:
+            return None
+        
+        table = ActionVerificationEncadreur._table_noms
+        if table is None or unwrap_stale(table.users) is not unwrap_stale(users):
+            table = _TableNoms(users, self._remove_accents)
+            ActionVerificationEncadreur._table_noms = table
+        return table
+    
     def _recherche_intelligente(self, nom_recherche: str) -> List[Dict]:
         """
         Recherche intelligente avec fuzzy matching optimisé
@@ -145,44 +203,42 @@ class ActionVerificationEncadreur(Action):
         - Seuils adaptatifs selon le type de match
         - Filtrage plus strict des faux positifs
         - Priorité aux noms complets vs partiels
+        - Noms normalisés une seule fois, scores calculés en lot (process.cdist)
         """
-        from rapidfuzz import fuzz, process
+        table = self._get_table_noms()
         
-        users = self.backend.get_all_user_details() or []
-        
-        if not users:
+        if table is None:
             logger.warning("⚠️ Impossible de récupérer la liste des utilisateurs")
             return []
         
-        nom_recherche_norm = self._remove_accents(nom_recherche.lower().strip())
+        nom_recherche_lower = nom_recherche.lower().strip()
+        nom_recherche_norm = self._remove_accents(nom_recherche_lower)
         tokens_recherche = set(nom_recherche_norm.split())
         
         logger.info(f"🔍 Recherche pour: '{nom_recherche}' (tokens: {tokens_recherche})")
-        logger.info(f"📊 Base de données: {len(users)} utilisateurs")
+        logger.info(f"📊 Base de données: {len(table.users)} utilisateurs")
         
         # ==========================================
         # PHASE 1: CORRESPONDANCES EXACTES
         # ==========================================
+        exact_indices = sorted(
+            set(table.by_lowered.get(nom_recherche_lower, ())) |
+            set(table.by_normalized.get(nom_recherche_norm, ()))
+        )
         exact_matches = []
         
-        for user in users:
-            fullname = user.get('FullName', '')
-            if not fullname or len(fullname) < 2:
-                continue
-            
-            fullname_norm = self._remove_accents(fullname.lower().strip())
-            
+        for i in exact_indices:
             # CORRESPONDANCE EXACTE (avec casse)
-            if nom_recherche.lower().strip() == fullname.lower().strip():
+            if table.lowered[i] == nom_recherche_lower:
                 exact_matches.append({
-                    'user_details': user,
+                    'user_details': table.entries[i],
                     'match_score': 100.0,
                     'method': 'exact'
                 })
             # CORRESPONDANCE EXACTE SANS ACCENTS
-            elif nom_recherche_norm == fullname_norm:
+            else:
                 exact_matches.append({
-                    'user_details': user,
+                    'user_details': table.entries[i],
                     'match_score': 98.0,
                     'method': 'exact_no_accent'
                 })
@@ -194,59 +250,56 @@ class ActionVerificationEncadreur(Action):
         # ==========================================
         # PHASE 2: RECHERCHE FUZZY OPTIMISÉE
         # ==========================================
-        fuzzy_matches = []
+        # 🆕 FILTRE PRÉ-CALCUL: Ignorer si < 40% tokens communs (index par mot)
+        common_counts: Dict[int, int] = {}
+        for token in tokens_recherche:
+            for i in table.by_token.get(token, ()):
+                common_counts[i] = common_counts.get(i, 0) + 1
         
-        for user in users:
-            fullname = user.get('FullName', '')
-            if not fullname or len(fullname) < 2:
-                continue
-            
-            fullname_norm = self._remove_accents(fullname.lower().strip())
-            tokens_fullname = set(fullname_norm.split())
-            
-            # 🆕 FILTRE PRÉ-CALCUL: Ignorer si < 50% tokens communs
-            common_tokens = tokens_recherche.intersection(tokens_fullname)
-            if len(common_tokens) == 0 or len(common_tokens) / max(len(tokens_recherche), 1) < 0.4:
-                continue
-            
-            best_score = 0
-            best_method = None
-            
-            # TOKEN SORT RATIO (gère inversions) - SEUIL ÉLEVÉ
-            score_token_sort = fuzz.token_sort_ratio(nom_recherche_norm, fullname_norm)
-            if score_token_sort >= 90:  # 🆕 Augmenté de 85 → 90
-                best_score = score_token_sort
-                best_method = 'token_sort'
-            
-            # PARTIAL RATIO (noms partiels) - SEUIL MOYEN
-            score_partial = fuzz.partial_ratio(nom_recherche_norm, fullname_norm)
-            if score_partial >= 85:  # 🆕 Augmenté de 80 → 85
-                adjusted_score = score_partial * 0.88  # 🆕 Réduit de 0.9 → 0.88
-                if adjusted_score > best_score:
-                    best_score = adjusted_score
-                    best_method = 'partial'
-            
-            # TOKEN SET RATIO (mots manquants) - SEUIL BAS
-            score_token_set = fuzz.token_set_ratio(nom_recherche_norm, fullname_norm)
-            if score_token_set >= 80:  # 🆕 Augmenté de 75 → 80
-                adjusted_score = score_token_set * 0.82  # 🆕 Réduit de 0.85 → 0.82
-                if adjusted_score > best_score:
-                    best_score = adjusted_score
-                    best_method = 'token_set'
-            
-            # 🆕 SEUIL FINAL AUGMENTÉ: 80 au lieu de 70
-            if best_score >= 80:
-                fuzzy_matches.append({
-                    'user_details': user,
-                    'match_score': best_score,
-                    'method': best_method
-                })
+        nb_tokens = max(len(tokens_recherche), 1)
+        candidates = sorted(i for i, common in common_counts.items() if not common / nb_tokens < 0.4)
+        if not candidates:
+            logger.info("📊 Résultats fuzzy: 0 correspondance(s)")
+            return []
+        
+        # Scores de tous les candidats en trois appels natifs
+        choices = [table.normalized[i] for i in candidates]
+        score_token_sort = process.cdist([nom_recherche_norm], choices, scorer=fuzz.token_sort_ratio, dtype=np.float64)[0]
+        score_partial = process.cdist([nom_recherche_norm], choices, scorer=fuzz.partial_ratio, dtype=np.float64)[0]
+        score_token_set = process.cdist([nom_recherche_norm], choices, scorer=fuzz.token_set_ratio, dtype=np.float64)[0]
+        
+        methods = np.array([None, 'token_sort', 'partial', 'token_set'], dtype=object)
+        
+        # TOKEN SORT RATIO (gère inversions) - SEUIL ÉLEVÉ
+        best_score = np.where(score_token_sort >= 90, score_token_sort, 0.0)  # 🆕 Augmenté de 85 → 90
+        best_method = np.where(score_token_sort >= 90, 1, 0)
+        
+        # PARTIAL RATIO (noms partiels) - SEUIL MOYEN
+        adjusted_score = np.where(score_partial >= 85, score_partial * 0.88, 0.0)  # 🆕 85 / 0.88
+        better = adjusted_score > best_score
+        best_score = np.where(better, adjusted_score, best_score)
+        best_method = np.where(better, 2, best_method)
+        
+        # TOKEN SET RATIO (mots manquants) - SEUIL BAS
+        adjusted_score = np.where(score_token_set >= 80, score_token_set * 0.82, 0.0)  # 🆕 80 / 0.82
+        better = adjusted_score > best_score
+        best_score = np.where(better, adjusted_score, best_score)
+        best_method = np.where(better, 3, best_method)
         
         # ==========================================
         # TRIER ET LIMITER
         # ==========================================
-        fuzzy_matches.sort(key=lambda x: x['match_score'], reverse=True)
-        top_matches = fuzzy_matches[:5]
+        # 🆕 SEUIL FINAL AUGMENTÉ: 80 au lieu de 70 ; à score égal, ordre de la liste
+        kept = np.flatnonzero(best_score >= 80)
+        ranked = kept[np.argsort(-best_score[kept], kind='stable')][:5]
+        top_matches = [
+            {
+                'user_details': table.entries[candidates[k]],
+                'match_score': float(best_score[k]),
+                'method': methods[best_method[k]]
+            }
+            for k in ranked
+        ]
         
         logger.info(f"📊 Résultats fuzzy: {len(top_matches)} correspondance(s)")
         for i, match in enumerate(top_matches, 1):
@@ -259,31 +312,17 @@ class ActionVerificationEncadreur(Action):
     
     def _get_suggestions(self, nom_recherche: str) -> List[str]:
         """Retourne des suggestions de noms similaires"""
-        from rapidfuzz import fuzz, process
-        
-        users = self.backend.get_all_user_details() or []
-        if not users:
+        table = self._get_table_noms()
+        if table is None:
             return []
         
         nom_recherche_norm = self._remove_accents(nom_recherche.lower().strip())
-        suggestions = []
-        
-        for user in users:
-            fullname = user.get('FullName', '')
-            if not fullname:
-                continue
-            
-            fullname_norm = self._remove_accents(fullname.lower().strip())
-            score = fuzz.token_sort_ratio(nom_recherche_norm, fullname_norm)
-            
-            if score >= 60:  # 🆕 Augmenté de 50 → 60
-                suggestions.append({
-                    'name': fullname,
-                    'score': score
-                })
+        scores = process.cdist([nom_recherche_norm], table.normalized, scorer=fuzz.token_sort_ratio, dtype=np.float64)[0]
         
-        suggestions.sort(key=lambda x: x['score'], reverse=True)
-        return [s['name'] for s in suggestions[:5]]
+        # 🆕 Augmenté de 50 → 60 ; à score égal, ordre de la liste
+        kept = np.flatnonzero(scores >= 60)
+        ranked = kept[np.argsort(-scores[kept], kind='stable')][:5]
+        return [table.entries[i].get('FullName', '') for i in ranked]
     
     def _remove_accents(self, text: str) -> str:
         """Supprime les accents d'une chaîne de caractères"""
@@ -15,6 +15,7 @@ logger = logging.getLogger(__name__)
 
 # Import the backend service
 from actions.services.ddr_service import get_backend_service
+from actions.Middleware.backend_tracer import trace_backend_calls
 
 def remove_accents(text: str) -> str:
     """Supprime les accents d'une chaîne de caractères"""
@@ -34,6 +35,7 @@ class ActionVerificationHierarchie(Action):
     def name(self) -> Text:
         return "verification_hierarchie"
     
+    @trace_backend_calls
     def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
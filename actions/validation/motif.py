@@ -11,6 +11,8 @@ from datetime import datetime
 import unicodedata
 import logging
 
+from actions.Middleware.backend_tracer import trace_backend_calls
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +27,7 @@ class ActionVerificationMotif(Action):
     def name(self) -> Text:
         return "verification_motif"
     
+    @trace_backend_calls
     def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
@@ -15,6 +15,7 @@ logger = logging.getLogger(__name__)
 
 # Import the backend service
 from actions.services.ddr_service import get_backend_service
+from actions.Middleware.backend_tracer import trace_backend_calls
 
 class ActionVerificationPoste(Action):
     """Valide le poste avec extraction prioritaire depuis le message initial"""
@@ -27,6 +28,7 @@ class ActionVerificationPoste(Action):
     def name(self) -> Text:
         return "verification_poste"
     
+    @trace_backend_calls
     def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
@@ -7,6 +7,10 @@ from typing import Any, Text, Dict, List, Set
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 
+from actions.Middleware.speculative_prefetch import prefetch_detected_demande
+from actions.Middleware.backend_tracer import trace_backend_calls
+from actions.services.async_ddr_service import get_backend_service
+
 logger = logging.getLogger(__name__)
 
 # Import des validateurs
@@ -124,13 +128,13 @@ class ActionValidateSlots(Action):
         Retourne: (slot_name, events, success)
         """
         try:
-            result = validator.run(dispatcher, tracker, domain)
-            
-            # Gestion async/sync
-            if asyncio.iscoroutine(result):
-                validation_events = await result
+            # Gestion async/sync : un validateur synchrone (appels backend bloquants)
+            # s'exécute sur le pool de l'AsyncBackendService, pas sur la boucle
+            if asyncio.iscoroutinefunction(validator.run):
+                validation_events = await validator.run(dispatcher, tracker, domain)
             else:
-                validation_events = result
+                backend = await get_backend_service()
+                validation_events = await backend.run_sync(validator.run, dispatcher, tracker, domain)
             
             return (slot_name, validation_events or [], True)
         
@@ -138,6 +142,7 @@ class ActionValidateSlots(Action):
             logger.error(f"❌ Erreur validation {slot_name}: {e}")
             return (slot_name, [], False)
     
+    @trace_backend_calls
     async def run(
         self,
         dispatcher: CollectingDispatcher,
@@ -155,6 +160,10 @@ class ActionValidateSlots(Action):
         latest_metadata = latest_message.get("metadata", {})
         all_metadata = {**session_metadata, **latest_metadata}
         
+        # Demande citée : ses détails sont chargés pendant la suite du tour
+        backend = await get_backend_service()
+        await backend.run_sync(prefetch_detected_demande, tracker)
+        
         if logger.isEnabledFor(logging.INFO):
             logger.info(f"\n{'='*80}")
             logger.info(f"🔍 ACTION_VALIDATE_SLOTS - Message: '{user_message[:100]}'")
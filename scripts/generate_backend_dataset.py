@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Generate a synthetic dataset shaped like the .NET backend API, for load tests.
+
+Tables use the field names the actions read (FullName, NomPoste, NomFluxMouvement,
+V1..V5 / V1UserName..., IdDdr, MpFluxTaches...). Generation is seeded, so the same
+arguments always give the same data. Per-demande details (objectifs, dotations,
+flux taches) are derived from the demande id on demand by `demande_details`, which
+keeps 100k demandes cheap in memory.
+
+Usage:
+    python scripts/generate_backend_dataset.py --users 50000 --flux 10000 --demandes 100000
+Outputs:
+ - results/backend_dataset.json (or --out)
+"""
+import argparse
+import json
+import os
+import random
+import time
+import unicodedata
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_OUT = os.path.join(ROOT, "results", "backend_dataset.json")
+
+FIRST_NAMES = [
+    "Jean", "Marie", "Pierre", "Anne", "Michel", "Sophie", "François", "Hélène", "Éric", "Céline",
+    "Rakoto", "Hery", "Fanja", "Tiana", "Mamy", "Voahangy", "Andry", "Lalaina", "Nirina", "Haja",
+    "Olivier", "Isabelle", "Thierry", "Nathalie", "Stéphane", "Valérie", "Laurent", "Sandrine",
+    "Rivo", "Miora", "Fetra", "Soa", "Tahina", "Zo", "Njaka", "Onja", "Toky", "Hasina",
+]
+LAST_NAMES = [
+    "Rakotomalala", "Randrianarisoa", "Rasolofonirina", "Andriamanantena", "Rabemananjara",
+    "Razafindrakoto", "Ravelojaona", "Rakotondrazaka", "Andrianjafy", "Ratsimbazafy",
+    "Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy",
+    "Moreau", "Simon", "Laurent", "Lefèvre", "Michel", "García", "Fontaine", "Chevalier",
+]
+POSTE_WORDS = [
+    "Responsable", "Chef", "Assistant", "Technicien", "Ingénieur", "Analyste", "Gestionnaire",
+    "Coordinateur", "Superviseur", "Directeur", "Agent", "Contrôleur", "Chargé",
+]
+POSTE_DOMAINS = [
+    "Ressources Humaines", "Comptabilité", "Maintenance", "Production", "Logistique",
+    "Informatique", "Qualité", "Sécurité", "Achats", "Finance", "Juridique", "Communication",
+    "Exploitation", "Environnement", "Audit", "Paie", "Formation", "Commercial",
+]
+DIRECTIONS = [
+    "Direction Générale", "Direction des Ressources Humaines", "Direction Financière",
+    "Direction Technique", "Direction des Opérations", "Direction Commerciale",
+    "Direction des Systèmes d'Information", "Direction Juridique", "Direction Logistique",
+    "Direction Qualité Sécurité Environnement",
+]
+EXPLOITATIONS = ["Antananarivo", "Toamasina", "Mahajanga", "Fianarantsoa", "Toliara", "Antsiranana", "Moramanga"]
+TYPE_FLUX = ["Engagement", "Liquidation", "Recrutement", "Mobilité", "Manoeuvre"]
+MOTIFS = ["Création de poste", "Remplacement", "Surcroît d'activité", "Départ à la retraite", "Démission", "Mutation"]
+SITUATIONS = ["Budgétisé", "Non budgétisé", "Hors budget"]
+STATUTS = ["Brouillon", "En attente de validation", "Validée", "Rejetée", "Clôturée"]
+OBJECTIFS = [
+    "Assurer la continuité du service", "Améliorer la productivité", "Réduire les délais",
+    "Renforcer l'équipe", "Garantir la conformité", "Développer l'activité",
+]
+DOTATION_CATEGORIES = ["Informatique", "Mobilier", "Véhicule", "Téléphonie", "Équipement de protection"]
+DOTATIONS = ["Ordinateur portable", "Écran", "Bureau", "Chaise", "Voiture de service", "Téléphone", "Casque", "Gants"]
+NATURES = ["CDI", "CDD", "Stage", "Intérim"]
+
+
+def _ascii(text):
+    return "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+
+
+def _date(rng, start_year=2022):
+    start = datetime(start_year, 1, 1)
+    return (start + timedelta(days=rng.randint(0, 3 * 365))).strftime("%Y-%m-%dT00:00:00")
+
+
+def generate_users(rng, count):
+    users = []
+    seen = set()
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        base = _ascii(f"{first[0]}{last}").lower()
+        username = base if base not in seen else f"{base}{i}"
+        seen.add(username)
+        users.append({
+            "UserName": username,
+            "FullName": f"{last.upper()} {first}",
+            "Email": f"{username}@entreprise.mg",
+            "Matricule": f"M{i:06d}",
+            "Poste": f"{rng.choice(POSTE_WORDS)} {rng.choice(POSTE_DOMAINS)}",
+        })
+    return users
+
+
+def generate_reference_tables(rng, postes=400):
+    return {
+        "Postes": [
+            {"IdPoste": i, "NomPoste": f"{rng.choice(POSTE_WORDS)} {rng.choice(POSTE_DOMAINS)} {i}"}
+            for i in range(1, postes + 1)
+        ],
+        "Directions": [{"IdDir": i, "NomDirection": n} for i, n in enumerate(DIRECTIONS, 1)],
+        "Exploitations": [{"IdExp": i, "NomExploitation": n} for i, n in enumerate(EXPLOITATIONS, 1)],
+        "MotifDemandes": [{"IdMotif": i, "Motif": n} for i, n in enumerate(MOTIFS, 1)],
+        "MotifDemandesManoeuvre": [{"IdMotifMOE": i, "Motif": n} for i, n in enumerate(MOTIFS, 1)],
+        "SituationBudgets": [{"IdSb": i, "SituationBudget": n} for i, n in enumerate(SITUATIONS, 1)],
+        "Statuts": [{"IdStatut": i, "Statut": n} for i, n in enumerate(STATUTS, 1)],
+        "StatutTraitements": [{"IdStatutTraitement": i, "StatutTraitement": n} for i, n in enumerate(["En cours", "Traité"], 1)],
+        "StatutMobilites": [{"IdStatutMobilite": i, "StatutMobilite": n} for i, n in enumerate(["Demandée", "Acceptée", "Refusée"], 1)],
+        "MpTypeMobilites": [{"IdTypeMobilite": i, "TypeMobilite": n} for i, n in enumerate(["Interne", "Géographique"], 1)],
+        "ObjectifDemandes": [{"IdObjectif": i, "Objectif": n} for i, n in enumerate(OBJECTIFS, 1)],
+        "ObjectifDemandesManoeuvre": [{"IdObjectifMOE": i, "Objectif": n} for i, n in enumerate(OBJECTIFS, 1)],
+        "DotationCategories": [{"IdCategorie": i, "Categorie": n} for i, n in enumerate(DOTATION_CATEGORIES, 1)],
+        "DotationListes": [
+            {"IdDotation": i, "NomDotation": n, "IdCategorie": rng.randint(1, len(DOTATION_CATEGORIES))}
+            for i, n in enumerate(DOTATIONS, 1)
+        ],
+        "NomFlux": [{"IdNomFlux": i, "NomFlux": n} for i, n in enumerate(TYPE_FLUX, 1)],
+    }
+
+
+def generate_flux(rng, count, users):
+    flux_list = []
+    for i in range(1, count + 1):
+        flux = {
+            "IdFlux": i,
+            "NomFluxMouvement": f"Flux {rng.choice(TYPE_FLUX)} {rng.choice(DIRECTIONS)} {i}",
+            "TypeFlux": rng.choice(TYPE_FLUX),
+        }
+        validators = rng.sample(users, rng.randint(1, 5)) if users else []
+        for position in range(1, 6):
+            user = validators[position - 1] if position <= len(validators) else None
+            flux[f"V{position}"] = user["UserName"] if user else None
+            flux[f"V{position}UserName"] = user["FullName"] if user else None
+        flux_list.append(flux)
+    return flux_list
+
+
+def generate_demandes(rng, count, users, tables):
+    demandes = []
+    postes = tables["Postes"]
+    for i in range(1, count + 1):
+        demandeur = rng.choice(users)
+        encadreur = rng.choice(users)
+        nature = rng.choice(NATURES)
+        demandes.append({
+            "IdDdr": i,
+            "NumeroDemande": f"DDR-{i:07d}",
+            "NatureContrat": nature,
+            "Duree": None if nature == "CDI" else rng.choice([3, 6, 12, 24]),
+            "Effectif": rng.randint(1, 5),
+            "Encadreur": encadreur["FullName"],
+            "PosteEncadreur": encadreur["Poste"],
+            "DateMiseEnService": _date(rng, 2024),
+            "DateCreation": _date(rng),
+            "Justification": rng.choice(OBJECTIFS),
+            "Demandeur": demandeur["UserName"],
+            "ResponsableRh": None,
+            "PosteId": rng.choice(postes)["IdPoste"],
+            "DirectionId": rng.randint(1, len(DIRECTIONS)),
+            "ExploitationId": rng.randint(1, len(EXPLOITATIONS)),
+            "SituationBudgetId": rng.randint(1, len(SITUATIONS)),
+            "MotifId": rng.randint(1, len(MOTIFS)),
+            "StatutId": rng.choices([1, 2, 3, 4, 5], weights=[1, 5, 3, 1, 1])[0],
+        })
+    return demandes
+
+
+def demande_details(demande, users, seed=42):
+    """Objectifs, dotations and flux taches of a demande (deterministic per IdDdr)"""
+    rng = random.Random(seed * 1_000_003 + demande["IdDdr"])
+    objectifs = rng.sample(OBJECTIFS, rng.randint(1, 3))
+    weights = [100 // len(objectifs)] * len(objectifs)
+    validators = rng.sample(users, rng.randint(1, 4)) if users else []
+    validated = len(validators) if demande["StatutId"] in (3, 5) else rng.randint(0, len(validators))
+
+    flux_taches = []
+    for position, user in enumerate(validators):
+        done = position < validated
+        flux_taches.append({
+            "IdTache": demande["IdDdr"] * 10 + position,
+            "IdDdr": demande["IdDdr"],
+            "Validateur": user["UserName"],
+            "NomValidateur": user["FullName"],
+            "Validation": (0 if demande["StatutId"] == 4 and position == validated - 1 else 1) if done else None,
+            "DateValidation": _date(rng, 2024) if done else None,
+            "Etat": position <= validated,
+        })
+
+    return {
+        "objectifs": [
+            {"IdObjectif": i + 1, "Objectif": objectif, "Poids": weight}
+            for i, (objectif, weight) in enumerate(zip(objectifs, weights))
+        ],
+        "dotations": [
+            {"IdDotation": DOTATIONS.index(nom) + 1, "NomDotation": nom}
+            for nom in rng.sample(DOTATIONS, rng.randint(0, 3))
+        ],
+        "complements": [],
+        "flux_taches": flux_taches,
+    }
+
+
+def generate_dataset(users=2000, flux=500, demandes=5000, postes=400, seed=42):
+    """Build the whole dataset (tables keyed by backend route name)"""
+    rng = random.Random(seed)
+    user_rows = generate_users(rng, users)
+    tables = generate_reference_tables(rng, postes)
+    return {
+        "meta": {"seed": seed, "users": users, "flux": flux, "demandes": demandes, "postes": postes},
+        "users": user_rows,
+        "tables": tables,
+        "flux": generate_flux(rng, flux, user_rows),
+        "demandes": generate_demandes(rng, demandes, user_rows, tables),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic backend dataset")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--flux", type=int, default=500)
+    parser.add_argument("--demandes", type=int, default=5000)
+    parser.add_argument("--postes", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    dataset = generate_dataset(args.users, args.flux, args.demandes, args.postes, args.seed)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(dataset, f, ensure_ascii=False)
+    print(f"Wrote {args.out} ({args.users} users, {args.flux} flux, {args.demandes} demandes) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
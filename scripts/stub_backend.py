@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""Local stand-in for the .NET backend API, serving a synthetic dataset.
+
+Implements the routes BackendService uses (reference tables, Login/getAllUsers,
+FluxMouvements/with-user-details, Demandes and their details, FluxTaches,
+validation and send-to-validateur, UploadFiles...) with ETag / If-None-Match
+support, so the search services and handlers can be load-tested at 10-100x
+today's volume without the .NET API. Writes (POST / PUT / DELETE) change the
+stored data; a write to an unknown route answers 404.
+
+Usage:
+    python scripts/stub_backend.py --users 50000 --flux 10000 --demandes 100000
+    python scripts/stub_backend.py --dataset results/backend_dataset.json --latency-ms 20
+Then point the action server at it:
+    API_URL=http://localhost:5000/api
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate_backend_dataset import demande_details, generate_dataset  # noqa: E402
+
+
+class StubBackend:
+    """In-memory data and route table of the stub API"""
+
+    def __init__(self, dataset):
+        self.seed = dataset["meta"]["seed"]
+        self.users = dataset["users"]
+        self.tables = dataset["tables"]
+        self.flux = dataset["flux"]
+        self.demandes = {d["IdDdr"]: d for d in dataset["demandes"]}
+        self.demandes_manoeuvre = {}
+        self.uploads = {}
+        # Details (flux taches...) modified by a write; generated from the id otherwise
+        self.details = {}
+        self.traitements = {}
+        self.tables.setdefault("LiaisonDotationPostes", self._liaisons_dotation_postes())
+        self.lock = threading.Lock()
+        self.version = 0
+        self._encoded = {}
+        self.calls = defaultdict(int)
+        self._index()
+        self.routes = self._build_routes()
+
+    def _index(self):
+        self.users_by_login = {u["UserName"].lower(): u for u in self.users}
+        self.users_by_fullname = defaultdict(list)
+        for u in self.users:
+            self.users_by_fullname[u["FullName"].lower()].append(u)
+        self.postes_by_id = {p["IdPoste"]: p for p in self.tables["Postes"]}
+        self.flux_by_id = {f["IdFlux"]: f for f in self.flux}
+        self.nom_flux_by_id = {n["IdNomFlux"]: n for n in self.tables["NomFlux"]}
+        self.demandes_by_user = defaultdict(list)
+        for d in self.demandes.values():
+            self.demandes_by_user[d["Demandeur"].lower()].append(d)
+
+    def _liaisons_dotation_postes(self):
+        """Dotations of each poste (derived from the seed when the dataset has none)"""
+        dotations = self.tables.get("DotationListes", [])
+        liaisons = []
+        for poste in self.tables["Postes"]:
+            for offset in range(poste["IdPoste"] % 3 if dotations else 0):
+                dotation = dotations[(poste["IdPoste"] * 7 + offset + self.seed) % len(dotations)]
+                liaisons.append({"IdLiaison": len(liaisons) + 1, "IdPoste": poste["IdPoste"],
+                                 "IdDotation": dotation["IdDotation"]})
+        return liaisons
+
+    def _details(self, demande_id):
+        if demande_id in self.details:
+            return self.details[demande_id]
+        demande = self.demandes.get(demande_id)
+        return demande_details(demande, self.users, self.seed) if demande else None
+
+    def _own_details(self, demande_id):
+        """Details of a demande, copied once so that writes persist"""
+        if demande_id not in self.details:
+            details = self._details(demande_id)
+            if details is None:
+                return None
+            self.details[demande_id] = copy.deepcopy(details)
+        return self.details[demande_id]
+
+    def _liaisons_ddr_dotation(self, demande_id):
+        dotations = self._detail(demande_id, "dotations")
+        if dotations is None:
+            return None
+        return [
+            {"IdLiaison": demande_id * 10 + i, "IdDdr": demande_id, "IdDotation": d["IdDotation"], "Quantite": 1}
+            for i, d in enumerate(dotations)
+        ]
+
+    def _tache(self, demande_id, validateur):
+        """Task of a validateur on a demande (the pending one first)"""
+        taches = [
+            t for t in (self._detail(demande_id, "flux_taches") or [])
+            if t["Validateur"].lower() == validateur.lower()
+        ]
+        pending = [t for t in taches if t["Validation"] is None]
+        return (pending or taches or [None])[0]
+
+    def _traitement(self, demande_id):
+        demande = self.demandes.get(demande_id)
+        if demande is None:
+            return None
+        return self.traitements.get(demande_id) or {
+            "IdDdr": demande_id, "StatutId": demande["StatutId"], "ResponsableRh": demande.get("ResponsableRh"),
+        }
+
+    def _tasks_for_validateur(self, validateur):
+        # Coûteux sur 100k demandes : reflète le coût réel d'un endpoint non indexé
+        validateur = validateur.lower()
+        tasks = []
+        for demande in self.demandes.values():
+            if demande["StatutId"] != 2:
+                continue
+            for task in self._details(demande["IdDdr"])["flux_taches"]:
+                if task["Validateur"].lower() == validateur and task["Validation"] is None:
+                    tasks.append(task)
+        return tasks
+
+    def _build_routes(self):
+        get = [
+            (r"Login/getAllUsers", lambda m, q: self.users),
+            (r"Login/getUserByLogin", lambda m, q: self.users_by_login.get(q.get("username", "").lower())),
+            (r"Login/getUserByFullName/(.+)", lambda m, q: self.users_by_fullname.get(m[0].lower(), [])),
+            (r"Login/getDetailsLogin", lambda m, q: self.users[0] if self.users else None),
+            (r"Login/([^/]+)", lambda m, q: self.users_by_login.get(m[0].lower())),
+            (r"User", lambda m, q: self.users),
+            (r"Postes/(\d+)", lambda m, q: self.postes_by_id.get(int(m[0]))),
+            (r"NomFlux/(\d+)", lambda m, q: self.nom_flux_by_id.get(int(m[0]))),
+            (r"FluxMouvements", lambda m, q: self.flux),
+            (r"FluxMouvements/with-user-details", lambda m, q: self.flux),
+            (r"FluxMouvements/(\d+)", lambda m, q: self.flux_by_id.get(int(m[0]))),
+            (r"FluxMouvements/validateur/([^/]+)", lambda m, q: [
+                f for f in self.flux
+                if any((f.get(f"V{i}") or "").lower() == m[0].lower() for i in range(1, 6))
+            ]),
+            (r"Demandes/Demandes/([^/]+)", lambda m, q: self.demandes_by_user.get(m[0].lower(), [])),
+            (r"Demandes/Statut/([^/]+)/(\d+)", lambda m, q: [
+                d for d in self.demandes_by_user.get(m[0].lower(), []) if d["StatutId"] == int(m[1])
+            ]),
+            (r"Demandes/traitement/(\d+)", lambda m, q: self._traitement(int(m[0]))),
+            (r"Demandes/validateur/([^/]+)", lambda m, q: [
+                self.demandes[t["IdDdr"]] for t in self._tasks_for_validateur(m[0])
+            ]),
+            (r"Demandes/(\d+)", lambda m, q: self._demande(int(m[0]))),
+            (r"Demandes/(\d+)/Objectifs", lambda m, q: self._detail(int(m[0]), "objectifs")),
+            (r"Demandes/(\d+)/Dotations", lambda m, q: self._detail(int(m[0]), "dotations")),
+            (r"ComplementDdrs/demande/(\d+)", lambda m, q: self._detail(int(m[0]), "complements")),
+            (r"LiaisonDdrdotations/demande/(\d+)", lambda m, q: self._liaisons_ddr_dotation(int(m[0]))),
+            (r"FluxTaches/demande/(\d+)/validation", lambda m, q: self._detail(int(m[0]), "flux_taches")),
+            (r"FluxTaches/demande/(\d+)/validateur/([^/]+)", lambda m, q: self._tache(int(m[0]), m[1])),
+            (r"LiaisonDotationPostes/(\d+)", lambda m, q: self._row("LiaisonDotationPostes", int(m[0]))),
+            (r"LiaisonDotationPostes/(\d+)/Dotations", lambda m, q: [
+                d for d in self.tables["DotationListes"]
+                if any(l["IdPoste"] == int(m[0]) and l["IdDotation"] == d["IdDotation"]
+                       for l in self.tables["LiaisonDotationPostes"])
+            ]),
+            (r"FluxTaches/validateur/([^/]+)", lambda m, q: self._tasks_for_validateur(m[0])),
+            (r"Demandes/DownloadFile/(.+)", lambda m, q: self.uploads.get(m[0])),
+            (r"DemandesManoeuvre", lambda m, q: list(self.demandes_manoeuvre.values())),
+            (r"DemandesManoeuvre/(\d+)", lambda m, q: self.demandes_manoeuvre.get(int(m[0]))),
+            (r"DemandesManoeuvre/DemandesManoeuvre/([^/]+)", lambda m, q: [
+                d for d in self.demandes_manoeuvre.values() if d.get("Demandeur", "").lower() == m[0].lower()
+            ]),
+            (r"DemandesManoeuvre/(\d+)/Objectifs", lambda m, q: []),
+            (r"ComplementDdrsMOE/demande/(\d+)", lambda m, q: []),
+            (r"FluxTachesManoeuvre/demande/(\d+)/validation", lambda m, q: []),
+            (r"FluxTachesManoeuvre/validateur/([^/]+)", lambda m, q: []),
+        ]
+        get += [(re.escape(name), (lambda m, q, name=name: self.tables[name])) for name in self.tables]
+        return {"GET": [(re.compile(pattern + r"/?$"), handler) for pattern, handler in get]}
+
+    def _demande(self, demande_id):
+        demande = self.demandes.get(demande_id)
+        if demande is None:
+            return None
+        return {**demande, "MpFluxTaches": self._details(demande_id)["flux_taches"]}
+
+    def _detail(self, demande_id, section):
+        details = self._details(demande_id)
+        return details[section] if details else None
+
+    @staticmethod
+    def _id_field(rows, body=None):
+        """Identifier field of a table (first "Id..." key of its rows)"""
+        for row in list(rows[:1]) + [body or {}]:
+            for key in row:
+                if key.startswith("Id"):
+                    return key
+        return None
+
+    def _row(self, table, row_id):
+        rows = self.tables.get(table, [])
+        id_field = self._id_field(rows)
+        return next((r for r in rows if r.get(id_field) == row_id), None)
+
+    def _index_demande(self, demande, remove=False):
+        demandeur = (demande.get("Demandeur") or "").lower()
+        mine = [d for d in self.demandes_by_user.get(demandeur, []) if d["IdDdr"] != demande["IdDdr"]]
+        if not remove and demandeur:
+            mine.append(demande)
+        self.demandes_by_user[demandeur] = mine
+
+    # ==================== ÉCRITURES ====================
+    def write(self, method, path, body, files):
+        """Apply a POST / PUT / DELETE to the stored data (None: unknown route or id)"""
+        with self.lock:
+            result = self._write(method, path, body or {}, files)
+            if result is not None:
+                self.version += 1
+            return result
+
+    def _write(self, method, path, body, files):
+        parts = path.split("/")
+        if method == "POST" and path == "Demandes/UploadFiles":
+            for name, content in files:
+                self.uploads[name] = content
+            return [name for name, _ in files]
+        if method == "POST" and path in ("Demandes", "DemandesManoeuvre"):
+            store = self.demandes if path == "Demandes" else self.demandes_manoeuvre
+            new_id = max(store, default=0) + 1
+            demande = {"StatutId": 1, **body, "IdDdr": new_id, "NumeroDemande": f"DDR-{new_id:07d}"}
+            store[new_id] = demande
+            if path == "Demandes":
+                self._index_demande(demande)
+            return demande
+
+        match = re.fullmatch(r"(Demandes|DemandesManoeuvre)/(\d+)", path)
+        if match and method in ("PUT", "DELETE"):
+            store = self.demandes if match[1] == "Demandes" else self.demandes_manoeuvre
+            demande_id = int(match[2])
+            demande = store.get(demande_id)
+            if demande is None:
+                return None
+            if method == "DELETE":
+                del store[demande_id]
+                self.details.pop(demande_id, None)
+                if store is self.demandes:
+                    self._index_demande(demande, remove=True)
+                return True
+            if store is self.demandes:
+                self._index_demande(demande, remove=True)
+            demande.update({k: v for k, v in body.items() if k != "IdDdr"})
+            if store is self.demandes:
+                self._index_demande(demande)
+            return demande
+
+        match = re.fullmatch(r"Demandes/statut/(\d+)", path)
+        if match and method == "PUT":
+            demande = self.demandes.get(int(match[1]))
+            if demande is None:
+                return None
+            demande["StatutId"] = body.get("StatutId", demande["StatutId"])
+            self.traitements[demande["IdDdr"]] = {**self._traitement(demande["IdDdr"]), **body}
+            return self.traitements[demande["IdDdr"]]
+
+        match = re.fullmatch(r"Demandes/(\d+)/validate|FluxTaches/(\d+)", path)
+        if match and method == "PUT":
+            # Path id = IdTache (IdDdr * 10 + position, see demande_details)
+            tache_id = int(match[1] or match[2])
+            demande = self.demandes.get(body.get("IdDdr") or tache_id // 10)
+            taches = self._own_details(demande["IdDdr"])["flux_taches"] if demande else []
+            tache = next((t for t in taches if t["IdTache"] == tache_id), None)
+            if tache is None:
+                return None
+            tache.update({k: v for k, v in body.items() if k not in ("IdTache", "IdDdr")})
+            if match[1]:
+                if tache.get("Validation") in (False, 0):
+                    demande["StatutId"] = 4
+                elif all(t.get("Validation") for t in taches):
+                    demande["StatutId"] = 3
+            return tache
+
+        match = re.fullmatch(r"Demandes/(\d+)/send-to-validateur/(\d+)/([^/]+)", path)
+        if match and method == "POST":
+            demande_id = int(match[1])
+            demande = self.demandes.get(demande_id)
+            nom_flux = self.nom_flux_by_id.get(int(match[2]))
+            if demande is None or nom_flux is None:
+                return None
+            flux = next((f for f in self.flux if f["TypeFlux"] == nom_flux["NomFlux"]), None) or {}
+            validators = [(flux[f"V{i}"], flux[f"V{i}UserName"]) for i in range(1, 6) if flux.get(f"V{i}")]
+            self._own_details(demande_id)["flux_taches"] = [
+                {"IdTache": demande_id * 10 + position, "IdDdr": demande_id, "Validateur": login,
+                 "NomValidateur": name, "Validation": None, "DateValidation": None, "Etat": position == 0}
+                for position, (login, name) in enumerate(validators)
+            ]
+            demande.update({"StatutId": 2, "ResponsableRh": match[3]})
+            return demande
+
+        # Reference tables: POST <table>, PUT / DELETE <table>/<id>
+        table = parts[0]
+        if table in self.tables and len(parts) <= 2:
+            rows = self.tables[table]
+            id_field = self._id_field(rows, body)
+            if id_field is None:
+                return None
+            if len(parts) == 1 and method == "POST":
+                row = {**body, id_field: max((r[id_field] for r in rows), default=0) + 1}
+                rows.append(row)
+                self._index()
+                return row
+            if len(parts) == 2 and parts[1].isdigit() and method in ("PUT", "DELETE"):
+                row = self._row(table, int(parts[1]))
+                if row is None:
+                    return None
+                if method == "DELETE":
+                    rows.remove(row)
+                else:
+                    row.update({k: v for k, v in body.items() if k != id_field})
+                self._index()
+                return True if method == "DELETE" else row
+        return None
+
+    def encoded(self, path, value):
+        """JSON body and ETag, cached per path until the next write"""
+        key = (path, self.version)
+        cached = self._encoded.get(key)
+        if cached is None:
+            body = json.dumps(value, ensure_ascii=False).encode("utf-8")
+            cached = (body, '"%s"' % hashlib.sha1(body).hexdigest()[:16])
+            if len(self._encoded) > 2048:
+                self._encoded.clear()
+            self._encoded[key] = cached
+        return cached
+
+
+def _multipart_files(content_type, body):
+    match = re.search(r"boundary=([^;]+)", content_type or "")
+    if not match:
+        return []
+    files = []
+    for part in body.split(b"--" + match.group(1).encode()):
+        header, _, content = part.partition(b"\r\n\r\n")
+        name = re.search(rb'filename="([^"]*)"', header)
+        if name:
+            files.append((name.group(1).decode("utf-8", "replace"), content.rstrip(b"\r\n")))
+    return files
+
+
+def make_handler(backend, prefix, latency_ms, api_key):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status, body=b"", headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _route(self):
+            parts = urlsplit(self.path)
+            path = unquote(parts.path)
+            if prefix and path.startswith(prefix):
+                path = path[len(prefix):]
+            return path.strip("/"), {k: v[0] for k, v in parse_qs(parts.query).items()}
+
+        def _authorized(self):
+            if api_key and self.headers.get("X-Api-Key") != api_key:
+                self._reply(401, b'{"message": "Invalid API key"}', {"Content-Type": "application/json"})
+                return False
+            return True
+
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            if not self._authorized():
+                return
+            path, query = self._route()
+            backend.calls[f"GET {path}"] += 1
+            for pattern, handler in backend.routes["GET"]:
+                match = pattern.match(path)
+                if match:
+                    value = handler(match.groups(), query)
+                    break
+            else:
+                value = None
+            if value is None:
+                return self._reply(404, b'{"message": "Not found"}', {"Content-Type": "application/json"})
+            if isinstance(value, bytes):
+                return self._reply(200, value, {"Content-Type": "application/octet-stream"})
+
+            body, etag = backend.encoded(self.path, value)
+            if self.headers.get("If-None-Match") == etag:
+                return self._reply(304, b"", {"ETag": etag})
+            self._reply(200, body, {"Content-Type": "application/json; charset=utf-8", "ETag": etag})
+
+        def _write(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            if not self._authorized():
+                return
+            path, _ = self._route()
+            backend.calls[f"{self.command} {path}"] += 1
+            content_type = self.headers.get("Content-Type", "")
+            body = json.loads(raw) if raw and "json" in content_type else None
+            files = _multipart_files(content_type, raw) if "multipart" in content_type else []
+            result = backend.write(self.command, path, body, files)
+            if result is None:
+                return self._reply(404, b'{"message": "Not found"}', {"Content-Type": "application/json"})
+            self._reply(200, json.dumps(result, ensure_ascii=False).encode("utf-8"),
+                        {"Content-Type": "application/json; charset=utf-8"})
+
+        do_POST = do_PUT = do_DELETE = _write
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic dataset as a stand-in for the .NET API")
+    parser.add_argument("--dataset", help="JSON file from generate_backend_dataset.py (generated in memory otherwise)")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--flux", type=int, default=500)
+    parser.add_argument("--demandes", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--prefix", default="/api", help="URL prefix in front of the routes")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated latency per request")
+    parser.add_argument("--api-key", default=os.getenv("RASA_API_KEY", ""), help="Required X-Api-Key (none if empty)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.dataset:
+        with open(args.dataset, "r", encoding="utf-8") as f:
+            dataset = json.load(f)
+    else:
+        dataset = generate_dataset(args.users, args.flux, args.demandes, seed=args.seed)
+    backend = StubBackend(dataset)
+    meta = dataset["meta"]
+    print(f"Dataset ready in {time.perf_counter() - start:.1f}s: "
+          f"{meta['users']} users, {meta['flux']} flux, {meta['demandes']} demandes")
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(backend, args.prefix, args.latency_ms, args.api_key))
+    print(f"Stub backend listening on http://{args.host}:{args.port}{args.prefix}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        top = sorted(backend.calls.items(), key=lambda item: -item[1])[:20]
+        print("Calls per route:")
+        for route, count in top:
+            print(f"  {count:6d}  {route}")
+
+
+if __name__ == "__main__":
+    main()
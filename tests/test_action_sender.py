@@ -0,0 +1,144 @@
+"""
+Clé d'équité du limiteur de concurrence : toute action qui appelle le backend
+est tracée, ses appels portent la conversation du tracker (current_sender),
+y compris la soumission DDR et les validateurs exécutés seuls ou par
+ActionValidateSlots.
+"""
+import asyncio
+import importlib
+import inspect
+import json
+import pkgutil
+import re
+import threading
+
+import pytest
+import requests
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from rasa_sdk import Action  # noqa: E402
+
+from actions import handlers, validation  # noqa: E402
+from actions.Middleware.backend_tracer import current_sender, record_stale_data  # noqa: E402
+from actions.handlers.ddr_handler import ActionSubmitFormAddDdr  # noqa: E402
+from actions.services import async_ddr_service, ddr_service  # noqa: E402
+from actions.services.ddr_service import BackendService  # noqa: E402
+from actions.validation.motif import ActionVerificationMotif  # noqa: E402
+from actions.validation.principat_validator import ActionValidateSlots  # noqa: E402
+
+BASE_URL = 'http://backend.test'
+# Une classe d'action qui contient l'un de ces motifs appelle le backend
+BACKEND_USE = re.compile(r'get_backend_service\(|self\.backend\b|SearchService\(')
+
+
+class _Backend:
+    """Répond [] à tout ; note la conversation vue par chaque requête"""
+
+    def __init__(self):
+        self.senders = []
+        self.lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self.lock:
+            self.senders.append(current_sender())
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        response._content = json.dumps([]).encode()
+        return response
+
+
+class _Dispatcher:
+    def __init__(self):
+        self.messages = []
+
+    def utter_message(self, text=None, **kwargs):
+        self.messages.append(text)
+
+
+class _Tracker:
+    def __init__(self, sender_id):
+        self.sender_id = sender_id
+        self.latest_message = {
+            'entities': [{'entity': 'motif', 'value': 'Remplacement', 'confidence_entity': 0.99}],
+            'text': '',
+        }
+
+    def get_slot(self, name):
+        return None
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setenv('BACKEND_MAX_RETRIES', '0')
+    service = BackendService(base_url=BASE_URL, api_key='test')
+    service.shared_store = None
+    fake = _Backend()
+    monkeypatch.setattr(service.session, 'request', fake.request)
+    monkeypatch.setattr(ddr_service, '_backend_service', service)
+    yield service, fake
+    service._executor.shutdown(wait=False)
+    if async_ddr_service._async_backend_service is not None:
+        async_ddr_service._async_backend_service.shutdown()
+
+
+def _action_classes():
+    for package in (handlers, validation):
+        for module_info in pkgutil.iter_modules(package.__path__, f"{package.__name__}."):
+            module = importlib.import_module(module_info.name)
+            for _, cls in inspect.getmembers(module, inspect.isclass):
+                if issubclass(cls, Action) and cls.__module__ == module.__name__:
+                    yield cls
+
+
+def test_every_backend_action_is_traced():
+    untraced = [
+        f"{cls.__module__}.{cls.__name__}"
+        for cls in _action_classes()
+        if BACKEND_USE.search(inspect.getsource(cls))
+        and not getattr(cls.run, 'traces_backend_calls', False)
+    ]
+    assert untraced == []
+
+
+def test_validator_run_alone_uses_the_conversation_sender(backend):
+    _, fake = backend
+
+    ActionVerificationMotif().run(_Dispatcher(), _Tracker('conv-a'), {})
+
+    assert fake.senders and set(fake.senders) == {'conv-a'}
+
+
+def test_ddr_submit_uses_the_conversation_sender(backend, monkeypatch):
+    service, fake = backend
+
+    def submit(self, dispatcher, tracker, domain):
+        service.get_motif_demandes()
+        return []
+
+    monkeypatch.setattr(ActionSubmitFormAddDdr, '_submit', submit)
+    asyncio.run(ActionSubmitFormAddDdr().run(_Dispatcher(), _Tracker('conv-b'), {}))
+
+    assert fake.senders == ['conv-b']
+
+
+def test_validator_inside_validate_slots_reports_once(backend, monkeypatch):
+    service, fake = backend
+    get_motifs = service.get_motif_demandes
+
+    def stale_motifs():
+        # Données servies depuis le cache en mode dégradé
+        record_stale_data('MotifDemandes', 120)
+        return get_motifs()
+
+    monkeypatch.setattr(service, 'get_motif_demandes', stale_motifs)
+    monkeypatch.setattr(ActionValidateSlots, '_validators_cache', {'motif': ActionVerificationMotif()})
+    dispatcher = _Dispatcher()
+
+    asyncio.run(ActionValidateSlots().run(dispatcher, _Tracker('conv-c'), {}))
+
+    assert fake.senders and set(fake.senders) == {'conv-c'}
+    # Le validateur compte dans la trace d'ActionValidateSlots : un seul avertissement
+    assert sum('cache' in (message or '') for message in dispatcher.messages) == 1
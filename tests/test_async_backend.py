@@ -0,0 +1,117 @@
+"""
+Accès asynchrone au backend : les appels bloquants passent par le pool de
+l'AsyncBackendService, deux actions concurrentes ne se bloquent pas et la
+boucle d'événements reste disponible pendant les appels.
+"""
+import asyncio
+import json
+import time
+
+import pytest
+import requests
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.Middleware.backend_tracer import backend_call_trace  # noqa: E402
+from actions.services import async_ddr_service, ddr_service  # noqa: E402
+from actions.services.ddr_service import BackendService  # noqa: E402
+from actions.validation.principat_validator import ActionValidateSlots  # noqa: E402
+
+BASE_URL = 'http://backend.test'
+DELAY = 0.3
+
+
+def _slow_request(method, url, **kwargs):
+    time.sleep(DELAY)
+    response = requests.Response()
+    response.url = url
+    response.status_code = 200
+    poste_id = int(url.rsplit('/', 1)[-1])
+    response._content = json.dumps({'IdPoste': poste_id, 'NomPoste': f"Poste {poste_id}"}).encode()
+    return response
+
+
+class _PosteValidator:
+    """Validateur synchrone qui interroge le backend (appel bloquant)"""
+
+    def run(self, dispatcher, tracker, domain):
+        poste = ddr_service.get_backend_service().get_poste_by_id(tracker.poste_id)
+        return [{'event': 'slot', 'name': 'nom_poste', 'value': poste['NomPoste']}]
+
+
+class _Tracker:
+    sender_id = 'jdoe'
+
+    def __init__(self, poste_id):
+        self.poste_id = poste_id
+        self.latest_message = {'entities': [{'entity': 'nom_poste', 'value': 'x'}], 'text': ''}
+
+    def get_slot(self, name):
+        return None
+
+
+class _Dispatcher:
+    def utter_message(self, text=None, **kwargs):
+        pass
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setenv('BACKEND_MAX_RETRIES', '0')
+    service = BackendService(base_url=BASE_URL, api_key='test')
+    monkeypatch.setattr(service.session, 'request', _slow_request)
+    monkeypatch.setattr(ddr_service, '_backend_service', service)
+    yield service
+    service._executor.shutdown(wait=False)
+    if async_ddr_service._async_backend_service is not None:
+        async_ddr_service._async_backend_service.shutdown()
+
+
+async def _measure(coroutines):
+    """Durée des coroutines concurrentes et nombre de tours de boucle pendant ce temps"""
+    ticks = 0
+    done = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal ticks
+        while not done.is_set():
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    beat = asyncio.ensure_future(heartbeat())
+    start = time.perf_counter()
+    results = await asyncio.gather(*coroutines)
+    elapsed = time.perf_counter() - start
+    done.set()
+    await beat
+    return results, elapsed, ticks
+
+
+def test_concurrent_actions_do_not_block_each_other(backend, monkeypatch):
+    monkeypatch.setattr(ActionValidateSlots, '_validators_cache', {'nom_poste': _PosteValidator()})
+    action = ActionValidateSlots()
+
+    results, elapsed, ticks = asyncio.run(_measure([
+        action.run(_Dispatcher(), _Tracker(1), {}),
+        action.run(_Dispatcher(), _Tracker(2), {}),
+    ]))
+
+    assert [events[0]['value'] for events in results] == ['Poste 1', 'Poste 2']
+    assert elapsed < 2 * DELAY
+    # La boucle a continué de tourner pendant les appels au backend
+    assert ticks >= 5
+
+
+def test_async_methods_reuse_the_sync_service_and_its_trace(backend):
+    async def call():
+        async_backend = await async_ddr_service.get_backend_service()
+        assert async_backend.service is backend
+        with backend_call_trace('async_test') as trace:
+            poste = await async_backend.get_poste_by_id(3)
+        return poste, trace
+
+    poste, trace = asyncio.run(call())
+
+    assert poste['NomPoste'] == 'Poste 3'
+    assert trace.calls[('GET', 'Postes/{poste_id}')] == 1
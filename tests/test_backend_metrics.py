@@ -0,0 +1,76 @@
+"""
+Serveur de métriques : un port par worker (le suivant si le port est pris),
+/health servi à côté de /metrics, écoute locale sauf BACKEND_METRICS_HOST.
+"""
+import json
+import urllib.request
+
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services import backend_metrics  # noqa: E402
+from actions.services.backend_metrics import serve_backend_metrics, start_metrics_server  # noqa: E402
+
+
+def _get(server, path):
+    host, port = server.server_address
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+        return response.read().decode('utf-8')
+
+
+def test_second_worker_binds_next_port_and_serves_health():
+    first = start_metrics_server(lambda: 'worker 1\n', lambda: {'worker': 1}, 0, '127.0.0.1')
+    port = first.server_address[1]
+    second = start_metrics_server(lambda: 'worker 2\n', lambda: {'worker': 2}, port, '127.0.0.1', port_range=8)
+    try:
+        assert second is not None
+        assert second.server_address[1] != port
+        assert _get(first, '/metrics') == 'worker 1\n'
+        assert _get(second, '/metrics') == 'worker 2\n'
+        assert json.loads(_get(second, '/health')) == {'worker': 2}
+    finally:
+        for server in (first, second):
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+
+def test_no_free_port_returns_none():
+    first = start_metrics_server(lambda: '', None, 0, '127.0.0.1')
+    try:
+        assert start_metrics_server(lambda: '', None, first.server_address[1], '127.0.0.1') is None
+    finally:
+        first.shutdown()
+        first.server_close()
+
+
+def _close(server):
+    server.shutdown()
+    server.server_close()
+
+
+def test_binds_loopback_by_default():
+    server = start_metrics_server(lambda: '', None, 0)
+    try:
+        assert server.server_address[0] == '127.0.0.1'
+    finally:
+        _close(server)
+
+
+@pytest.mark.parametrize('env_host, bound_host', [(None, '127.0.0.1'), ('0.0.0.0', '0.0.0.0')])
+def test_worker_server_host_comes_from_env(monkeypatch, env_host, bound_host):
+    monkeypatch.setattr(backend_metrics, '_metrics_server', None)
+    monkeypatch.setenv('BACKEND_METRICS_PORT', '5056')
+    if env_host is None:
+        monkeypatch.delenv('BACKEND_METRICS_HOST', raising=False)
+    else:
+        monkeypatch.setenv('BACKEND_METRICS_HOST', env_host)
+    started = []
+    monkeypatch.setattr(backend_metrics, 'start_metrics_server',
+                        lambda *args, **kwargs: started.append(kwargs['host']))
+
+    serve_backend_metrics(lambda: '')
+
+    assert started == [bound_host]
@@ -0,0 +1,72 @@
+"""
+Disjoncteur du BackendService : la place de test (half_open) doit toujours
+être rendue, que la requête échoue, lève une exception ou ne parte pas.
+"""
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.ddr_service import BackendService  # noqa: E402
+from actions.services.resilience import CircuitBreaker  # noqa: E402
+
+
+class _Response:
+    status_code = 200
+    headers = {}
+    content = b'{}'
+    from_cache = False
+
+    def json(self):
+        return {}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setenv('BACKEND_SNAPSHOT_ENABLED', 'false')
+    monkeypatch.setenv('BACKEND_MAX_RETRIES', '0')
+    service = BackendService(base_url='http://backend.test', api_key='test')
+    yield service
+    service._executor.shutdown(wait=False)
+
+
+def _half_open(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.recovery_timeout = 0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_limiter_timeout_releases_half_open_probe(backend, monkeypatch):
+    _half_open(backend.circuit_breaker)
+    monkeypatch.setattr(backend.limiter, 'acquire', lambda *args, **kwargs: False)
+
+    assert backend._send('GET', 'Postes') is None
+
+    monkeypatch.setattr(backend.limiter, 'acquire', lambda *args, **kwargs: True)
+    monkeypatch.setattr(backend.session, 'request', lambda *args, **kwargs: _Response())
+    assert backend._send('GET', 'Postes') is not None
+    assert backend.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unexpected_exception_during_half_open_is_a_failure_and_breaker_recovers(backend, monkeypatch):
+    import requests
+
+    breaker = backend.circuit_breaker
+    _half_open(breaker)
+
+    def broken_body(*args, **kwargs):
+        raise requests.exceptions.ChunkedEncodingError("connexion coupée au milieu du corps")
+
+    monkeypatch.setattr(backend.session, 'request', broken_body)
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        backend._send('GET', 'Postes')
+
+    # Le test a échoué : circuit rouvert (et non bloqué en half_open avec la place prise)
+    assert breaker.snapshot()['failures'] == breaker.failure_threshold + 1
+    assert breaker.snapshot()['opened'] == 2
+
+    # Après recovery_timeout, une nouvelle requête de test passe et referme le circuit
+    monkeypatch.setattr(backend.session, 'request', lambda *args, **kwargs: _Response())
+    assert backend._send('GET', 'Postes') is not None
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,49 @@
+"""
+Les actions doivent partager le BackendService de get_backend_service() :
+une instance jetable a ses propres caches, que les invalidations après
+écriture ne touchent pas (le singleton continue de servir l'ancienne donnée).
+"""
+import ast
+from pathlib import Path
+
+ACTIONS_DIR = Path(__file__).resolve().parent.parent / "actions"
+
+# Outil de diagnostic en ligne de commande (URL et clé explicites, hors Rasa)
+ALLOWED_FILES = {"actions/services/test_backend_connection.py"}
+
+
+def _backend_constructions(path: Path):
+    """(ligne, fonction englobante) de chaque appel BackendService(...) du fichier"""
+    tree = ast.parse(path.read_text(encoding="utf-8-sig"), filename=str(path))
+    found = []
+
+    def visit(node, function=None):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            function = node.name
+        if isinstance(node, ast.Call):
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+            if name == "BackendService":
+                found.append((node.lineno, function))
+        for child in ast.iter_child_nodes(node):
+            visit(child, function)
+
+    visit(tree)
+    return found
+
+
+def test_backend_service_only_built_by_singleton_accessor():
+    offenders = []
+    for path in sorted(ACTIONS_DIR.rglob("*.py")):
+        relative = path.relative_to(ACTIONS_DIR.parent).as_posix()
+        if relative in ALLOWED_FILES:
+            continue
+        for lineno, function in _backend_constructions(path):
+            if relative == "actions/services/ddr_service.py" and function == "get_backend_service":
+                continue
+            offenders.append(f"{relative}:{lineno}")
+
+    assert not offenders, (
+        "BackendService() construit hors de get_backend_service() "
+        f"(utiliser le singleton): {offenders}"
+    )
@@ -0,0 +1,185 @@
+"""
+Invalidation après écriture : chaque écriture de CACHE_INVALIDATIONS fait
+repartir vers le backend le GET suivant des routes qui en dépendent (cache de
+référence et cache HTTP), sans toucher aux autres, et prévient les services
+de recherche abonnés (FluxSearchService.refresh_cache).
+"""
+import json
+import string
+import threading
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.Calculate import Flux_calcul  # noqa: E402
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+PATH_PARAMS = {
+    'demande_id': 42, 'flux_id': 5, 'dotation_id': 3, 'liaison_id': 9,
+    'nom_flux_id': 2, 'responsable_rh': 'rh', 'embauche_id': 8,
+}
+
+# Écriture -> GET (routes réelles du service) qui doivent repartir vers le backend
+DEPENDENT_GETS = {
+    ('POST', 'Postes'): ['Postes', 'Postes/7'],
+    ('POST', 'FluxMouvements'): [
+        'FluxMouvements/with-user-details', 'FluxMouvements/5', 'FluxMouvements/direction/1',
+        'FluxMouvements/validateur/jdoe',
+    ],
+    ('PUT', 'FluxMouvements/{flux_id}'): ['FluxMouvements/with-user-details', 'FluxMouvements/5'],
+    ('DELETE', 'FluxMouvements/{flux_id}'): ['FluxMouvements/with-user-details', 'FluxMouvements/5'],
+    ('POST', 'DotationListes'): ['DotationListes', 'DotationListes/3'],
+    ('PUT', 'DotationListes/{dotation_id}'): ['DotationListes', 'DotationListes/3'],
+    ('DELETE', 'DotationListes/{dotation_id}'): ['DotationListes', 'DotationListes/3'],
+    ('POST', 'LiaisonDotationPostes'): [
+        'LiaisonDotationPostes', 'LiaisonDotationPostes/9', 'LiaisonDotationPostes/1/Dotations',
+    ],
+    ('PUT', 'LiaisonDotationPostes/{liaison_id}'): ['LiaisonDotationPostes', 'LiaisonDotationPostes/9'],
+    ('DELETE', 'LiaisonDotationPostes/{liaison_id}'): ['LiaisonDotationPostes', 'LiaisonDotationPostes/9'],
+    ('POST', 'Demandes'): [
+        'Demandes/42', 'Demandes/Demandes/jdoe', 'Demandes/Statut/jdoe/1', 'Demandes/validateur/jdoe',
+    ],
+    ('PUT', 'Demandes/{demande_id}'): ['Demandes/42', 'Demandes/42/Objectifs', 'Demandes/42/Dotations'],
+    ('PUT', 'Demandes/statut/{demande_id}'): ['Demandes/42', 'Demandes/validateur/jdoe'],
+    ('PUT', 'Demandes/{demande_id}/validate'): [
+        'Demandes/42', 'Demandes/validateur/jdoe', 'FluxTaches/demande/42/validation', 'FluxTaches/validateur/jdoe',
+    ],
+    ('POST', 'Demandes/{demande_id}/send-to-validateur/{nom_flux_id}/{responsable_rh}'): [
+        'Demandes/42', 'Demandes/validateur/jdoe', 'FluxTaches/demande/42/validateur/jdoe',
+    ],
+    ('DELETE', 'Demandes/{demande_id}'): ['Demandes/42', 'Demandes/42/Objectifs', 'Demandes/42/Dotations'],
+    ('POST', 'DemandesManoeuvre'): [
+        'DemandesManoeuvre', 'DemandesManoeuvre/42', 'DemandesManoeuvre/DemandesManoeuvre/jdoe',
+    ],
+    ('PUT', 'DemandesManoeuvre/{demande_id}'): ['DemandesManoeuvre', 'DemandesManoeuvre/42'],
+    ('PUT', 'DemandesManoeuvre/statut/{demande_id}'): ['DemandesManoeuvre', 'DemandesManoeuvre/42'],
+    ('PUT', 'DemandesManoeuvre/{demande_id}/validate'): [
+        'DemandesManoeuvre', 'DemandesManoeuvre/42', 'FluxTachesManoeuvre/demande/42/validation',
+        'FluxTachesManoeuvre/validateur/jdoe',
+    ],
+    ('POST', 'DemandesManoeuvre/{demande_id}/send-to-validateur/{nom_flux_id}/{responsable_rh}'): [
+        'DemandesManoeuvre/42', 'FluxTachesManoeuvre/demande/42/validation',
+    ],
+    ('PUT', 'FluxTaches/{flux_id}'): [
+        'FluxTaches/demande/42/validation', 'FluxTaches/validateur/jdoe', 'Demandes/validateur/jdoe',
+    ],
+    ('PUT', 'FluxTachesManoeuvre/{flux_id}'): [
+        'FluxTachesManoeuvre/demande/42/validation', 'FluxTachesManoeuvre/validateur/jdoe',
+    ],
+    ('POST', 'ComplementDdrs'): ['ComplementDdrs/demande/42'],
+    ('POST', 'ComplementDdrsMOE'): ['ComplementDdrsMOE/demande/42'],
+    ('PUT', 'LiaisonDdrdotations/{liaison_id}'): ['LiaisonDdrdotations', 'LiaisonDdrdotations/demande/42'],
+    ('POST', 'Embauches'): ['Embauches', 'Embauches/8', 'Embauches/filtered-embauches'],
+    ('PUT', 'Embauches/{embauche_id}'): ['Embauches', 'Embauches/8', 'Embauches/filtered-embauches'],
+    ('DELETE', 'Embauches/{embauche_id}'): ['Embauches', 'Embauches/8', 'Embauches/filtered-embauches'],
+}
+
+# GET indépendants de toutes ces écritures : toujours servis depuis le cache
+UNRELATED_GETS = ['Directions', 'NomFlux/2', 'Login/getDetailsLogin']
+
+
+class _Backend(BaseHTTPRequestHandler):
+    """Backend local : réponses cachables (Cache-Control, ETag), requêtes comptées"""
+
+    def _reply(self, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Cache-Control', 'max-age=600')
+        self.send_header('Date', formatdate(usegmt=True))
+        self.send_header('ETag', f'"{self.path}"')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self.server.hits[self.path.lstrip('/')] += 1
+        self._reply([{'path': self.path}])
+
+    def _write(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self._reply({'ok': True})
+
+    do_POST = do_PUT = do_DELETE = _write
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setenv('BACKEND_MAX_RETRIES', '0')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Backend)
+    server.hits = Counter()
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+    service = BackendService(base_url=f"http://127.0.0.1:{server.server_address[1]}", api_key='test')
+    service.shared_store = None
+    yield service, server.hits
+    service._executor.shutdown(wait=False)
+    server.shutdown()
+    server.server_close()
+
+
+def _path_params(route):
+    return {name: PATH_PARAMS[name] for _, name, _, _ in string.Formatter().parse(route) if name}
+
+
+def test_every_invalidating_write_is_covered():
+    assert set(DEPENDENT_GETS) == set(BackendService.CACHE_INVALIDATIONS)
+
+
+@pytest.mark.parametrize('write', sorted(DEPENDENT_GETS), ids=lambda write: ' '.join(write))
+def test_write_sends_the_next_dependent_get_to_the_backend(backend, write):
+    service, hits = backend
+    method, route = write
+    paths = DEPENDENT_GETS[write] + UNRELATED_GETS
+
+    for path in paths:
+        service._get(path)
+        service._get(path)
+    # Mis en cache (cache de référence ou cache HTTP) : un seul appel chacun
+    assert {path: hits[path] for path in paths} == {path: 1 for path in paths}
+
+    response = service._send(method, route, json={}, **_path_params(route))
+    assert response is not None and response.status_code == 200
+
+    for path in paths:
+        service._get(path)
+    assert {path: hits[path] for path in DEPENDENT_GETS[write]} == {path: 2 for path in DEPENDENT_GETS[write]}
+    assert {path: hits[path] for path in UNRELATED_GETS} == {path: 1 for path in UNRELATED_GETS}
+
+
+def test_failed_write_keeps_the_cache(backend, monkeypatch):
+    service, hits = backend
+    service._get('Postes')
+
+    # Écriture refusée (4xx) : rien n'a changé côté backend
+    monkeypatch.setattr(_Backend, 'do_POST', lambda handler: handler.send_error(400))
+    service._send('POST', 'Postes', json={})
+    service._get('Postes')
+
+    assert hits['Postes'] == 1
+
+
+def test_flux_write_refreshes_the_flux_search_cache(backend, monkeypatch):
+    service, hits = backend
+    monkeypatch.setattr(Flux_calcul, 'get_backend_service', lambda: service)
+    searcher = Flux_calcul.FluxSearchService()
+
+    searcher.get_all_flux()
+    searcher.get_all_flux()
+    assert hits['FluxMouvements/with-user-details'] == 1
+
+    service._send('PUT', 'FluxMouvements/{flux_id}', json={}, flux_id=5)
+    assert searcher._flux_cache is None
+    searcher.get_all_flux()
+    assert hits['FluxMouvements/with-user-details'] == 2
+
+    # Écriture sans rapport avec les flux : le cache du service de recherche est gardé
+    service._send('POST', 'Postes', json={})
+    assert searcher._flux_cache is not None
@@ -0,0 +1,46 @@
+"""
+Cassette backend : une requête absente au rejeu remonte sans nouvelle
+tentative ni échec du disjoncteur ; en enregistrement, chaque session garde
+son propre adaptateur réel.
+"""
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.cassette import CassetteAdapter, CassetteMiss  # noqa: E402
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+
+def _service(monkeypatch, tmp_path, mode):
+    monkeypatch.setenv('BACKEND_CASSETTE_MODE', mode)
+    monkeypatch.setenv('BACKEND_CASSETTE_DIR', str(tmp_path))
+    monkeypatch.setenv('BACKEND_MAX_RETRIES', '2')
+    return BackendService(base_url='http://backend.test', api_key='test')
+
+
+def test_replay_miss_is_raised_once_without_breaker_failure(monkeypatch, tmp_path):
+    service = _service(monkeypatch, tmp_path, CassetteAdapter.REPLAY)
+
+    with pytest.raises(CassetteMiss):
+        service._send('GET', 'Demandes/{demande_id}', demande_id=1)
+
+    assert service.cassette.stats['missed'] == 1
+    assert service.circuit_breaker.snapshot()['failures'] == 0
+    service._executor.shutdown(wait=False)
+
+
+def test_record_sessions_keep_their_own_inner_adapter(monkeypatch, tmp_path):
+    service = _service(monkeypatch, tmp_path, CassetteAdapter.RECORD)
+
+    main = service.session.get_adapter('https://')
+    stream = service._stream_session.get_adapter('https://')
+    upload = service._upload_session.get_adapter('https://')
+
+    inners = [main.inner, stream.inner, upload.inner]
+    assert len({id(inner) for inner in inners}) == 3
+    assert not isinstance(stream.inner, type(main.inner))
+    # Enregistrements communs aux trois sessions
+    assert stream._interactions is main._interactions
+    assert upload.stats is main.stats
+    service._executor.shutdown(wait=False)
@@ -0,0 +1,72 @@
+"""
+Limiteur de concurrence adaptatif : la latence de référence ne doit pas être
+tirée vers zéro par les réponses du cache, et la limite doit revenir à sa
+valeur de départ sous une charge normale.
+"""
+import random
+import time
+
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.resilience import AdaptiveConcurrencyLimiter  # noqa: E402
+
+
+def _serial_traffic(limiter, endpoint, count, low, high, cached_every=0):
+    for i in range(count):
+        assert limiter.acquire(endpoint)
+        if cached_every and i % cached_every == 0:
+            # 304 / réponse du cache HTTP : quasi instantanée, non mesurée
+            limiter.release(endpoint, 0.0005, success=True, measured=False)
+        else:
+            limiter.release(endpoint, random.uniform(low, high), success=True)
+
+
+def test_cache_hits_do_not_shrink_limit_under_normal_load():
+    random.seed(0)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+
+    _serial_traffic(limiter, 'Demandes', 300, 0.020, 0.060, cached_every=3)
+
+    assert limiter.snapshot()['Demandes']['limit'] == 8
+
+
+def test_limit_recovers_to_initial_without_saturation():
+    random.seed(1)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    _serial_traffic(limiter, 'Demandes', 20, 0.020, 0.030)
+
+    # Panne passagère : erreurs 5xx espacées -> baisse multiplicative
+    for _ in range(4):
+        assert limiter.acquire('Demandes')
+        limiter.release('Demandes', 0.0, success=False)
+        limiter._endpoints['Demandes'].last_decrease -= 1
+    assert limiter.snapshot()['Demandes']['limit'] < 4
+
+    _serial_traffic(limiter, 'Demandes', 200, 0.020, 0.030)
+
+    assert limiter.snapshot()['Demandes']['limit'] == 8
+
+
+def test_slow_responses_still_back_off():
+    random.seed(2)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    _serial_traffic(limiter, 'Postes', 30, 0.020, 0.030)
+
+    assert limiter.acquire('Postes')
+    limiter.release('Postes', 0.5, success=True)
+
+    assert limiter.snapshot()['Postes']['limit'] == 6
+
+
+def test_acquire_wait_is_capped_by_request_timeout():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, queue_timeout=30)
+    assert limiter.acquire('Demandes')
+
+    start = time.monotonic()
+    assert not limiter.acquire('Demandes', timeout=0.05)
+
+    assert time.monotonic() - start < 1
+    assert limiter.snapshot()['Demandes']['rejected'] == 1
@@ -0,0 +1,140 @@
+"""
+Budget d'appels au backend des actions de consultation (détection des N+1).
+
+Le backend est simulé au niveau de la session HTTP : les appels passent par
+BackendService._send et sont comptés par assert_backend_call_budget.
+"""
+import asyncio
+import json
+
+import pytest
+import requests
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.Middleware.backend_tracer import (  # noqa: E402
+    assert_backend_call_budget, current_trace, trace_backend_calls
+)
+from actions.handlers.consultation_demande import (  # noqa: E402
+    ActionAfficherDemandesATraiter, ActionAfficherListeDemandes, ActionAfficherStatutDemande
+)
+from actions.services import ddr_service  # noqa: E402
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+BASE_URL = 'http://backend.test'
+USERNAME = 'jdoe'
+POSTES = [{'IdPoste': i, 'NomPoste': f"Poste {i}"} for i in range(1, 11)]
+DEMANDES = [
+    {'IdDdr': 100 + i, 'StatutId': 2, 'PosteId': 1 + i % 10, 'Demandeur': 'rakoto',
+     'Effectif': 1, 'NatureContrat': 'CDI'}
+    for i in range(15)
+]
+
+ROUTES = {
+    'Postes': POSTES,
+    'Postes/2': POSTES[1],
+    'Directions': [{'IdDir': 3, 'NomDirection': 'Exploitation'}],
+    'Demandes/101': {**DEMANDES[1], 'DirectionId': 3},
+    'Demandes/101/Objectifs': [],
+    'Demandes/101/Dotations': [],
+    'ComplementDdrs/demande/101': [],
+    'LiaisonDdrdotations/demande/101': [],
+    'FluxTaches/demande/101/validation': [],
+    f"Demandes/Demandes/{USERNAME}": DEMANDES,
+    f"Demandes/validateur/{USERNAME}": DEMANDES,
+}
+
+
+class _Dispatcher:
+    def __init__(self):
+        self.messages = []
+
+    def utter_message(self, text=None, **kwargs):
+        self.messages.append(text)
+
+
+class _Tracker:
+    sender_id = USERNAME
+
+    def __init__(self, slots=None, entities=None):
+        self.slots = {'username': USERNAME, **(slots or {})}
+        self.latest_message = {'entities': entities or [], 'text': ''}
+
+    def get_slot(self, name):
+        return self.slots.get(name)
+
+
+def _fake_request(method, url, **kwargs):
+    path = url[len(BASE_URL) + 1:]
+    response = requests.Response()
+    response.url = url
+    if path in ROUTES:
+        response.status_code = 200
+        response._content = json.dumps(ROUTES[path]).encode()
+    else:
+        response.status_code = 404
+        response._content = b'{}'
+    return response
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setenv('BACKEND_MAX_RETRIES', '0')
+    service = BackendService(base_url=BASE_URL, api_key='test')
+    monkeypatch.setattr(service.session, 'request', _fake_request)
+    monkeypatch.setattr(ddr_service, '_backend_service', service)
+    yield service
+    service._executor.shutdown(wait=False)
+
+
+def test_statut_demande_budget(backend):
+    dispatcher = _Dispatcher()
+    tracker = _Tracker(entities=[{'entity': 'id_demande', 'value': '101'}])
+
+    # Demande + 5 détails + postes + directions
+    with assert_backend_call_budget(max_calls=8, per_endpoint=1, name='statut') as trace:
+        ActionAfficherStatutDemande().run(dispatcher, tracker, {})
+
+    assert trace.calls[('GET', 'Demandes/{demande_id}')] == 1
+    assert '#101' in dispatcher.messages[-1]
+
+
+def test_liste_demandes_budget(backend):
+    dispatcher = _Dispatcher()
+
+    # Liste des demandes + liste des postes (pas un appel par demande affichée)
+    with assert_backend_call_budget(max_calls=2, per_endpoint=1, name='liste'):
+        ActionAfficherListeDemandes().run(dispatcher, _Tracker(), {})
+
+    assert 'Poste 2' in dispatcher.messages[-1]
+
+
+def test_demandes_a_traiter_budget(backend):
+    dispatcher = _Dispatcher()
+
+    with assert_backend_call_budget(max_calls=2, per_endpoint=1, name='a_traiter'):
+        ActionAfficherDemandesATraiter().run(dispatcher, _Tracker(), {})
+
+    assert '#101' in dispatcher.messages[-1]
+
+
+def test_budget_helper_reports_n_plus_one(backend):
+    with pytest.raises(AssertionError, match='N\\+1'):
+        with assert_backend_call_budget(max_calls=20, per_endpoint=1):
+            backend.get_demande_with_details(101)
+            backend.invalidate_keys(['Demandes/101'], broadcast=False)
+            backend.get_demande_with_details(101)
+
+
+def test_trace_backend_calls_wraps_async_run():
+    class _AsyncAction:
+        def name(self):
+            return 'action_async'
+
+        @trace_backend_calls
+        async def run(self, dispatcher, tracker, domain):
+            await asyncio.sleep(0)
+            return current_trace().name
+
+    assert asyncio.run(_AsyncAction().run(_Dispatcher(), _Tracker(), {})) == 'action_async'
@@ -0,0 +1,52 @@
+"""
+Chargement d'une demande avec ses détails : la demande d'abord, puis les
+détails en parallèle seulement si elle existe.
+"""
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setenv('BACKEND_CACHE_ENABLED', 'false')
+    service = BackendService(base_url='http://backend.test', api_key='test')
+    yield service
+    service._executor.shutdown(wait=False)
+
+
+def _record_gets(backend, monkeypatch, responses):
+    calls = []
+
+    def fake_get(route, params=None, **path_params):
+        calls.append(route)
+        return responses.get(route)
+
+    monkeypatch.setattr(backend, '_get', fake_get)
+    return calls
+
+
+def test_unknown_demande_costs_a_single_call(backend, monkeypatch):
+    calls = _record_gets(backend, monkeypatch, {})
+
+    assert backend.get_demande_with_details(404) is None
+    assert calls == ["Demandes/{demande_id}"]
+
+
+def test_details_are_attached_and_failures_listed(backend, monkeypatch):
+    routes = backend.DEMANDE_DETAIL_ROUTES
+    sections = list(routes)
+    responses = {"Demandes/{demande_id}": {'IdDemande': 7}}
+    responses.update({routes[section]: [{'section': section}] for section in sections[1:]})
+    calls = _record_gets(backend, monkeypatch, responses)
+
+    demande = backend.get_demande_with_details(7)
+
+    assert calls[0] == "Demandes/{demande_id}"
+    assert sorted(calls[1:]) == sorted(routes.values())
+    assert demande[sections[0]] == []
+    assert demande[sections[1]] == [{'section': sections[1]}]
+    assert demande['partial_errors'] == [sections[0]]
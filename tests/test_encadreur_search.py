@@ -0,0 +1,181 @@
+"""
+Recherche de l'encadreur : les scores calculés en lot (process.cdist) donnent
+les mêmes candidats, scores, méthodes et ordre (égalités comprises) que
+l'ancienne boucle fuzz par utilisateur, ainsi que les mêmes suggestions.
+"""
+import random
+
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+pytest.importorskip("rapidfuzz")
+
+from rapidfuzz import fuzz  # noqa: E402
+
+from actions.validation import encadreur  # noqa: E402
+from actions.validation.encadreur import ActionVerificationEncadreur  # noqa: E402
+
+FIRST_NAMES = ['Abel', 'Éléonore', 'Honoré', 'Hery', 'Jean', 'Jean-Luc', 'Noël', 'Zoé', 'Fara', 'Andry']
+LAST_NAMES = ['Rakoto', 'RAKOTOMANDIMBY', 'Rakotoarisoa', 'Andrianaivo', 'Razafy', 'Lefèvre', 'Rabe', 'Ranaivo']
+
+
+def _old_recherche(users, nom_recherche, remove_accents):
+    """Ancienne boucle de ActionVerificationEncadreur._recherche_intelligente"""
+    nom_recherche_norm = remove_accents(nom_recherche.lower().strip())
+    tokens_recherche = set(nom_recherche_norm.split())
+
+    exact_matches = []
+    for user in users:
+        fullname = user.get('FullName', '')
+        if not fullname or len(fullname) < 2:
+            continue
+        fullname_norm = remove_accents(fullname.lower().strip())
+        if nom_recherche.lower().strip() == fullname.lower().strip():
+            exact_matches.append({'user_details': user, 'match_score': 100.0, 'method': 'exact'})
+        elif nom_recherche_norm == fullname_norm:
+            exact_matches.append({'user_details': user, 'match_score': 98.0, 'method': 'exact_no_accent'})
+    if exact_matches:
+        return exact_matches
+
+    fuzzy_matches = []
+    for user in users:
+        fullname = user.get('FullName', '')
+        if not fullname or len(fullname) < 2:
+            continue
+        fullname_norm = remove_accents(fullname.lower().strip())
+        tokens_fullname = set(fullname_norm.split())
+        common_tokens = tokens_recherche.intersection(tokens_fullname)
+        if len(common_tokens) == 0 or len(common_tokens) / max(len(tokens_recherche), 1) < 0.4:
+            continue
+
+        best_score = 0
+        best_method = None
+        score_token_sort = fuzz.token_sort_ratio(nom_recherche_norm, fullname_norm)
+        if score_token_sort >= 90:
+            best_score = score_token_sort
+            best_method = 'token_sort'
+        score_partial = fuzz.partial_ratio(nom_recherche_norm, fullname_norm)
+        if score_partial >= 85:
+            adjusted_score = score_partial * 0.88
+            if adjusted_score > best_score:
+                best_score = adjusted_score
+                best_method = 'partial'
+        score_token_set = fuzz.token_set_ratio(nom_recherche_norm, fullname_norm)
+        if score_token_set >= 80:
+            adjusted_score = score_token_set * 0.82
+            if adjusted_score > best_score:
+                best_score = adjusted_score
+                best_method = 'token_set'
+        if best_score >= 80:
+            fuzzy_matches.append({'user_details': user, 'match_score': best_score, 'method': best_method})
+
+    fuzzy_matches.sort(key=lambda x: x['match_score'], reverse=True)
+    return fuzzy_matches[:5]
+
+
+def _old_suggestions(users, nom_recherche, remove_accents):
+    """Ancienne boucle de ActionVerificationEncadreur._get_suggestions"""
+    nom_recherche_norm = remove_accents(nom_recherche.lower().strip())
+    suggestions = []
+    for user in users:
+        fullname = user.get('FullName', '')
+        if not fullname:
+            continue
+        score = fuzz.token_sort_ratio(nom_recherche_norm, remove_accents(fullname.lower().strip()))
+        if score >= 60:
+            suggestions.append({'name': fullname, 'score': score})
+    suggestions.sort(key=lambda x: x['score'], reverse=True)
+    return [s['name'] for s in suggestions[:5]]
+
+
+def _users(count, seed=3):
+    rng = random.Random(seed)
+    users = []
+    for i in range(count):
+        words = [rng.choice(LAST_NAMES), rng.choice(FIRST_NAMES)]
+        if rng.random() < 0.3:
+            words.append(rng.choice(FIRST_NAMES))
+        users.append({'UserName': f"user{i}", 'FullName': ' '.join(words), 'Poste': f"Poste {i}"})
+    # Noms absents ou trop courts, doublons (égalités) et variantes d'accents / casse
+    users[2]['FullName'] = ''
+    users[4].pop('FullName')
+    users[6]['FullName'] = 'R'
+    users[10]['FullName'] = users[11]['FullName'] = 'Rakoto Abel'
+    users[12]['FullName'] = 'RAKOTO Abel'
+    users[13]['FullName'] = 'Lefevre Zoe'
+    users[14]['FullName'] = 'Lefèvre Zoé'
+    return users
+
+
+def _typo(rng, word):
+    position = rng.randrange(len(word))
+    edit = rng.choice(['drop', 'swap', 'replace'])
+    if edit == 'drop' and len(word) > 3:
+        return word[:position] + word[position + 1:]
+    if edit == 'swap' and position < len(word) - 1:
+        return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    return word[:position] + rng.choice('aeiour') + word[position + 1:]
+
+
+def _queries(users, seed=5):
+    rng = random.Random(seed)
+    names = [user['FullName'] for user in users if user.get('FullName')]
+    queries = ['Rakoto Abel', 'rakoto abel', 'Abel Rakoto', 'lefevre zoe', 'LEFÈVRE ZOÉ', 'rakoto', 'zoe', 'inconnu total']
+    for _ in range(300):
+        words = rng.choice(names).split()
+        kind = rng.choice(['reorder', 'typo', 'partial', 'extra', 'case'])
+        if kind == 'reorder':
+            rng.shuffle(words)
+        elif kind == 'typo':
+            index = rng.randrange(len(words))
+            words[index] = _typo(rng, words[index])
+        elif kind == 'partial':
+            words = words[:rng.randint(1, len(words))]
+        elif kind == 'extra':
+            words.append(rng.choice(FIRST_NAMES + LAST_NAMES))
+        else:
+            words = [word.upper() if rng.random() < 0.5 else word.lower() for word in words]
+        queries.append(' '.join(words))
+    return queries
+
+
+class _Backend:
+    def __init__(self, users):
+        self.users = users
+
+    def get_all_user_details(self):
+        return self.users
+
+
+@pytest.fixture
+def action(monkeypatch):
+    users = _users(300)
+    monkeypatch.setattr(encadreur, 'get_backend_service', lambda: _Backend(users))
+    monkeypatch.setattr(ActionVerificationEncadreur, '_table_noms', None)
+    return ActionVerificationEncadreur()
+
+
+def _summary(matches):
+    return [(id(m['user_details']), m['match_score'], m['method']) for m in matches]
+
+
+def test_batched_search_matches_the_per_user_loop(action):
+    users = action.backend.users
+    fuzzy_ties = 0
+
+    for query in _queries(users):
+        expected = _old_recherche(users, query, action._remove_accents)
+        assert _summary(action._recherche_intelligente(query)) == _summary(expected), query
+        scores = [m['match_score'] for m in expected if not m['method'].startswith('exact')]
+        fuzzy_ties += len(scores) != len(set(scores))
+
+    # Le jeu de requêtes exerce bien le départage des scores égaux
+    assert fuzzy_ties > 0
+
+
+def test_batched_suggestions_match_the_per_user_loop(action):
+    users = action.backend.users
+
+    for query in _queries(users, seed=9) + ['Rakto Abl', 'zz', 'R']:
+        assert action._get_suggestions(query) == _old_suggestions(users, query, action._remove_accents), query
@@ -0,0 +1,126 @@
+"""
+Lectures groupées par identifiant (_get_many) : identifiants dédoublonnés,
+servis depuis l'index de la liste en cache quand c'est possible, les autres
+lus en parallèle ; un identifiant introuvable ou en erreur vaut None sans
+affecter les autres.
+"""
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+BASE_URL = 'http://backend.test'
+POSTES = [{'IdPoste': 1, 'NomPoste': 'Chef de quai'}, {'IdPoste': 2, 'NomPoste': 'Magasinier'}]
+
+
+class _Backend:
+    """Demandes 1 à 4 connues, 5 en erreur ; compte les appels et les requêtes simultanées"""
+
+    def __init__(self, wait_for_parallel=0):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.wait_for_parallel = wait_for_parallel
+        self.lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        path = url[len(BASE_URL) + 1:]
+        with self.lock:
+            self.calls.append(path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Attendre (au plus 2 s) que les lectures attendues soient toutes en vol
+            deadline = time.monotonic() + 2
+            while self.max_in_flight < self.wait_for_parallel and time.monotonic() < deadline:
+                time.sleep(0.005)
+            return self._response(url, path)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    @staticmethod
+    def _response(url, path):
+        response = requests.Response()
+        response.url = url
+        if path == 'Postes':
+            response.status_code, body = 200, POSTES
+        else:
+            route, record_id = path.rsplit('/', 1)
+            record_id = int(record_id)
+            if record_id == 5:
+                response.status_code, body = 500, {'message': 'erreur'}
+            elif route == 'Demandes' and record_id <= 4:
+                response.status_code, body = 200, {'IdDemande': record_id}
+            else:
+                response.status_code, body = 404, {'message': 'introuvable'}
+        response._content = json.dumps(body).encode()
+        return response
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('BACKEND_MAX_RETRIES', '0')
+    service = BackendService(base_url=BASE_URL, api_key='test')
+    service.shared_store = None
+    yield service
+    service._executor.shutdown(wait=False)
+
+
+def _use(monkeypatch, service, backend):
+    monkeypatch.setattr(service.session, 'request', backend.request)
+    return backend
+
+
+def test_ids_are_deduplicated_and_fetched_in_parallel(monkeypatch, service):
+    backend = _use(monkeypatch, service, _Backend(wait_for_parallel=4))
+
+    results = service.get_demandes_by_ids([3, 1, None, 3, 2, 4, 1])
+
+    assert list(results) == [3, 1, 2, 4]
+    assert results == {record_id: {'IdDemande': record_id} for record_id in (3, 1, 2, 4)}
+    assert sorted(backend.calls) == ['Demandes/1', 'Demandes/2', 'Demandes/3', 'Demandes/4']
+    assert backend.max_in_flight == 4
+
+
+def test_missing_or_failing_ids_are_none(monkeypatch, service):
+    backend = _use(monkeypatch, service, _Backend())
+
+    results = service.get_demandes_by_ids([1, 99, 5])
+
+    assert results == {1: {'IdDemande': 1}, 99: None, 5: None}
+    assert sorted(backend.calls) == ['Demandes/1', 'Demandes/5', 'Demandes/99']
+
+
+def test_single_id_is_fetched_inline(monkeypatch, service):
+    backend = _use(monkeypatch, service, _Backend())
+
+    assert service.get_demandes_by_ids([2, 2]) == {2: {'IdDemande': 2}}
+    assert backend.calls == ['Demandes/2']
+
+
+def test_no_ids_makes_no_call(monkeypatch, service):
+    backend = _use(monkeypatch, service, _Backend())
+
+    assert service.get_demandes_by_ids([]) == {}
+    assert service.get_demandes_by_ids([None]) == {}
+    assert backend.calls == []
+
+
+def test_ids_in_the_cached_list_are_served_from_its_index(monkeypatch, service):
+    backend = _use(monkeypatch, service, _Backend())
+
+    results = service.get_postes_by_ids([2, 1, 99])
+    assert results == {2: POSTES[1], 1: POSTES[0], 99: None}
+    # Liste lue une fois ; seul l'identifiant absent de la liste est demandé un par un
+    assert backend.calls == ['Postes', 'Postes/99']
+
+    assert service.get_postes_by_ids([1, 2]) == {1: POSTES[0], 2: POSTES[1]}
+    assert backend.calls == ['Postes', 'Postes/99']
@@ -0,0 +1,44 @@
+"""
+Cache HTTP (CacheControl) du BackendService : borné en LRU et vidé par les
+invalidations qui suivent les écritures.
+"""
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.backend_cache import HttpResponseCache  # noqa: E402
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+
+def test_http_cache_evicts_least_recently_used():
+    cache = HttpResponseCache(max_entries=2)
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    assert cache.get('a') == b'1'
+    cache.set('c', b'3')
+
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1'
+
+
+def test_backend_http_cache_is_bounded_and_invalidated(monkeypatch):
+    monkeypatch.setenv('BACKEND_HTTP_CACHE_MAX_ENTRIES', '100')
+    service = BackendService(base_url='http://backend.test/api', api_key='test')
+    cache = service.http_cache
+    for demande_id in range(124):
+        cache.set(f'http://backend.test/api/Demandes/{demande_id}', b'{}')
+    cache.set('http://backend.test/api/Demandes/42?details=true', b'{}')
+    cache.set('http://backend.test/api/FluxTaches/demande/42/validateur/7', b'{}')
+    cache.set('http://backend.test/api/FluxTaches/demande/43/validateur/7', b'{}')
+    assert len(cache) == 100
+
+    service.invalidate_keys(['Demandes/42', 'FluxTaches/demande/42*'], broadcast=False)
+
+    assert cache.get('http://backend.test/api/Demandes/42') is None
+    assert cache.get('http://backend.test/api/Demandes/42?details=true') is None
+    assert cache.get('http://backend.test/api/FluxTaches/demande/42/validateur/7') is None
+    assert cache.get('http://backend.test/api/Demandes/43') == b'{}'
+    assert cache.get('http://backend.test/api/FluxTaches/demande/43/validateur/7') == b'{}'
+    service._executor.shutdown(wait=False)
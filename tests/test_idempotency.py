@@ -0,0 +1,135 @@
+"""
+Soumissions en double : la première s'exécute, une soumission identique
+concurrente attend son résultat, un échec libère la clé, et la clé du
+formulaire DDR suit le contenu soumis (pièces jointes, durée du contrat).
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.Middleware.idempotency import IdempotencyStore  # noqa: E402
+from actions.handlers import ddr_handler  # noqa: E402
+from actions.handlers.ddr_handler import ActionSubmitFormAddDdr  # noqa: E402
+from actions.services import async_ddr_service, ddr_service  # noqa: E402
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+SLOTS = {
+    'poste_id': 1, 'effectif': 1, 'nature_contrat': 'CDD', 'duree_contrat': 6,
+    'nom_encadreur': 'Rakoto', 'poste_encadreur': 'Chef', 'date_mise_en_service': '2026-01-01',
+    'direction_id': 2, 'exploitation_id': 3, 'motif_id': 4, 'situation_budget_id': 5,
+    'justification': 'Renfort', 'objectifs_list': ['Objectif'], 'dotations_list': ['PC'],
+    'piece_jointe': 'cv.pdf', 'username': 'jdoe',
+}
+ATTACHMENTS = [{'name': 'cv.pdf', 'content': 'Y3Y='}]
+
+
+class _Tracker:
+    sender_id = 'conv-1'
+
+    def __init__(self, slots=None, attachments=None):
+        self.slots = {**SLOTS, **(slots or {})}
+        self.latest_message = {'metadata': {'attachments': ATTACHMENTS if attachments is None else attachments}}
+
+    def get_slot(self, name):
+        return self.slots.get(name)
+
+
+class _Dispatcher:
+    def __init__(self):
+        self.messages = []
+
+    def utter_message(self, text=None, **kwargs):
+        self.messages.append(text)
+
+
+def test_first_submission_executes_and_duplicate_replays():
+    store = IdempotencyStore(wait_timeout=1)
+
+    assert store.begin('k') == (True, None)
+    store.complete('k', {'demande_id': 7})
+
+    assert store.begin('k') == (False, {'demande_id': 7})
+
+
+def test_concurrent_duplicate_waits_for_the_same_result():
+    store = IdempotencyStore(wait_timeout=5)
+    assert store.begin('k') == (True, None)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(store.begin('k')))
+    waiter.start()
+
+    time.sleep(0.1)
+    assert results == []
+    store.complete('k', {'demande_id': 7})
+    waiter.join(timeout=5)
+
+    assert results == [(False, {'demande_id': 7})]
+
+
+def test_duplicate_still_in_progress_after_timeout():
+    store = IdempotencyStore(wait_timeout=0.05)
+    store.begin('k')
+
+    assert store.begin('k') == (False, None)
+
+
+def test_failed_submission_can_be_retried():
+    store = IdempotencyStore(wait_timeout=5)
+    assert store.begin('k') == (True, None)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(store.begin('k')))
+    waiter.start()
+
+    time.sleep(0.1)
+    store.fail('k')
+    waiter.join(timeout=5)
+
+    # La soumission en attente reprend la main après l'échec
+    assert results == [(True, None)]
+
+
+def test_submission_key_follows_the_submitted_content():
+    submitted = {name: SLOTS[name] for name in ('poste_id', 'effectif', 'piece_jointe')}
+    key = ActionSubmitFormAddDdr.submission_key(_Tracker(), submitted, 'jdoe', ATTACHMENTS)
+
+    assert ActionSubmitFormAddDdr.submission_key(_Tracker(), submitted, 'jdoe', ATTACHMENTS) == key
+    assert ActionSubmitFormAddDdr.submission_key(
+        _Tracker({'duree_contrat': 12}), submitted, 'jdoe', ATTACHMENTS
+    ) != key
+    assert ActionSubmitFormAddDdr.submission_key(
+        _Tracker(), submitted, 'jdoe', ATTACHMENTS + [{'name': 'lettre.pdf', 'content': 'bA=='}]
+    ) != key
+    assert ActionSubmitFormAddDdr.submission_key(
+        _Tracker(), submitted, 'jdoe', [{'name': 'cv.pdf', 'content': 'YXV0cmU='}]
+    ) != key
+
+
+def test_handler_releases_the_key_after_a_failed_submission(monkeypatch):
+    service = BackendService(base_url='http://backend.test', api_key='test')
+    uploads = []
+
+    def failed_upload(attachment):
+        uploads.append(attachment['name'])
+        return None
+
+    monkeypatch.setattr(service, 'upload_file_from_metadata', failed_upload)
+    monkeypatch.setattr(ddr_service, '_backend_service', service)
+    monkeypatch.setattr(ddr_handler, 'get_backend_service', lambda: service)
+    store = IdempotencyStore(wait_timeout=1)
+    monkeypatch.setattr(ddr_handler, 'get_submission_store', lambda: store)
+
+    action = ActionSubmitFormAddDdr()
+    for _ in range(2):
+        dispatcher = _Dispatcher()
+        assert asyncio.run(action.run(dispatcher, _Tracker(), {})) == []
+        assert any('Aucun fichier' in message for message in dispatcher.messages)
+
+    # Deuxième tentative exécutée (pas rejouée ni bloquée par la première)
+    assert uploads == ['cv.pdf', 'cv.pdf']
+    service._executor.shutdown(wait=False)
+    async_ddr_service._async_backend_service.shutdown()
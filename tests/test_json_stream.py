@@ -0,0 +1,127 @@
+"""
+Décodage en flux des grandes listes : éléments et caractères coupés entre
+deux morceaux, séparateurs isolés, tableau vide, corps qui n'est pas un
+tableau (décodé en entier) et corps tronqué (erreur, jamais de liste partielle).
+"""
+import io
+import json
+
+import pytest
+import requests
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.ddr_service import BackendService  # noqa: E402
+from actions.services.json_stream import decode_json_array, iter_json_array  # noqa: E402
+
+USERS = [
+    {'UserName': 'jdoe', 'FullName': 'Éléonore Rakoto', 'Email': 'e@x.mg', 'Poste': 'Chef'},
+    {'UserName': 'abel', 'FullName': 'Abel Rabe', 'Email': 'a@x.mg', 'Poste': 'Agent'},
+]
+
+
+def _split(body: bytes, *cuts: int):
+    """Découpe body aux positions données"""
+    bounds = [0, *cuts, len(body)]
+    return [body[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _every_split(body: bytes):
+    """Toutes les découpes en deux morceaux, puis en morceaux d'un octet"""
+    for cut in range(len(body) + 1):
+        yield _split(body, cut)
+    yield [body[i:i + 1] for i in range(len(body))]
+
+
+def test_elements_split_across_chunks():
+    body = json.dumps(USERS + [12345, 'texte', True, None, -1.5e3, 2.5e-07, [1, [2]]]).encode('utf-8')
+    expected = json.loads(body)
+
+    for chunks in _every_split(body):
+        assert decode_json_array(chunks) == expected
+
+
+def test_multibyte_character_split_across_chunks():
+    body = json.dumps(['Éléonore', 'Noël', '日本', '🙂'], ensure_ascii=False).encode('utf-8')
+    cut = body.index('🙂'.encode('utf-8')) + 2
+
+    assert decode_json_array(_split(body, cut)) == ['Éléonore', 'Noël', '日本', '🙂']
+    for chunks in _every_split(body):
+        assert decode_json_array(chunks) == ['Éléonore', 'Noël', '日本', '🙂']
+
+
+def test_whitespace_and_commas_between_chunks():
+    chunks = [b'\xef\xbb', b'\xbf \n[', b' ', b'{"a": 1}', b' ,', b'\r\n', b' ', b' {"a"', b': 2}', b'\t', b']', b'  \n']
+
+    assert decode_json_array(chunks) == [{'a': 1}, {'a': 2}]
+
+
+def test_empty_array():
+    assert decode_json_array([b'[]']) == []
+    assert decode_json_array([b' [', b' \n ', b']']) == []
+
+
+def test_projection_keeps_only_the_requested_fields():
+    body = json.dumps(USERS).encode('utf-8')
+
+    assert decode_json_array(_split(body, 17, 60), ('UserName', 'FullName')) == [
+        {'UserName': 'jdoe', 'FullName': 'Éléonore Rakoto'},
+        {'UserName': 'abel', 'FullName': 'Abel Rabe'},
+    ]
+
+
+def test_large_array_in_small_chunks():
+    items = [{'IdUser': i, 'FullName': f"Utilisateur {i}"} for i in range(5000)]
+    body = json.dumps(items).encode('utf-8')
+
+    assert decode_json_array(_split(body, *range(1000, len(body), 1000))) == items
+
+
+def test_non_array_body_is_decoded_whole():
+    envelope = {'message': 'Aucun utilisateur', 'data': [{'UserName': 'jdoe', 'Email': 'e@x.mg'}]}
+    body = json.dumps(envelope).encode('utf-8')
+
+    for chunks in _every_split(body):
+        # Pas de projection hors d'un tableau
+        assert decode_json_array(chunks, ('UserName',)) == envelope
+    assert decode_json_array([b'  ', b'\n', b'"texte"']) == 'texte'
+
+    with pytest.raises(ValueError):
+        list(iter_json_array([body]))
+
+
+@pytest.mark.parametrize('body', [
+    b'', b'   ', b'[', b'[{"a": 1}', b'[{"a": 1},', b'[{"a": 1}, {"b"', b'[1, 2', b'["Rak',
+    b'[tr', b'{"a": [1, 2]', '["Éléo'.encode('utf-8')[:-1],
+])
+def test_truncated_body_raises(body):
+    for chunks in _every_split(body):
+        with pytest.raises(ValueError):
+            decode_json_array(chunks)
+
+
+def test_streamed_route_decodes_array_or_whole_body(monkeypatch):
+    service = BackendService(base_url='http://backend.test', api_key='test')
+    bodies = [json.dumps(USERS).encode('utf-8'), json.dumps({'message': 'maintenance'}).encode('utf-8'), b'[{"UserName"']
+
+    def fake_request(method, url, **kwargs):
+        assert kwargs.get('stream') is True
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        response.raw = io.BytesIO(bodies.pop(0))
+        return response
+
+    monkeypatch.setattr(service._stream_session, 'request', fake_request)
+    fields = service.streamed_routes['Login/getAllUsers']
+    expected = [{field: user[field] for field in fields if field in user} for user in USERS]
+
+    assert service._get('Login/getAllUsers') == expected
+    service.cache.invalidate('Login/getAllUsers')
+    assert service._get('Login/getAllUsers') == {'message': 'maintenance'}
+    service.cache.invalidate('Login/getAllUsers')
+    # Corps tronqué : erreur, rien de partiel en cache
+    assert service._get('Login/getAllUsers') is None
+    assert service.cache.get('Login/getAllUsers') is None
+    service._executor.shutdown(wait=False)
@@ -0,0 +1,126 @@
+"""
+Cache négatif : un 404 sur une recherche par identifiant est mémorisé
+negative_cache_ttl secondes (aucun appel au backend pendant ce temps), puis
+oublié à l'expiration ou dès qu'une écriture touche la clé.
+"""
+import json
+import time
+
+import pytest
+import requests
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+BASE_URL = 'http://backend.test'
+
+
+class _Backend:
+    """Demandes connues du backend ; les écritures créent la demande 42"""
+
+    def __init__(self, status_override=None):
+        self.calls = []
+        self.demandes = {7: {'IdDemande': 7}}
+        self.status_override = status_override
+
+    def request(self, method, url, **kwargs):
+        path = url[len(BASE_URL) + 1:]
+        self.calls.append((method, path))
+        response = requests.Response()
+        response.url = url
+        if method != 'GET':
+            self.demandes[42] = {'IdDemande': 42}
+            response.status_code = 200
+            response._content = b'{}'
+        elif self.status_override is not None:
+            response.status_code = self.status_override
+            response._content = b'{}'
+        else:
+            demande = self.demandes.get(int(path.split('/')[1]))
+            response.status_code = 200 if demande is not None else 404
+            response._content = json.dumps(demande if demande is not None else {'message': 'introuvable'}).encode()
+        return response
+
+    def gets(self, path):
+        return self.calls.count(('GET', path))
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('BACKEND_MAX_RETRIES', '0')
+    monkeypatch.setenv('BACKEND_NEGATIVE_CACHE_TTL', '0.2')
+    service = BackendService(base_url=BASE_URL, api_key='test')
+    service.shared_store = None
+    yield service
+    service._executor.shutdown(wait=False)
+
+
+def _use(monkeypatch, service, backend):
+    monkeypatch.setattr(service.session, 'request', backend.request)
+    return backend
+
+
+def test_404_is_remembered_for_its_ttl(monkeypatch, service):
+    backend = _use(monkeypatch, service, _Backend())
+
+    assert service.get_demande_by_id(42) is None
+    assert service.get_demande_by_id(42) is None
+    assert backend.gets('Demandes/42') == 1
+    assert service.get_health()['not_found_hits'] == 1
+    # Les autres identifiants ne sont pas concernés
+    assert service.get_demande_by_id(7) == {'IdDemande': 7}
+
+    time.sleep(0.3)
+    assert not service.is_known_missing('Demandes/42')
+    assert service.get_demande_by_id(42) is None
+    assert backend.gets('Demandes/42') == 2
+
+
+def test_write_drops_the_remembered_404(monkeypatch, service):
+    monkeypatch.setattr(service, 'negative_cache_ttl', 60)
+    backend = _use(monkeypatch, service, _Backend())
+
+    assert service.get_demande_by_id(42) is None
+    assert service.get_demande_by_id(42) is None
+    assert backend.gets('Demandes/42') == 1
+
+    # Création de la demande : POST Demandes invalide Demandes/*
+    assert service._send('POST', 'Demandes', json={'Justification': 'Renfort'}).status_code == 200
+
+    assert not service.is_known_missing('Demandes/42')
+    assert service.get_demande_by_id(42) == {'IdDemande': 42}
+    assert backend.gets('Demandes/42') == 2
+
+
+def test_write_to_another_key_keeps_the_remembered_404(monkeypatch, service):
+    monkeypatch.setattr(service, 'negative_cache_ttl', 60)
+    backend = _use(monkeypatch, service, _Backend())
+
+    assert service.get_demande_by_id(42) is None
+    service._send('PUT', 'Demandes/{demande_id}', json={}, demande_id=7)
+
+    assert service.is_known_missing('Demandes/42')
+    assert service.get_demande_by_id(42) is None
+    assert backend.gets('Demandes/42') == 1
+
+
+@pytest.mark.parametrize('status', [500, 403])
+def test_only_404_is_remembered(monkeypatch, service, status):
+    backend = _use(monkeypatch, service, _Backend(status_override=status))
+
+    assert service.get_demande_by_id(42) is None
+    assert service.get_demande_by_id(42) is None
+
+    assert not service.is_known_missing('Demandes/42')
+    assert backend.gets('Demandes/42') == 2
+
+
+def test_routes_outside_the_negative_cache_always_call(monkeypatch, service):
+    backend = _use(monkeypatch, service, _Backend())
+
+    assert service._get("Demandes/{demande_id}/Objectifs", demande_id=42) is None
+    assert service._get("Demandes/{demande_id}/Objectifs", demande_id=42) is None
+
+    assert backend.gets('Demandes/42/Objectifs') == 2
@@ -0,0 +1,119 @@
+"""
+Préchargements : pool séparé et borné, abandonnés quand trop sont déjà en
+cours ; une rafale de débuts de session ne retarde pas les fan-out des tours
+en cours.
+"""
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+BASE_URL = 'http://backend.test'
+
+
+class _Backend:
+    """Les requêtes des préchargements restent bloquées jusqu'à release"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.prefetch_in_flight = 0
+        self.max_prefetch_in_flight = 0
+        self.threads = set()
+
+    def request(self, method, url, **kwargs):
+        name = threading.current_thread().name
+        prefetching = name.startswith(BackendService.PREFETCH_THREAD_PREFIX)
+        with self.lock:
+            self.threads.add(name.rsplit('_', 1)[0])
+            if prefetching:
+                self.prefetch_in_flight += 1
+                self.max_prefetch_in_flight = max(self.max_prefetch_in_flight, self.prefetch_in_flight)
+        try:
+            if prefetching:
+                self.release.wait(timeout=5)
+            response = requests.Response()
+            response.url = url
+            response.status_code = 200
+            response._content = json.dumps({'path': url[len(BASE_URL) + 1:]}).encode()
+            return response
+        finally:
+            if prefetching:
+                with self.lock:
+                    self.prefetch_in_flight -= 1
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition jamais atteinte")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('BACKEND_MAX_RETRIES', '0')
+    monkeypatch.setenv('BACKEND_MAX_WORKERS', '2')
+    monkeypatch.setenv('BACKEND_PREFETCH_WORKERS', '2')
+    monkeypatch.setenv('BACKEND_PREFETCH_MAX_PENDING', '2')
+    service = BackendService(base_url=BASE_URL, api_key='test')
+    service.shared_store = None
+    backend = _Backend()
+    monkeypatch.setattr(service.session, 'request', backend.request)
+    service.backend = backend
+    yield service
+    backend.release.set()
+    service._executor.shutdown(wait=False)
+    service._prefetch_executor.shutdown(wait=False)
+
+
+def test_prefetches_do_not_delay_live_fan_outs(service):
+    backend = service.backend
+    threads = [service.prefetch_session(f"user{i}", f"conv-{i}") for i in range(2)]
+    _wait_for(lambda: backend.prefetch_in_flight == 2)
+
+    # Tour en cours : ses appels parallèles passent malgré les préchargements bloqués
+    start = time.perf_counter()
+    results, errors, _ = service._fan_out({
+        demande_id: (lambda demande_id=demande_id: service.get_demande_by_id(demande_id))
+        for demande_id in range(1, 5)
+    })
+    assert time.perf_counter() - start < 1
+    assert errors == {}
+    assert results[3] == {'path': 'Demandes/3'}
+
+    backend.release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    # Les préchargements n'ont utilisé que leur propre pool, jamais plus de 2 appels à la fois
+    assert backend.max_prefetch_in_flight == 2
+    assert backend.threads == {BackendService.FAN_OUT_THREAD_PREFIX, BackendService.PREFETCH_THREAD_PREFIX}
+
+
+def test_prefetch_is_dropped_when_too_many_are_pending(service):
+    backend = service.backend
+    running = [service.prefetch_session('user1'), service.prefetch_demande(7, 'DDR')]
+    assert all(thread is not None for thread in running)
+
+    assert service.prefetch_session('user2') is None
+    assert service.prefetch_demande(8, 'DMOE') is None
+    assert service.get_health()['prefetch_dropped'] == 2
+
+    backend.release.set()
+    for thread in running:
+        thread.join(timeout=5)
+
+    # Abandonnés sans être marqués comme préchargés : une nouvelle tentative passe
+    retried = service.prefetch_session('user2')
+    assert retried is not None
+    retried.join(timeout=5)
+    # Déjà préchargé récemment : ignoré comme avant
+    assert service.prefetch_session('user1') is None
@@ -0,0 +1,113 @@
+"""
+Instantané disque des tables de référence : fichier privé, refus des fichiers
+non sûrs, aucune donnée utilisateur écrite et index persistés (une recherche
+ne décode que la ligne trouvée).
+"""
+import os
+import stat
+
+import pytest
+import requests
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.ddr_service import BackendService  # noqa: E402
+from actions.services.reference_index import ReferenceIndex  # noqa: E402
+from actions.services.reference_snapshot import ReferenceSnapshot, write_snapshot  # noqa: E402
+
+BASE_URL = 'http://backend.test'
+POSTES = [{'IdPoste': 1, 'NomPoste': 'Chef de quai'}]
+
+
+def test_snapshot_is_private_and_round_trips(tmp_path):
+    path = str(tmp_path / 'snap' / 'reference_snapshot.bin')
+    write_snapshot(path, {'Postes': (POSTES, '"v1"')}, BASE_URL)
+
+    if hasattr(os, 'getuid'):
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+
+    snapshot = ReferenceSnapshot.load(path, BASE_URL)
+    assert snapshot.get_table('Postes') == POSTES
+    assert snapshot.etag('Postes') == '"v1"'
+    assert ReferenceSnapshot.load(path, 'http://other.test') is None
+    snapshot.close()
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason="permissions POSIX")
+def test_snapshot_writable_by_others_is_refused(tmp_path):
+    path = str(tmp_path / 'reference_snapshot.bin')
+    write_snapshot(path, {'Postes': (POSTES, None)}, BASE_URL)
+    os.chmod(path, 0o666)
+
+    assert ReferenceSnapshot.load(path, BASE_URL) is None
+
+
+def test_snapshot_is_opt_in_and_leaves_users_out(tmp_path, monkeypatch):
+    monkeypatch.delenv('BACKEND_SNAPSHOT_ENABLED', raising=False)
+    service = BackendService(base_url=BASE_URL, api_key='test')
+    assert not service.snapshot_enabled
+    service._executor.shutdown(wait=False)
+
+    monkeypatch.setenv('BACKEND_SNAPSHOT_ENABLED', 'true')
+    monkeypatch.setenv('BACKEND_SNAPSHOT_PATH', str(tmp_path / 'reference_snapshot.bin'))
+    service = BackendService(base_url=BASE_URL, api_key='test')
+    service.cache.set('Postes', POSTES, 3600)
+    service.cache.set('Login/getAllUsers', [{'UserName': 'jdoe', 'Email': 'jdoe@example.com'}], 900)
+
+    assert service.save_snapshot()
+    assert service.snapshot.tables() == ['Postes']
+    service._executor.shutdown(wait=False)
+
+
+def test_persisted_index_decodes_only_the_matching_row(tmp_path):
+    path = str(tmp_path / 'reference_snapshot.bin')
+    postes = [{'IdPoste': i, 'NomPoste': f"Poste {i}"} for i in range(1, 1001)]
+    postes.append({'IdPoste': 2000, 'NomPoste': 'POSTE 5'})
+    write_snapshot(path, {'Postes': (postes, '"v1"')}, BASE_URL, indexes={'Postes': ('IdPoste', 'NomPoste')})
+
+    snapshot = ReferenceSnapshot.load(path, BASE_URL)
+    index = snapshot.index('Postes')
+    expected = ReferenceIndex(postes, 'IdPoste', 'NomPoste')
+
+    for name in ('poste 5', 'Poste 999', 'inconnu', None):
+        assert index.id_for_name(name) == expected.id_for_name(name)
+    assert index.name_for_id(2000) == 'POSTE 5'
+    assert index.by_id(42).row == postes[41]
+    assert len(index) == len(expected)
+    assert [record.id for record in index][:3] == [1, 2, 3]
+    # Aucune table décodée en entier, seules les lignes trouvées
+    assert snapshot._decoded == {}
+    assert snapshot.get_row('Postes', 999) == postes[999]
+    snapshot.close()
+
+
+def test_backend_serves_lookups_from_the_snapshot_index(tmp_path, monkeypatch):
+    path = str(tmp_path / 'reference_snapshot.bin')
+    write_snapshot(path, {'Postes': (POSTES, '"v1"')}, BASE_URL, indexes={'Postes': ('IdPoste', 'NomPoste')})
+    monkeypatch.setenv('BACKEND_SNAPSHOT_ENABLED', 'true')
+    monkeypatch.setenv('BACKEND_SNAPSHOT_PATH', path)
+    service = BackendService(base_url=BASE_URL, api_key='test')
+    requests_sent = []
+
+    def not_modified(method, url, **kwargs):
+        requests_sent.append(kwargs.get('headers', {}).get('If-None-Match'))
+        response = requests.Response()
+        response.status_code = 304
+        response.url = url
+        return response
+
+    monkeypatch.setattr(service.session, 'request', not_modified)
+
+    assert service.get_poste_id_by_name('chef de quai') == 1
+    assert service.get_poste_id_by_name('Chef de quai') == 1
+    service._executor.shutdown(wait=True)
+    # Une seule revalidation conditionnelle, table jamais décodée ni réindexée
+    assert requests_sent == ['"v1"']
+    assert service.snapshot._decoded == {}
+    assert 'Postes' not in service._reference_indexes
+
+    # Après une écriture sur la table, l'index de l'instantané n'est plus utilisé
+    service.invalidate_keys(['Postes'], broadcast=False)
+    assert service._snapshot_index('Postes') is None
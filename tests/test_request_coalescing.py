@@ -0,0 +1,171 @@
+"""
+Regroupement des GET identiques simultanés (SingleFlight) : N appels
+concurrents sur la même clé font un seul appel au backend et reçoivent le même
+résultat ; une erreur atteint tous les appelants en attente.
+"""
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.backend_cache import SingleFlight  # noqa: E402
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+CALLERS = 8
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition jamais atteinte")
+        time.sleep(0.005)
+
+
+def _run_concurrently(func, count=CALLERS):
+    """Lance func dans count threads ; renvoie (résultats, exceptions)"""
+    results, errors = [], []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            value = func()
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        else:
+            with lock:
+                results.append(value)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        # Le premier appelant attend que tous les autres l'aient rejoint
+        _wait_for(lambda: flight.coalesced == CALLERS - 1)
+        return {'IdDemande': 42}
+
+    results, errors = _run_concurrently(lambda: flight.do('Demandes/42', fetch))
+
+    assert errors == []
+    assert len(calls) == 1
+    assert len(results) == CALLERS
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_error_reaches_every_waiter_and_is_not_kept():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        _wait_for(lambda: flight.coalesced == CALLERS - 1)
+        raise ConnectionError("backend injoignable")
+
+    results, errors = _run_concurrently(lambda: flight.do('Demandes/42', fetch))
+
+    assert results == []
+    assert len(calls) == 1
+    assert len(errors) == CALLERS
+    assert all(isinstance(error, ConnectionError) for error in errors)
+
+    # L'erreur n'est pas mémorisée : l'appel suivant réessaie
+    assert flight.do('Demandes/42', lambda: 'ok') == 'ok'
+
+
+def test_distinct_keys_are_not_coalesced():
+    flight = SingleFlight()
+    barrier = threading.Barrier(2, timeout=5)
+    keys = iter(['Demandes/42', 'Demandes/43'])
+
+    def fetch(key):
+        # Les deux clés sont en vol en même temps
+        barrier.wait()
+        return key
+
+    def call():
+        key = next(keys)
+        return flight.do(key, lambda: fetch(key))
+
+    results, errors = _run_concurrently(call, count=2)
+
+    assert errors == []
+    assert sorted(results) == ['Demandes/42', 'Demandes/43']
+    assert flight.coalesced == 0
+
+
+class _Backend:
+    """Backend lent : chaque réponse attend que tous les appelants aient rejoint la requête"""
+
+    def __init__(self, service, status=200):
+        self.service = service
+        self.status = status
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(url)
+        _wait_for(lambda: self.service._inflight.coalesced >= CALLERS - 1)
+        response = requests.Response()
+        response.url = url
+        response.status_code = self.status
+        response._content = json.dumps({'IdDemande': 42} if self.status == 200 else {'message': 'erreur'}).encode()
+        return response
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('BACKEND_MAX_RETRIES', '0')
+    service = BackendService(base_url='http://backend.test', api_key='test')
+    service.shared_store = None
+    yield service
+    service._executor.shutdown(wait=False)
+
+
+def test_concurrent_identical_gets_make_one_backend_call(monkeypatch, service):
+    backend = _Backend(service)
+    monkeypatch.setattr(service.session, 'request', backend.request)
+
+    results, errors = _run_concurrently(lambda: service.get_demande_by_id(42))
+
+    assert errors == []
+    assert backend.calls == ['http://backend.test/Demandes/42']
+    assert results == [{'IdDemande': 42}] * CALLERS
+    assert service.get_health()['coalesced'] == CALLERS - 1
+
+
+def test_concurrent_reference_gets_make_one_backend_call(monkeypatch, service):
+    backend = _Backend(service)
+    monkeypatch.setattr(service.session, 'request', backend.request)
+
+    results, errors = _run_concurrently(lambda: service._get('Postes'))
+
+    assert errors == []
+    assert backend.calls == ['http://backend.test/Postes']
+    assert len(results) == CALLERS
+
+
+def test_backend_error_reaches_every_waiter(monkeypatch, service):
+    backend = _Backend(service, status=500)
+    monkeypatch.setattr(service.session, 'request', backend.request)
+
+    results, errors = _run_concurrently(lambda: service.get_demande_by_id(42))
+
+    assert errors == []
+    assert backend.calls == ['http://backend.test/Demandes/42']
+    assert results == [None] * CALLERS
@@ -0,0 +1,186 @@
+"""
+Cache partagé entre workers : lecture / écriture / rétention / invalidations
+(SQLite, Redis si fakeredis est installé), fichier privé, et repli sur le
+cache local quand le cache partagé est indisponible.
+"""
+import json
+import os
+import stat
+import time
+
+import pytest
+import requests
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.ddr_service import BackendService  # noqa: E402
+from actions.services.shared_store import (  # noqa: E402
+    RedisSharedStore, SQLiteSharedStore, create_shared_store
+)
+
+posix_only = pytest.mark.skipif(not hasattr(os, 'getuid'), reason="permissions POSIX")
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / 'cache' / 'shared.sqlite3')
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def stores(request, sqlite_path):
+    """Deux workers sur le même cache partagé"""
+    if request.param == 'sqlite':
+        workers = [SQLiteSharedStore(sqlite_path), SQLiteSharedStore(sqlite_path)]
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        workers = [RedisSharedStore(fakeredis.FakeRedis(server=server)) for _ in range(2)]
+    yield workers
+    for store in workers:
+        store.close()
+
+
+def test_set_then_get_from_another_worker(stores):
+    first, second = stores
+    first.set('Postes', [{'IdPoste': 1, 'NomPoste': 'Chef de quai'}], '"v1"', 3600)
+
+    entry = second.get('Postes')
+    assert entry.value == [{'IdPoste': 1, 'NomPoste': 'Chef de quai'}]
+    assert entry.etag == '"v1"'
+    assert entry.ttl == 3600
+    assert entry.age < 5
+
+    unchanged = second.get('Postes', known_etag='"v1"')
+    assert unchanged.unchanged and unchanged.value is None
+    assert second.get('Directions') is None
+
+
+def test_entries_expire_after_retention(sqlite_path):
+    store = SQLiteSharedStore(sqlite_path, retention=0.05)
+    store.set('Postes', [], None, 3600)
+    assert store.get('Postes') is not None
+    time.sleep(0.1)
+    assert store.get('Postes') is None
+    store.close()
+
+
+def test_invalidation_reaches_the_other_worker_only(stores):
+    first, second = stores
+    for key in ('Postes', 'Demandes/1', 'Demandes/1?details=true', 'Demandes/2'):
+        first.set(key, {'key': key}, None, 60)
+
+    second.invalidate(['Postes', 'Demandes/1'])
+
+    assert first.get('Postes') is None
+    assert first.get('Demandes/1') is None
+    assert first.get('Demandes/1?details=true') is None
+    assert first.get('Demandes/2') is not None
+    assert first.poll_invalidations() == [['Postes', 'Demandes/1']]
+    assert second.poll_invalidations() == []
+
+    second.invalidate(['Demandes*'])
+    assert first.get('Demandes/2') is None
+
+
+@posix_only
+def test_sqlite_file_is_private(sqlite_path):
+    store = SQLiteSharedStore(sqlite_path)
+    store.set('Postes', [], None, 60)
+
+    assert stat.S_IMODE(os.stat(sqlite_path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(os.path.dirname(sqlite_path)).st_mode) == 0o700
+    store.close()
+
+
+@posix_only
+def test_sqlite_refuses_a_file_readable_by_others(sqlite_path):
+    os.makedirs(os.path.dirname(sqlite_path), mode=0o700)
+    with open(sqlite_path, 'wb'):
+        pass
+    os.chmod(sqlite_path, 0o644)
+
+    with pytest.raises(PermissionError):
+        SQLiteSharedStore(sqlite_path)
+
+
+@posix_only
+def test_sqlite_refuses_a_directory_writable_by_others(sqlite_path):
+    os.makedirs(os.path.dirname(sqlite_path))
+    os.chmod(os.path.dirname(sqlite_path), 0o777)
+
+    with pytest.raises(PermissionError):
+        SQLiteSharedStore(sqlite_path)
+
+
+@posix_only
+def test_create_shared_store_falls_back_when_sqlite_is_not_private(monkeypatch, sqlite_path):
+    os.makedirs(os.path.dirname(sqlite_path))
+    os.chmod(os.path.dirname(sqlite_path), 0o777)
+    monkeypatch.setenv('BACKEND_SHARED_CACHE', 'sqlite')
+    monkeypatch.setenv('BACKEND_SHARED_CACHE_PATH', sqlite_path)
+
+    assert create_shared_store() is None
+
+
+def test_create_shared_store_falls_back_when_redis_is_unreachable(monkeypatch):
+    pytest.importorskip("redis")
+    monkeypatch.setenv('BACKEND_SHARED_CACHE', 'redis')
+    monkeypatch.setenv('BACKEND_SHARED_CACHE_URL', 'redis://127.0.0.1:1/0')
+
+    assert create_shared_store() is None
+
+
+class _BrokenStore:
+    """Cache partagé dont toutes les opérations échouent (serveur tombé)"""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("cache partagé injoignable")
+        return fail
+
+
+class _RecordingStore:
+    def __init__(self):
+        self.keys = []
+
+    def get(self, key, known_etag=None):
+        self.keys.append(key)
+        return None
+
+    def set(self, key, value, etag, ttl):
+        self.keys.append(key)
+
+
+def _backend(monkeypatch, store):
+    service = BackendService(base_url='http://backend.test', api_key='test')
+    service.shared_store = store
+
+    def fake_request(method, url, **kwargs):
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        response._content = json.dumps([{'IdPoste': 1, 'NomPoste': 'Chef de quai'}]).encode()
+        return response
+
+    monkeypatch.setattr(service.session, 'request', fake_request)
+    return service
+
+
+def test_backend_reads_through_when_shared_store_fails(monkeypatch):
+    service = _backend(monkeypatch, _BrokenStore())
+
+    assert service.get_postes() == [{'IdPoste': 1, 'NomPoste': 'Chef de quai'}]
+    service._executor.shutdown(wait=False)
+
+
+def test_personal_data_stays_out_of_the_shared_store(monkeypatch):
+    store = _RecordingStore()
+    service = _backend(monkeypatch, store)
+
+    service._get('Postes')
+    service._get('Login/getAllUsers')
+
+    assert 'Postes' in store.keys
+    assert 'Login/getAllUsers' not in store.keys
+    service._executor.shutdown(wait=False)
@@ -0,0 +1,65 @@
+"""
+Préchargement spéculatif : les routes suivent le type de la demande (DDR ou
+DMOE) et rien n'est préchargé quand le type est inconnu.
+"""
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.Middleware import speculative_prefetch  # noqa: E402
+from actions.services import ddr_service  # noqa: E402
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+
+class _Tracker:
+    sender_id = 'jdoe'
+
+    def __init__(self, entities, slots=None):
+        self.latest_message = {'entities': entities}
+        self.slots = slots or {}
+
+    def get_slot(self, name):
+        return self.slots.get(name)
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    service = BackendService(base_url='http://backend.test', api_key='test')
+    routes = []
+    monkeypatch.setattr(service, '_prefetch', lambda route, **path_params: routes.append(route))
+
+    def start(name, label, calls, sender_id, claim_key=None):
+        for call in calls.values():
+            call()
+        return label
+
+    monkeypatch.setattr(service, '_start_prefetch', start)
+    monkeypatch.setattr(ddr_service, '_backend_service', service)
+    service.prefetched_routes = routes
+    yield service
+    service._executor.shutdown(wait=False)
+
+
+def test_dmoe_demande_prefetches_manoeuvre_routes(backend):
+    tracker = _Tracker([{'entity': 'id_demande', 'value': '12'}], {'type_demande': 'dmoe'})
+
+    assert speculative_prefetch.prefetch_detected_demande(tracker) == 12
+    assert backend.prefetched_routes[0] == "DemandesManoeuvre/{demande_id}"
+    assert set(backend.prefetched_routes[1:]) == set(BackendService.DEMANDE_MANOEUVRE_DETAIL_ROUTES.values())
+
+
+def test_ddr_type_from_entity(backend):
+    tracker = _Tracker([{'entity': 'id_demande', 'value': '7'}, {'entity': 'type_demande', 'value': 'DDR'}])
+
+    assert speculative_prefetch.prefetch_detected_demande(tracker) == 7
+    assert backend.prefetched_routes[0] == "Demandes/{demande_id}"
+    assert set(backend.prefetched_routes[1:]) == set(BackendService.DEMANDE_DETAIL_ROUTES.values())
+
+
+@pytest.mark.parametrize('slots', [{}, {'type_demande': 'DMI'}])
+def test_unknown_type_is_not_prefetched(backend, slots):
+    tracker = _Tracker([{'entity': 'id_demande', 'value': '7'}], slots)
+
+    assert speculative_prefetch.prefetch_detected_demande(tracker) is None
+    assert backend.prefetched_routes == []
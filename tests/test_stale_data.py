@@ -0,0 +1,66 @@
+"""
+Mode dégradé : la copie périmée est réutilisée d'un appel à l'autre (pas de
+réindexation pendant une panne) et l'action prévient l'utilisateur.
+"""
+import time
+
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.Middleware.backend_tracer import backend_call_trace, notify_stale_data  # noqa: E402
+from actions.services.backend_cache import is_stale  # noqa: E402
+from actions.services.ddr_service import BackendService  # noqa: E402
+
+POSTES = [{'IdPoste': 1, 'NomPoste': 'Chef de quai'}]
+
+
+class _Dispatcher:
+    def __init__(self):
+        self.messages = []
+
+    def utter_message(self, text=None, **kwargs):
+        self.messages.append(text)
+
+
+@pytest.fixture
+def backend_down(monkeypatch):
+    monkeypatch.setenv('BACKEND_MAX_STALE', '86400')
+    service = BackendService(base_url='http://backend.test', api_key='test')
+    # Entrée expirée (au-delà du stale-while-revalidate) et backend injoignable
+    service.cache.set('Postes', POSTES, 3600, stored_at=time.monotonic() - 7200)
+    monkeypatch.setattr(service, '_send', lambda *args, **kwargs: None)
+    yield service
+    service._executor.shutdown(wait=False)
+
+
+def test_stale_copy_is_reused_and_index_not_rebuilt(backend_down):
+    first = backend_down.get_postes()
+    index = backend_down.get_reference_index('Postes')
+    second = backend_down.get_postes()
+
+    assert is_stale(first)
+    assert second is first
+    assert backend_down.get_reference_index('Postes') is index
+    assert index.name_for_id(1) == 'Chef de quai'
+
+
+def test_user_is_warned_when_stale_data_was_served(backend_down):
+    dispatcher = _Dispatcher()
+    with backend_call_trace('action_test') as trace:
+        backend_down.get_postes()
+    notify_stale_data(dispatcher, trace)
+
+    assert list(trace.stale) == ['Postes']
+    assert len(dispatcher.messages) == 1
+    assert 'cache' in dispatcher.messages[0]
+
+
+def test_no_warning_without_stale_data():
+    dispatcher = _Dispatcher()
+    with backend_call_trace('action_test') as trace:
+        pass
+    notify_stale_data(dispatcher, trace)
+
+    assert dispatcher.messages == []
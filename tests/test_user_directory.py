@@ -0,0 +1,125 @@
+"""
+Recherche par nom : UserDirectory donne les mêmes utilisateurs, dans le même
+ordre, que l'ancien parcours complet de search_user_by_name (accents, casse,
+ordre des mots, correspondances partielles, scores égaux).
+"""
+import random
+
+import pytest
+
+# Le package actions importe les actions Rasa
+pytest.importorskip("rasa_sdk")
+
+from actions.services.Calculate import RechercheNom  # noqa: E402
+from actions.services.user_directory import UserDirectory, normalize_text  # noqa: E402
+
+FIRST_NAMES = ['Abel', 'Éléonore', 'Honoré', 'Hery', 'Jean', 'Jean-Luc', 'Noël', 'Zoé', 'Fara', 'Andry']
+LAST_NAMES = ['Rakoto', 'RAKOTOMANDIMBY', 'Rakotoarisoa', 'Andrianaivo', 'Razafy', 'Lefèvre', 'Rabe', 'Ranaivo']
+
+
+def _old_match_score(normalized_name, query_words):
+    """Ancien UserSearchService._calculate_match_score"""
+    score = 0
+    name_words = normalized_name.split()
+    for query_word in query_words:
+        word_found = False
+        for name_word in name_words:
+            if query_word == name_word:
+                score += 10
+                word_found = True
+                break
+            elif name_word.startswith(query_word):
+                score += 7
+                word_found = True
+                break
+            elif query_word in name_word:
+                score += 5
+                word_found = True
+                break
+        if not word_found:
+            return 0
+    if normalized_name.startswith(' '.join(query_words)):
+        score += 15
+    return score
+
+
+def _old_search(all_users, search_query, max_results=10):
+    """Ancien parcours complet de UserSearchService.search_user_by_name"""
+    if not search_query or not search_query.strip():
+        return []
+    query_words = normalize_text(search_query).split()
+    results_with_score = []
+    for user in all_users:
+        full_name = user.get('FullName', '')
+        if not full_name:
+            continue
+        score = _old_match_score(normalize_text(full_name), query_words)
+        if score > 0:
+            results_with_score.append((user, score))
+    results_with_score.sort(key=lambda x: x[1], reverse=True)
+    return [user for user, score in results_with_score[:max_results]]
+
+
+def _users(count, seed=7):
+    rng = random.Random(seed)
+    users = []
+    for i in range(count):
+        words = [rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)]
+        if rng.random() < 0.3:
+            words.append(rng.choice(FIRST_NAMES))
+        if rng.random() < 0.5:
+            words.reverse()
+        users.append({'Matricule': str(650000 + i), 'FullName': ' '.join(words)})
+    # Noms absents, doublons exacts (égalités) et accents décomposés
+    users[3]['FullName'] = ''
+    users[5].pop('FullName')
+    users[8]['FullName'] = users[9]['FullName']
+    users[11]['FullName'] = 'Zoé RAKOTO'
+    return users
+
+
+def _queries(seed=11):
+    rng = random.Random(seed)
+    words = [normalize_text(word) for word in FIRST_NAMES + LAST_NAMES]
+    queries = [
+        'abel rakoto', 'RAKOTO ABEL', 'honoré', 'honore', 'HONORÉ', 'zoé', 'zoe rakoto',
+        'rako', 'oto', 'o', 'é', 'jean-luc', 'jean luc', 'ele', 'lefevre', 'inconnu',
+        '  rakoto   ', 'rakoto rakoto', 'a b', '́',
+    ]
+    for _ in range(300):
+        parts = []
+        for _ in range(rng.randint(1, 3)):
+            word = rng.choice(words)
+            start = rng.randint(0, len(word) - 1)
+            fragment = word[start:rng.randint(start + 1, len(word))]
+            parts.append(fragment.upper() if rng.random() < 0.2 else fragment)
+        queries.append(' '.join(parts))
+    return queries
+
+
+@pytest.mark.parametrize('max_results', [1, 3, 10, 1000])
+def test_directory_matches_the_linear_scan(max_results):
+    users = _users(400)
+    directory = UserDirectory(users)
+
+    for query in _queries():
+        expected = _old_search(users, query, max_results)
+        # Identité des objets : mêmes utilisateurs et même ordre, égalités comprises
+        assert [id(user) for user in directory.search(query, max_results)] == [id(user) for user in expected], query
+
+
+def test_search_user_by_name_uses_the_directory(monkeypatch):
+    users = _users(50)
+
+    class _Backend:
+        def add_invalidation_listener(self, listener):
+            pass
+
+        def get_user_directory(self):
+            return UserDirectory(users)
+
+    monkeypatch.setattr(RechercheNom, 'get_backend_service', lambda: _Backend())
+    searcher = RechercheNom.UserSearchService()
+
+    for query in ('rakoto', 'Éléonore raz', 'ABEL', '   ', ''):
+        assert searcher.search_user_by_name(query, 5) == _old_search(users, query, 5)